@@ -1,6 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import date, datetime
+from typing import Annotated, AsyncIterator
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from app.models.access_model import AccessEvent, AccessFilter
 from app.models.responses import ApiResponse
 from app.services.source_service import SourceService
+from app.services.access_poller import AccessPoller
+from app.services.access_broadcaster import AccessBroadcaster
+from app.services.access_history import AccessHistory
+from app.services.access_index import format_page_cursor, parse_page_cursor
+from app.services.parse_executor import ParseExecutor
+from config.env import config
+from utils.encoded_body import EncodedBody, dumps_json
+from utils.single_flight import SingleFlight
+from utils.stale import note_stale
 from app.middleware.auth import auth_middleware
 
 router = APIRouter(
@@ -11,22 +28,334 @@ router = APIRouter(
 
 # Create service instance
 source_service = SourceService()
+access_poller = AccessPoller()
+access_broadcaster = AccessBroadcaster()
+access_history = AccessHistory()
+parse_executor = ParseExecutor()
+
+# Full snapshot bodies by cursor, built once per change; only the current
+# one and any newer one are kept
+_snapshot_bodies: dict[str, EncodedBody] = {}
+_snapshot_flight: SingleFlight[EncodedBody] = SingleFlight()
 
 
 @router.get("", response_model=ApiResponse)
-async def get_today_access():
+async def get_today_access(
+    since: str | None = None,
+    from_date: Annotated[date | None, Query(alias="from")] = None,
+    to_date: Annotated[date | None, Query(alias="to")] = None,
+    location: int | None = None,
+    run: str | None = None,
+    activity: str | None = None,
+    open_only: bool = False,
+    entry_from: datetime | None = None,
+    entry_to: datetime | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    after: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
+):
     """
-    Get today's access data from source system - requires authentication
+    Get today's access data - requires authentication
+
+    Served from the background poller snapshot. When `since` holds a cursor
+    from a previous response only the records added or updated after it are
+    returned; `reset` tells the client to drop its state and use the full list.
+
+    With `from` and/or `to` the records of that range of days are returned
+    instead. Closed days are served from the local store, fetched from the
+    source the first time they are requested.
+
+    The filters narrow any of these answers. Without `since`, filtered
+    records come in entry time order and are paged with `limit`: pass the
+    returned `next` as `after` to get the following page.
+
+    The full snapshot is serialized and compressed once per change and
+    carries an ETag; a matching `If-None-Match` gets 304.
+
+    Args:
+        since: Cursor returned by a previous call
+        from_date: First day of the range, defaults to `to`
+        to_date: Last day of the range (inclusive), defaults to `from`
+        location: Only records of this location id
+        run: Only records of this RUN
+        activity: Only records of this activity, case insensitive
+        open_only: Only visits with no exit time yet
+        entry_from: Only entries at or after this time, local if naive
+        entry_to: Only entries at or before this time, local if naive
+        limit: Page size
+        after: `next` value of the previous page
+        if_none_match: ETag of the snapshot the client already has
+        accept_encoding: Content codings the client accepts
 
     Returns:
-        ApiResponse: Today's access data
+        ApiResponse: Today's access data, or the range's
     """
-    access_data = await source_service.get_today_access()
+    access_filter = AccessFilter(
+        location=str(location) if location is not None else None,
+        run=run,
+        activity=activity,
+        open_only=open_only,
+        entry_from=_format_utc(entry_from),
+        entry_to=_format_utc(entry_to),
+    )
+
+    if from_date or to_date:
+        return await _get_access_range(
+            from_date or to_date, to_date or from_date, access_filter
+        )
+
+    if not access_poller.ready:
+        # Poller has not completed a fetch yet, go straight to the source
+        access_poller.apply(await source_service.get_today_access())
+    _note_snapshot_staleness()
+
+    if since is None and (not access_filter.is_empty or limit or after):
+        return _get_access_page(access_filter, after, limit)
+
+    if since is None:
+        return await _get_snapshot_response(if_none_match, accept_encoding)
+
+    access_data, cursor, reset = access_poller.changes_since(since)
+    if not access_filter.is_empty:
+        access_data = [
+            record for record in access_data if access_filter.matches(record)
+        ]
+
     return ApiResponse(
         message="Today's access data retrieved successfully",
         data={
             "records": [record.model_dump(by_alias=True) for record in access_data],
             "count": len(access_data) if access_data else 0,
+            "cursor": cursor,
+            "reset": reset,
+        },
+        authenticated=True,
+    )
+
+
+def _note_snapshot_staleness() -> None:
+    # The snapshot stops following the source while its circuit is open
+    if source_service.circuit_open("ACCESOS"):
+        note_stale(access_poller.age)
+
+
+def _format_utc(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo("America/Santiago"))
+    return value.astimezone(ZoneInfo("UTC")).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def _get_snapshot_response(
+    if_none_match: str | None, accept_encoding: str | None
+) -> Response:
+    body = _snapshot_bodies.get(access_poller.cursor)
+    if body is None:
+        body = await _snapshot_flight.do(access_poller.cursor, _encode_snapshot)
+
+    headers = {
+        "ETag": body.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if body.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    content, encoding = body.select(accept_encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+async def _encode_snapshot() -> EncodedBody:
+    access_data, cursor, reset = access_poller.changes_since(None)
+    raw = dumps_json(
+        {
+            "message": "Today's access data retrieved successfully",
+            "data": {
+                "records": [record.model_dump(by_alias=True) for record in access_data],
+                "count": len(access_data),
+                "cursor": cursor,
+                "reset": reset,
+            },
+            "authenticated": True,
+        }
+    )
+    # Compressing a large snapshot is CPU work, keep it off the event loop
+    body = await parse_executor.run(len(raw), EncodedBody, raw)
+
+    _snapshot_bodies[cursor] = body
+    # An encoding of an older snapshot may finish after a newer one's, it must
+    # not evict it
+    current = _snapshot_order(access_poller.cursor)
+    for key in [key for key in _snapshot_bodies if _snapshot_order(key) < current]:
+        del _snapshot_bodies[key]
+    return body
+
+
+def _snapshot_order(cursor: str) -> tuple[str, int]:
+    day, _, version = cursor.rpartition(".")
+    return day, int(version)
+
+
+def _get_access_page(
+    access_filter: AccessFilter, after: str | None, limit: int | None
+) -> ApiResponse:
+    try:
+        after_key = parse_page_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail={"code": "INVALID_CURSOR"}
+        ) from None
+
+    # Read the change cursor first, so following it up with `since` never
+    # skips a change made after the page was taken
+    cursor = access_poller.cursor
+    access_data, next_key = access_poller.query(access_filter, after_key, limit)
+
+    return ApiResponse(
+        message="Today's access data retrieved successfully",
+        data={
+            "records": [record.model_dump(by_alias=True) for record in access_data],
+            "count": len(access_data),
+            "cursor": cursor,
+            # Later pages add to the rows of the first one
+            "reset": after_key is None,
+            "next": format_page_cursor(next_key) if next_key else None,
         },
         authenticated=True,
     )
+
+
+async def _get_access_range(
+    from_date: date, to_date: date, access_filter: AccessFilter
+) -> Response:
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail={"code": "INVALID_RANGE"})
+    if (to_date - from_date).days >= config.ACCESS_RANGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "RANGE_TOO_LARGE", "max": config.ACCESS_RANGE_MAX_DAYS},
+        )
+
+    access_data = await access_history.get_range(from_date, to_date, access_filter)
+
+    # Serialized from the columns, a range can hold many days of rows
+    return Response(
+        content=dumps_json(
+            {
+                "message": "Access data retrieved successfully",
+                "data": {
+                    "records": access_data.to_dicts(),
+                    "count": len(access_data),
+                    "from": from_date.isoformat(),
+                    "to": to_date.isoformat(),
+                },
+                "authenticated": True,
+            }
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get("/occupancy", response_model=ApiResponse)
+async def get_occupancy():
+    """
+    Get today's occupancy by location - requires authentication
+
+    People currently inside, entries by hour and average stay of every
+    location, kept up to date by the background poller.
+
+    Returns:
+        ApiResponse: Occupancy figures and the snapshot cursor they match
+    """
+    if not access_poller.ready:
+        # Poller has not completed a fetch yet, go straight to the source
+        access_poller.apply(await source_service.get_today_access())
+    _note_snapshot_staleness()
+
+    return ApiResponse(
+        message="Occupancy retrieved successfully",
+        data={
+            "locations": [
+                occupancy.model_dump(by_alias=True)
+                for occupancy in access_poller.occupancy()
+            ],
+            "cursor": access_poller.cursor,
+        },
+        authenticated=True,
+    )
+
+
+def _format_sse(event: AccessEvent) -> str:
+    if event.event == "ping":
+        return ": ping\n\n"
+
+    lines = []
+    if event.id:
+        lines.append(f"id: {event.id}")
+    lines.append(f"event: {event.event}")
+    data = event.record.model_dump_json(by_alias=True) if event.record else "{}"
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def stream_access(
+    last_event_id: Annotated[str | None, Header()] = None,
+    since: str | None = None,
+):
+    """
+    Stream access entry/exit events as Server-Sent Events - requires
+    authentication
+
+    Args:
+        last_event_id: Last-Event-ID header sent by reconnecting clients
+        since: Cursor or event id to resume from when the header is not set
+
+    Returns:
+        StreamingResponse: `text/event-stream` of `reset`, `entry` and `exit`
+        events
+    """
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event in access_broadcaster.subscribe(last_event_id or since):
+            yield _format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_access_ws(websocket: WebSocket, last_event_id: str | None = None):
+    """
+    WebSocket variant of `/access/stream` - requires authentication
+
+    Every message is a JSON `AccessEvent`. Pass `last_event_id` as a query
+    parameter to resume after a reconnect.
+    """
+    await websocket.accept()
+
+    async def send_events() -> None:
+        async for event in access_broadcaster.subscribe(last_event_id):
+            await websocket.send_text(event.model_dump_json(by_alias=True))
+
+    async def wait_disconnect() -> None:
+        # Incoming messages are ignored, receiving only detects the disconnect
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,275 @@
+from collections.abc import Iterator
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import Metrics
+from app.services.parse_executor import ParseExecutor
+from app.services.source_service import SourceService
+from utils.circuit_breaker import CircuitState
+from utils.metrics import render_gauge
+
+router = APIRouter(prefix="", tags=["metrics"])
+
+source_service = SourceService()
+parse_executor = ParseExecutor()
+metrics = Metrics()
+
+
+def _render_coalescing() -> Iterator[str]:
+    stats = source_service.coalescing_stats()
+    for name, key, kind, help in (
+        ("spl_coalescing_calls_total", "calls", "counter", "Calls received"),
+        (
+            "spl_coalescing_collapsed_total",
+            "collapsed",
+            "counter",
+            "Calls served by a request already in flight",
+        ),
+        (
+            "spl_coalescing_in_flight",
+            "in_flight",
+            "gauge",
+            "Upstream requests currently in flight",
+        ),
+        (
+            "spl_coalescing_abandoned_total",
+            "abandoned",
+            "counter",
+            "Upstream requests cancelled after every caller went away",
+        ),
+    ):
+        yield from render_gauge(
+            name,
+            help,
+            (({"operation": op}, values[key]) for op, values in stats.items()),
+            kind,
+        )
+
+
+def _render_caches() -> Iterator[str]:
+    stats = source_service.cache_stats()
+    for key, kind, help in (
+        ("hits", "counter", "Cache hits"),
+        ("stale_hits", "counter", "Cache hits served stale while refreshing"),
+        ("misses", "counter", "Cache misses"),
+        ("refreshes", "counter", "Background refreshes of stale entries"),
+        ("evictions", "counter", "Entries evicted to stay within the size limit"),
+    ):
+        yield from render_gauge(
+            f"spl_cache_{key}_total",
+            help,
+            (
+                ({"cache": name}, values[key])
+                for name, values in stats.items()
+                if key in values
+            ),
+            kind,
+        )
+    yield from render_gauge(
+        "spl_cache_entries",
+        "Entries held by the cache",
+        (
+            ({"cache": name}, values.get("size", values.get("files", 0)))
+            for name, values in stats.items()
+        ),
+    )
+    yield from render_gauge(
+        "spl_cache_bytes",
+        "Bytes held by the cache",
+        (
+            ({"cache": name}, values["bytes"])
+            for name, values in stats.items()
+            if "bytes" in values
+        ),
+    )
+
+    def hit_ratio(values: dict[str, int]) -> float:
+        hits = values["hits"] + values.get("stale_hits", 0)
+        lookups = hits + values["misses"]
+        return hits / lookups if lookups else 0.0
+
+    yield from render_gauge(
+        "spl_cache_hit_ratio",
+        "Share of lookups served from the cache since startup",
+        (({"cache": name}, hit_ratio(values)) for name, values in stats.items()),
+    )
+
+
+def _render_session() -> Iterator[str]:
+    session = source_service.session
+    yield from render_gauge(
+        "spl_session_logins_total",
+        "Upstream logins",
+        [({}, session.logins)],
+        "counter",
+    )
+    yield from render_gauge(
+        "spl_session_expirations_total",
+        "Upstream sessions found expired",
+        [({}, session.expirations)],
+        "counter",
+    )
+    yield from render_gauge(
+        "spl_session_generation",
+        "Current upstream session generation",
+        [({}, session.generation)],
+    )
+
+
+def _render_parse_executor() -> Iterator[str]:
+    stats = parse_executor.stats()
+    yield from render_gauge(
+        "spl_parse_runs_total",
+        "Parse stages run, inline or in the pool",
+        [
+            ({"where": "inline"}, stats["inline_runs"]),
+            ({"where": "pool"}, stats["offloaded_runs"]),
+        ],
+        "counter",
+    )
+    yield from render_gauge(
+        "spl_parse_pending",
+        "Parse stages waiting or running in the pool",
+        [({}, stats["pending"])],
+    )
+
+
+def _render_limiters() -> Iterator[str]:
+    stats = source_service.limiter_stats()
+    for name, key, kind, help in (
+        ("spl_upstream_limit", "limit", "gauge", "Adaptive concurrency limit"),
+        ("spl_upstream_in_flight", "in_flight", "gauge", "Admitted calls running"),
+        ("spl_upstream_waiting", "waiting", "gauge", "Calls queued for a slot"),
+        (
+            "spl_upstream_rejected_total",
+            "rejected",
+            "counter",
+            "Calls shed with 503 after queueing too long",
+        ),
+        (
+            "spl_upstream_limit_decreases_total",
+            "decreases",
+            "counter",
+            "Limit cuts after slow or failed calls",
+        ),
+    ):
+        yield from render_gauge(
+            name,
+            help,
+            (({"operation": op}, values[key]) for op, values in stats.items()),
+            kind,
+        )
+
+
+def _render_hedging() -> Iterator[str]:
+    stats = source_service.hedge_stats()
+    if not stats:
+        return
+    for name, key, kind, help in (
+        (
+            "spl_upstream_hedge_delay_seconds",
+            "delay",
+            "gauge",
+            "Latency after which a call is hedged",
+        ),
+        ("spl_upstream_hedge_calls_total", "calls", "counter", "Hedgeable calls"),
+        ("spl_upstream_hedges_total", "hedged", "counter", "Hedge requests sent"),
+        (
+            "spl_upstream_hedge_wins_total",
+            "wins",
+            "counter",
+            "Hedge requests answering before the original",
+        ),
+        (
+            "spl_upstream_hedge_over_budget_total",
+            "over_budget",
+            "counter",
+            "Slow calls not hedged for lack of budget",
+        ),
+    ):
+        yield from render_gauge(
+            name,
+            help,
+            (({"operation": op}, values[key]) for op, values in stats.items()),
+            kind,
+        )
+
+
+def _render_breakers() -> Iterator[str]:
+    stats = source_service.breaker_stats()
+    yield from render_gauge(
+        "spl_upstream_circuit_state",
+        "Circuit breaker state, 1 for the current one",
+        (
+            (
+                {"operation": op, "state": state.value},
+                int(values["state"] == state.value),
+            )
+            for op, values in stats.items()
+            for state in CircuitState
+        ),
+    )
+    for name, key, help in (
+        ("spl_upstream_circuit_opens_total", "opens", "Times the circuit opened"),
+        (
+            "spl_upstream_circuit_rejected_total",
+            "rejected",
+            "Calls failed fast while the circuit was open",
+        ),
+    ):
+        yield from render_gauge(
+            name,
+            help,
+            (({"operation": op}, values[key]) for op, values in stats.items()),
+            "counter",
+        )
+
+
+def _render_pool() -> Iterator[str]:
+    stats = source_service.pool_stats()
+    yield from render_gauge(
+        "spl_http_pool_connections",
+        "Upstream connections by state",
+        [
+            ({"state": "active"}, stats["active"]),
+            ({"state": "idle"}, stats["idle"]),
+        ],
+    )
+    yield from render_gauge(
+        "spl_http_pool_waiting",
+        "Requests waiting for an upstream connection",
+        [({}, stats["waiting"])],
+    )
+    yield from render_gauge(
+        "spl_http_pool_max_connections",
+        "Upstream connection limit",
+        [({}, stats["max_connections"])],
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics in the Prometheus text format - no authentication required
+
+    Returns:
+        PlainTextResponse: Upstream latency and size histograms, re-logins,
+        parse stage durations, cache, coalescing, admission, hedging, circuit
+        breaker and connection pool figures
+    """
+    lines = [
+        *metrics.render(),
+        *_render_coalescing(),
+        *_render_caches(),
+        *_render_session(),
+        *_render_parse_executor(),
+        *_render_limiters(),
+        *_render_hedging(),
+        *_render_breakers(),
+        *_render_pool(),
+    ]
+    return PlainTextResponse(
+        "\n".join(lines) + "\n",
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,8 +1,23 @@
-from fastapi import APIRouter, Depends
+from typing import Annotated, AsyncIterator
+from urllib.parse import unquote
+
+import httpx
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import FileResponse, StreamingResponse
 from app.middleware.auth import auth_middleware
-from app.services.source_service import SourceService
-from app.models.user import AbmUser
+from app.services.source_service import UPSTREAM_ERRORS, SourceService
+from app.models.user import (
+    AbmUser,
+    AbmUserBatchRequest,
+    AbmUserBatchResult,
+    UserBatchRequest,
+    UserBatchResult,
+)
 from fastapi import Response, HTTPException
+from config.env import config
+from utils.disk_cache import CachedFile
+from utils.encoded_body import etag_matches
+from utils.fan_out import map_as_completed
 
 # Create service instance
 source_service = SourceService()
@@ -34,6 +49,84 @@ async def get_abm_user(run: str):
     return abm_user
 
 
+def _check_batch_size(size: int) -> None:
+    if size > config.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail={"code": "BATCH_TOO_LARGE", "max": config.BATCH_MAX_SIZE},
+        )
+
+
+def _error_message(error: Exception | None) -> str | None:
+    if error is None:
+        return None
+    return str(error) or error.__class__.__name__
+
+
+@router.post("/abm/batch")
+async def get_abm_users_batch(request: AbmUserBatchRequest):
+    """
+    Get many users by RUN - requires authentication
+
+    Duplicated RUNs are looked up once and cached users are returned right
+    away. Results are streamed as NDJSON, one `AbmUserBatchResult` per line in
+    completion order.
+
+    Args:
+        request: The RUNs to retrieve
+
+    Returns:
+        StreamingResponse: `application/x-ndjson` stream of results
+    """
+    _check_batch_size(len(request.runs))
+
+    async def results() -> AsyncIterator[str]:
+        async for run, abm_user, error in map_as_completed(
+            (run.upper() for run in request.runs),
+            source_service.get_abm_user_by_run,
+            config.BATCH_CONCURRENCY,
+            errors=UPSTREAM_ERRORS,
+        ):
+            result = AbmUserBatchResult(
+                run=run, user=abm_user, error=_error_message(error)
+            )
+            yield result.model_dump_json(by_alias=True) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.post("/batch")
+async def get_users_batch(request: UserBatchRequest):
+    """
+    Get many users by external ID - requires authentication
+
+    Duplicated IDs are looked up once and cached profiles are returned right
+    away. Results are streamed as NDJSON, one `UserBatchResult` per line in
+    completion order.
+
+    Args:
+        request: The external IDs to retrieve
+
+    Returns:
+        StreamingResponse: `application/x-ndjson` stream of results
+    """
+    _check_batch_size(len(request.external_ids))
+
+    async def results() -> AsyncIterator[str]:
+        async for external_id, user, error in map_as_completed(
+            request.external_ids,
+            source_service.get_user_by_external_id,
+            config.BATCH_CONCURRENCY,
+            errors=UPSTREAM_ERRORS,
+        ):
+            result = UserBatchResult(
+                external_id=external_id, user=user, error=_error_message(error)
+            )
+            yield result.model_dump_json(by_alias=True) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @router.get("/{external_id}")
 async def get_user(external_id: int):
     """
@@ -73,3 +166,66 @@ async def get_user_inbody(run: str):
     inbody = await source_service.get_inbody_by_external_id(abm_user.external_id)
 
     return {"data": inbody}
+
+
+@router.get("/{run}/inbody/{file_name}")
+async def get_user_inbody_file(
+    run: str,
+    file_name: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Get one of the user's in-body files by RUN - requires authentication
+
+    The file is downloaded from the source system once and served from the
+    local disk cache afterwards. Range requests are supported and the ETag
+    is the SHA-256 of the content.
+
+    Args:
+        run: The RUN of the user
+        file_name: Name of the file, last segment of a link from `/inbody`
+        if_none_match: ETag of the copy the client already has
+
+    Returns:
+        FileResponse: The file
+    """
+    abm_user = await source_service.get_abm_user_by_run(run)
+    if abm_user is None:
+        raise HTTPException(status_code=404, detail={"code": "USER_NOT_FOUND"})
+
+    # Only files listed for the user are proxied
+    inbody = await source_service.get_inbody_by_external_id(abm_user.external_id)
+    url = next(
+        (link for link in inbody if unquote(link.rsplit("/", 1)[-1]) == file_name),
+        None,
+    )
+    if url is None:
+        raise HTTPException(status_code=404, detail={"code": "FILE_NOT_FOUND"})
+
+    try:
+        cached = await source_service.get_inbody_file(url)
+    except httpx.HTTPError:
+        raise HTTPException(
+            status_code=502, detail={"code": "UPSTREAM_ERROR"}
+        ) from None
+
+    headers = {"ETag": f'"{cached.digest}"', "Cache-Control": "private, max-age=86400"}
+    if etag_matches(headers["ETag"], if_none_match):
+        await source_service.release_inbody_file(url)
+        return Response(status_code=304, headers=headers)
+
+    return _CachedFileResponse(url, cached, headers=headers)
+
+
+class _CachedFileResponse(FileResponse):
+    """Serves a pinned cached file and unpins it once sent or abandoned."""
+
+    def __init__(self, url: str, cached: CachedFile, headers: dict[str, str]):
+        super().__init__(cached.path, media_type=cached.content_type, headers=headers)
+        self._url = url
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await source_service.release_inbody_file(self._url)
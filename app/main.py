@@ -3,22 +3,40 @@ from config.env import config
 from app.controllers import (
     access_controller,
     health_controller,
+    metrics_controller,
     user_controller,
 )
 import logging
 from contextlib import asynccontextmanager
 
 from app.services.source_service import SourceService
+from app.services.access_poller import AccessPoller
+from app.services.parse_executor import ParseExecutor
+from app.services.access_store import AccessStore
+from app.services.checkpoint import Checkpoint
+from app.middleware.upstream_errors import register_upstream_error_handlers
+from app.middleware.stale_headers import StaleHeadersMiddleware
+from app.middleware.request_lifetime import RequestLifetimeMiddleware
 
 source_service = SourceService()
+access_poller = AccessPoller()
+checkpoint = Checkpoint()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    await source_service.login()
+    # Startup, ready without waiting for the upstream
+    await checkpoint.load()
+    await source_service.session.start(background=True)
+    access_poller.start()
+    checkpoint.start()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    await access_poller.stop()
+    await checkpoint.stop()
+    await source_service.session.stop()
+    ParseExecutor().shutdown()
+    AccessStore().close()
     # await source_service.logout()
 
 
@@ -43,8 +61,14 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    register_upstream_error_handlers(app)
+    app.add_middleware(StaleHeadersMiddleware)
+    # Outermost, so the handler task it cancels covers everything below
+    app.add_middleware(RequestLifetimeMiddleware)
+
     # Include routers
     app.include_router(health_controller.router)
+    app.include_router(metrics_controller.router)
     app.include_router(user_controller.router)
     app.include_router(access_controller.router)
 
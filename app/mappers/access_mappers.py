@@ -5,8 +5,9 @@ Data mappers for transforming source system data to application format.
 from typing import Any
 from app.const.enum import Location, LocationStr
 from app.models.access_model import Access
+from app.models.access_records import AccessRecords
 from datetime import datetime
-from utils.date_format import format_chilean_date_time_to_utc
+from utils.date_format import format_chilean_date_times_to_utc
 
 
 class AccessDataMapper:
@@ -41,6 +42,32 @@ class AccessDataMapper:
 
         return str(location_id)
 
+    @staticmethod
+    def _map_access_times(
+        raw_data: list[dict[str, Any]],
+    ) -> tuple[list[str | None], list[str | None]]:
+        """Convert the entry and exit columns of raw records to UTC."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        dates = [record.get("FECHA") or today for record in raw_data]
+
+        # Convert whole columns at once, the time zone is resolved per date
+        entry_times = format_chilean_date_times_to_utc(
+            zip(
+                dates, [str(record.get("TURNOINI")) for record in raw_data], strict=True
+            )
+        )
+        exit_times = format_chilean_date_times_to_utc(
+            zip(
+                dates,
+                [
+                    str(record.get("TURNOFIN")) if record.get("TURNOFIN") else None
+                    for record in raw_data
+                ],
+                strict=True,
+            )
+        )
+        return entry_times, exit_times
+
     @staticmethod
     def map_access_records(raw_data: list[dict[str, Any]]) -> list[Access]:
         """
@@ -52,31 +79,61 @@ class AccessDataMapper:
         Returns:
             List of Access model objects
         """
-        mapped_data = []
-
-        for record in raw_data:
-            date = (
-                record.get("FECHA")
-                if record.get("FECHA")
-                else datetime.now().strftime("%Y-%m-%d")
-            )
-
-            entry_at = str(record.get("TURNOINI"))
-            exit_at = (
-                None if not record.get("TURNOFIN") else str(record.get("TURNOFIN"))
-            )
+        entry_times, exit_times = AccessDataMapper._map_access_times(raw_data)
 
+        mapped_data = []
+        for record, entry_at, exit_at in zip(
+            raw_data, entry_times, exit_times, strict=True
+        ):
             access_record = Access(
                 external_id=record.get("IDCONTACTO", 0),
                 run=record.get("RUT", ""),
                 full_name=record.get("SOCIO", ""),
-                entry_at=format_chilean_date_time_to_utc(date, entry_at),
-                exit_at=None
-                if not exit_at
-                else format_chilean_date_time_to_utc(date, exit_at),
+                entry_at=entry_at,
+                exit_at=exit_at,
                 activity=record.get("ACTIVIDAD", ""),
                 location=AccessDataMapper._map_location(record.get("SEDE", "")),
             )
             mapped_data.append(access_record)
 
         return mapped_data
+
+    @staticmethod
+    def map_access_columns(
+        raw_data: list[dict[str, Any]], records: AccessRecords | None = None
+    ) -> AccessRecords:
+        """
+        Map raw access data straight into a columnar container, without
+        building a model per row.
+
+        Args:
+            raw_data: List of raw access records from the source system
+            records: Container to append to, a new one if None
+
+        Returns:
+            AccessRecords: The container holding the mapped rows
+        """
+        if records is None:
+            records = AccessRecords()
+        entry_times, exit_times = AccessDataMapper._map_access_times(raw_data)
+
+        locations: dict[str, str] = {}
+        for record, entry_at, exit_at in zip(
+            raw_data, entry_times, exit_times, strict=True
+        ):
+            sede = record.get("SEDE", "")
+            location = locations.get(sede)
+            if location is None:
+                location = locations[sede] = AccessDataMapper._map_location(sede)
+
+            records.append(
+                int(record.get("IDCONTACTO", 0)),
+                str(record.get("RUT", "")),
+                str(record.get("SOCIO", "")),
+                entry_at,
+                exit_at,
+                str(record.get("ACTIVIDAD", "")),
+                location,
+            )
+
+        return records
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.upstream_errors import deadline_exceeded_response
+from app.services.metrics import Metrics
+from config.env import config
+from utils.deadline import deadline_scope
+
+# Path pattern -> default deadline in seconds, None for no deadline; the
+# first match wins, other routes get REQUEST_DEADLINE
+ROUTE_DEADLINES: tuple[tuple[re.Pattern, float | None], ...] = (
+    # Event streams and streamed batches last as long as the client wants
+    (re.compile(r"^/access/stream$"), None),
+    (re.compile(r"^/user/(abm/)?batch$"), None),
+    # First download of an InBody file from the source system
+    (re.compile(r"^/user/[^/]+/inbody/[^/]+$"), 120.0),
+)
+
+# Date range reads of /access may fetch up to ACCESS_RANGE_MAX_DAYS days not
+# stored yet from the source, ACCESS_RANGE_CONCURRENCY at a time
+_ACCESS_PATH = re.compile(r"^/access$")
+_RANGE_PARAMS = ("from", "to")
+
+
+def _is_access_range(scope: Scope) -> bool:
+    if not _ACCESS_PATH.match(scope["path"]):
+        return False
+    params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(params.get(name) for name in _RANGE_PARAMS)
+
+
+def request_deadline(scope: Scope) -> float | None:
+    """
+    Seconds the request may take: the route's default, shortened by an
+    `X-Request-Timeout` (seconds) or `X-Request-Deadline` (Unix time) header.
+    """
+    seconds = config.REQUEST_DEADLINE or None
+    if _is_access_range(scope):
+        seconds = config.ACCESS_RANGE_DEADLINE or None
+    else:
+        for pattern, route_seconds in ROUTE_DEADLINES:
+            if pattern.match(scope["path"]):
+                seconds = route_seconds
+                break
+
+    for name, value in scope["headers"]:
+        try:
+            if name == b"x-request-timeout":
+                requested = float(value)
+            elif name == b"x-request-deadline":
+                requested = float(value) - time.time()
+            else:
+                continue
+        except ValueError:
+            continue
+        if not math.isfinite(requested):
+            continue
+        seconds = requested if seconds is None else min(seconds, requested)
+    return seconds
+
+
+class RequestLifetimeMiddleware:
+    """
+    Stop working on a request nobody will read the answer of.
+
+    The handler runs in its own task under the request deadline, which
+    upstream calls read to cut their timeouts and retries short. The task is
+    cancelled when the client disconnects before the response is complete,
+    and answered with 504 when the deadline passes before the response
+    started. Once the response has started the deadline no longer applies,
+    so a large file is not cut off halfway through its download. Upstream
+    work shared with other requests keeps running for them.
+
+    Plain ASGI middleware: the request body is relayed to the handler through
+    a queue so the disconnect can be watched for while it runs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._metrics = Metrics()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = request_deadline(scope)
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+        started = complete = disconnected = False
+        deadline: asyncio.Timeout | None = None
+
+        async def receive_relayed() -> Message:
+            if disconnected and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal started, complete
+            if message["type"] == "http.response.start":
+                started = True
+                if deadline is not None and not deadline.expired():
+                    # The deadline bounds the wait for an answer, not its body
+                    deadline.reschedule(None)
+            elif message["type"] == "http.response.body":
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        async def handle() -> None:
+            nonlocal deadline
+            if seconds is None:
+                await self.app(scope, receive_relayed, send_tracked)
+                return
+            try:
+                async with asyncio.timeout(seconds) as deadline:
+                    await self.app(scope, receive_relayed, send_tracked)
+            except TimeoutError:
+                if not deadline.expired():
+                    raise
+                self._metrics.abandoned_requests.inc("deadline")
+                if not started:
+                    await deadline_exceeded_response()(scope, receive_relayed, send)
+
+        async def watch_disconnect() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                    # Also received once the response is done, nothing to stop then
+                    if not complete:
+                        handler.cancel()
+                    return
+
+        with deadline_scope(seconds):
+            handler = asyncio.create_task(handle())
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await asyncio.wait([handler])
+        finally:
+            watcher.cancel()
+            handler.cancel()
+
+        if handler.cancelled() and disconnected:
+            self._metrics.abandoned_requests.inc("disconnect")
+            self._logger.info(f"Client went away, cancelled {scope['path']}")
+            return
+        handler.result()
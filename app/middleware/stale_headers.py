@@ -0,0 +1,35 @@
+import math
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.stale import track_stale
+
+
+class StaleHeadersMiddleware:
+    """
+    Mark responses built from last known data with `Warning` and `Age`.
+
+    Plain ASGI middleware, so the endpoint runs in the context where the
+    request's staleness is tracked and `note_stale` calls reach it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stale = track_stale()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and stale.age is not None:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"warning", b'110 - "Response is Stale"'),
+                    (b"age", str(math.floor(stale.age)).encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,94 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.metrics import Metrics
+from app.services.source_service import ParseException, UpstreamServerError
+from utils.adaptive_limiter import QueueTimeout
+from utils.circuit_breaker import CircuitOpen
+from utils.deadline import DeadlineExceeded
+
+
+async def queue_timeout_handler(request: Request, exc: QueueTimeout) -> JSONResponse:
+    """
+    Shed a request the upstream cannot take right now instead of letting it
+    wait for a slot.
+
+    Returns:
+        JSONResponse: 503 with a Retry-After estimate
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": {"code": "UPSTREAM_BUSY", "operation": exc.name}},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def circuit_open_handler(request: Request, exc: CircuitOpen) -> JSONResponse:
+    """
+    Fail fast while the upstream is known to be down and there is no last
+    known data to serve instead.
+
+    Returns:
+        JSONResponse: 503 with the time until the next recovery trial
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": {"code": "UPSTREAM_UNAVAILABLE", "operation": exc.name}},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def upstream_server_error_handler(
+    request: Request, exc: UpstreamServerError
+) -> JSONResponse:
+    """
+    Report a server error of the source system that left nothing to serve.
+
+    Returns:
+        JSONResponse: 502
+    """
+    return JSONResponse(
+        status_code=502,
+        content={"detail": {"code": "UPSTREAM_ERROR", "operation": exc.operation}},
+    )
+
+
+async def parse_exception_handler(
+    request: Request, exc: ParseException
+) -> JSONResponse:
+    """
+    Report an answer of the source system that could not be understood.
+
+    Returns:
+        JSONResponse: 502
+    """
+    return JSONResponse(
+        status_code=502, content={"detail": {"code": "UPSTREAM_INVALID_RESPONSE"}}
+    )
+
+
+async def deadline_exceeded_handler(
+    request: Request, exc: DeadlineExceeded
+) -> JSONResponse:
+    """
+    Give up on a request whose deadline passed while waiting on the upstream.
+
+    Returns:
+        JSONResponse: 504
+    """
+    Metrics().abandoned_requests.inc("deadline")
+    return deadline_exceeded_response()
+
+
+def deadline_exceeded_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=504, content={"detail": {"code": "DEADLINE_EXCEEDED"}}
+    )
+
+
+def register_upstream_error_handlers(app: FastAPI) -> None:
+    app.add_exception_handler(QueueTimeout, queue_timeout_handler)
+    app.add_exception_handler(CircuitOpen, circuit_open_handler)
+    app.add_exception_handler(UpstreamServerError, upstream_server_error_handler)
+    app.add_exception_handler(ParseException, parse_exception_handler)
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
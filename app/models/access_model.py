@@ -14,3 +14,49 @@ class Access(BaseSchema):
     exit_at: str | None = None
     activity: str
     location: str
+
+
+class AccessEvent(BaseSchema):
+    id: str | None = None
+    event: str
+    record: Access | None = None
+
+
+class AccessFilter(BaseSchema):
+    """
+    Server-side filter over access records. Times are UTC in the same
+    'YYYY-MM-DDTHH:MM:SSZ' format as `entry_at`, both bounds inclusive.
+    """
+
+    location: str | None = None
+    run: str | None = None
+    activity: str | None = None
+    open_only: bool = False
+    entry_from: str | None = None
+    entry_to: str | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self == AccessFilter()
+
+    def matches(self, record: Access) -> bool:
+        return (
+            (self.location is None or record.location == self.location)
+            and (self.run is None or record.run.upper() == self.run.upper())
+            and (
+                self.activity is None
+                or record.activity.casefold() == self.activity.casefold()
+            )
+            and (not self.open_only or record.exit_at is None)
+            and (self.entry_from is None or record.entry_at >= self.entry_from)
+            and (self.entry_to is None or record.entry_at <= self.entry_to)
+        )
+
+
+class LocationOccupancy(BaseSchema):
+    location: Location
+    inside: int
+    entries: int
+    # Entries by local hour of the day, index 0 is 00:00-00:59
+    entries_by_hour: list[int]
+    average_stay_seconds: float | None = None
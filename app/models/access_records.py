@@ -0,0 +1,305 @@
+"""
+Columnar container for access rows.
+
+A day of access data is tens of thousands of rows with a handful of distinct
+locations and activities and mostly repeated members. Holding them as
+pydantic models costs a validated object and a dict per row; here every
+field is a column in a typed array, strings are interned in per-container
+tables and timestamps are UTC epoch seconds. Models are only built at the
+API edge, when a caller asks for them.
+"""
+
+import calendar
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from typing import Any
+
+from app.models.access_model import Access, AccessFilter
+
+# Value of the exit column for visits with no exit time yet
+NO_EXIT = -1
+
+
+@lru_cache(maxsize=1024)
+def _day_epoch(day: str) -> int:
+    return calendar.timegm(time.strptime(day, "%Y-%m-%d"))
+
+
+def utc_to_epoch(value: str) -> int:
+    """Epoch seconds of a 'YYYY-MM-DDTHH:MM:SSZ' value."""
+    return (
+        _day_epoch(value[:10])
+        + int(value[11:13]) * 3600
+        + int(value[14:16]) * 60
+        + int(value[17:19])
+    )
+
+
+@lru_cache(maxsize=1024)
+def _day_prefix(day_number: int) -> str:
+    return time.strftime("%Y-%m-%dT", time.gmtime(day_number * 86400))
+
+
+# Formatted minutes of the day and seconds, joined instead of formatted per value
+_CLOCK_MINUTES = [
+    f"{hour:02d}:{minute:02d}:" for hour in range(24) for minute in range(60)
+]
+_CLOCK_SECONDS = [f"{second:02d}Z" for second in range(60)]
+
+
+def epoch_to_utc(value: int) -> str:
+    """'YYYY-MM-DDTHH:MM:SSZ' value of epoch seconds."""
+    day_number, seconds = divmod(value, 86400)
+    minutes, second = divmod(seconds, 60)
+    return _day_prefix(day_number) + _CLOCK_MINUTES[minutes] + _CLOCK_SECONDS[second]
+
+
+class StringTable:
+    """Interns strings to small integer ids."""
+
+    __slots__ = ("_ids", "values")
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self._ids[value] = index
+            self.values.append(value)
+        return index
+
+
+class AccessRecords:
+    """
+    Access rows stored column by column.
+
+    Containers returned by shared calls are read by every caller, treat
+    them as immutable once built.
+
+    Usage:
+        records = AccessRecords()
+        records.append(42, "12345678-9", "Jane Doe", "2025-01-01T12:00:00Z",
+                       None, "Musculación", "101")
+        payload = records.to_dicts()
+    """
+
+    __slots__ = (
+        "external_ids",
+        "runs",
+        "full_names",
+        "entries",
+        "exits",
+        "activities",
+        "locations",
+        "run_table",
+        "name_table",
+        "activity_table",
+        "location_table",
+    )
+
+    def __init__(self):
+        self.external_ids = array("q")
+        self.runs = array("i")
+        self.full_names = array("i")
+        self.entries = array("q")
+        self.exits = array("q")
+        self.activities = array("i")
+        self.locations = array("i")
+
+        self.run_table = StringTable()
+        self.name_table = StringTable()
+        self.activity_table = StringTable()
+        self.location_table = StringTable()
+
+    def __len__(self) -> int:
+        return len(self.external_ids)
+
+    def append(
+        self,
+        external_id: int,
+        run: str,
+        full_name: str,
+        entry_at: str,
+        exit_at: str | None,
+        activity: str,
+        location: str,
+    ) -> None:
+        """
+        Add a row.
+
+        Args:
+            entry_at: UTC entry time, 'YYYY-MM-DDTHH:MM:SSZ'
+            exit_at: UTC exit time in the same format, None if still inside
+        """
+        self.external_ids.append(external_id)
+        self.runs.append(self.run_table.intern(run))
+        self.full_names.append(self.name_table.intern(full_name))
+        self.entries.append(utc_to_epoch(entry_at))
+        self.exits.append(NO_EXIT if exit_at is None else utc_to_epoch(exit_at))
+        self.activities.append(self.activity_table.intern(activity))
+        self.locations.append(self.location_table.intern(location))
+
+    def extend(self, other: "AccessRecords") -> None:
+        """Append every row of another container, column by column."""
+        runs = [self.run_table.intern(value) for value in other.run_table.values]
+        names = [self.name_table.intern(value) for value in other.name_table.values]
+        activities = [
+            self.activity_table.intern(value) for value in other.activity_table.values
+        ]
+        locations = [
+            self.location_table.intern(value) for value in other.location_table.values
+        ]
+
+        self.external_ids.extend(other.external_ids)
+        self.runs.extend(map(runs.__getitem__, other.runs))
+        self.full_names.extend(map(names.__getitem__, other.full_names))
+        self.entries.extend(other.entries)
+        self.exits.extend(other.exits)
+        self.activities.extend(map(activities.__getitem__, other.activities))
+        self.locations.extend(map(locations.__getitem__, other.locations))
+
+    def _copy_row(self, other: "AccessRecords", i: int) -> None:
+        self.external_ids.append(other.external_ids[i])
+        self.runs.append(self.run_table.intern(other.run_table.values[other.runs[i]]))
+        self.full_names.append(
+            self.name_table.intern(other.name_table.values[other.full_names[i]])
+        )
+        self.entries.append(other.entries[i])
+        self.exits.append(other.exits[i])
+        self.activities.append(
+            self.activity_table.intern(other.activity_table.values[other.activities[i]])
+        )
+        self.locations.append(
+            self.location_table.intern(other.location_table.values[other.locations[i]])
+        )
+
+    @classmethod
+    def from_models(cls, records: Iterable[Access]) -> "AccessRecords":
+        columns = cls()
+        for record in records:
+            columns.append(
+                record.external_id,
+                record.run,
+                record.full_name,
+                record.entry_at,
+                record.exit_at,
+                record.activity,
+                record.location,
+            )
+        return columns
+
+    def rows(self) -> Iterator[tuple[int, str, str, str, str | None, str, str]]:
+        """
+        Iterate the rows as tuples in `Access` field order, with the times
+        formatted back to UTC strings.
+        """
+        # Column at a time, every distinct time is only formatted once
+        times = {epoch: epoch_to_utc(epoch) for epoch in {*self.entries, *self.exits}}
+        times[NO_EXIT] = None
+        return zip(
+            self.external_ids,
+            map(self.run_table.values.__getitem__, self.runs),
+            map(self.name_table.values.__getitem__, self.full_names),
+            map(times.__getitem__, self.entries),
+            map(times.__getitem__, self.exits),
+            map(self.activity_table.values.__getitem__, self.activities),
+            map(self.location_table.values.__getitem__, self.locations),
+            strict=True,
+        )
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """
+        Serialize the rows as `Access.model_dump(by_alias=True)` would,
+        without building the models.
+        """
+        return [
+            {
+                "externalId": external_id,
+                "run": run,
+                "fullName": full_name,
+                "entryAt": entry_at,
+                "exitAt": exit_at,
+                "activity": activity,
+                "location": location,
+            }
+            for (
+                external_id,
+                run,
+                full_name,
+                entry_at,
+                exit_at,
+                activity,
+                location,
+            ) in self.rows()
+        ]
+
+    def to_models(self) -> list[Access]:
+        # Columns already hold validated types, skip validation
+        return [
+            Access.model_construct(
+                external_id=external_id,
+                run=run,
+                full_name=full_name,
+                entry_at=entry_at,
+                exit_at=exit_at,
+                activity=activity,
+                location=location,
+            )
+            for (
+                external_id,
+                run,
+                full_name,
+                entry_at,
+                exit_at,
+                activity,
+                location,
+            ) in self.rows()
+        ]
+
+    def where(self, access_filter: AccessFilter) -> "AccessRecords":
+        """
+        Get the rows matching a filter, comparing interned ids and epochs
+        instead of strings.
+        """
+        if access_filter.is_empty:
+            return self
+
+        def ids(table: StringTable, match) -> set[int]:
+            return {i for i, value in enumerate(table.values) if match(value)}
+
+        locations = runs = activities = None
+        if access_filter.location is not None:
+            locations = ids(self.location_table, lambda v: v == access_filter.location)
+        if access_filter.run is not None:
+            run = access_filter.run.upper()
+            runs = ids(self.run_table, lambda v: v.upper() == run)
+        if access_filter.activity is not None:
+            activity = access_filter.activity.casefold()
+            activities = ids(self.activity_table, lambda v: v.casefold() == activity)
+        entry_from = (
+            utc_to_epoch(access_filter.entry_from) if access_filter.entry_from else None
+        )
+        entry_to = (
+            utc_to_epoch(access_filter.entry_to) if access_filter.entry_to else None
+        )
+
+        selected = AccessRecords()
+        for i in range(len(self)):
+            if (
+                (locations is None or self.locations[i] in locations)
+                and (runs is None or self.runs[i] in runs)
+                and (activities is None or self.activities[i] in activities)
+                and (not access_filter.open_only or self.exits[i] == NO_EXIT)
+                and (entry_from is None or self.entries[i] >= entry_from)
+                and (entry_to is None or self.entries[i] <= entry_to)
+            ):
+                selected._copy_row(self, i)
+        return selected
@@ -20,3 +20,23 @@ class User(BaseSchema):
     first_name: str
     last_name: str
     access_history: list[UserAccess]
+
+
+class UserBatchRequest(BaseSchema):
+    external_ids: list[int]
+
+
+class UserBatchResult(BaseSchema):
+    external_id: int
+    user: User | None = None
+    error: str | None = None
+
+
+class AbmUserBatchRequest(BaseSchema):
+    runs: list[str]
+
+
+class AbmUserBatchResult(BaseSchema):
+    run: str
+    user: AbmUser | None = None
+    error: str | None = None
@@ -0,0 +1,204 @@
+"""
+Incremental extraction of the `tablaReser` records from the ACCESOS response.
+
+The response is a JSON envelope whose `html` field holds a page with a script
+assigning `tablaReser = [...]`. Instead of decoding the whole envelope, then
+searching the page and decoding the array, `TablaReserStream` is fed the
+response text chunk by chunk: it decodes the `html` string as it arrives,
+locates the array and decodes every record as soon as it is complete. Only
+the current chunk and the record straddling it are held in memory.
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any
+
+from app.mappers.access_mappers import AccessDataMapper
+from app.models.access_records import AccessRecords
+
+_HTML_KEY = re.compile(r'"html"\s*:\s*"')
+_SESSION_EXPIRED = re.compile(r'"sesion"\s*:\s*false')
+# Escape sequence possibly cut at the end of a chunk, or a high surrogate that
+# must be decoded together with the low surrogate following it
+_ESCAPE_TAIL = re.compile(
+    r"(?:\\+u[dD][89abAB][0-9a-fA-F]{2})?\\+(?:u[0-9a-fA-F]{0,3})?$"
+    r"|\\+u[dD][89abAB][0-9a-fA-F]{2}$"
+)
+_ARRAY_START = re.compile(r"tablaReser\s*=\s*\[")
+_SEPARATORS = ", \t\r\n"
+# Longest text kept between chunks while looking for the array start
+_SEARCH_CARRY = 64
+
+_decoder = json.JSONDecoder()
+
+
+class TablaReserStream:
+    """
+    Push parser for the ACCESOS envelope.
+
+    Usage:
+        stream = TablaReserStream()
+        for chunk in chunks:
+            records.extend(stream.feed(chunk))
+        stream.close()
+    """
+
+    def __init__(self):
+        # Envelope: text outside the html value, kept to inspect other fields
+        self._envelope: str = ""
+        self._in_html: bool = False
+        self._html_seen: bool = False
+        # Raw html string text held back until its escape sequence is complete
+        self._raw_tail: str = ""
+
+        # Page: search -> array -> done
+        self._state: str = "search"
+        self._buffer: str = ""
+        self._records: list[dict[str, Any]] = []
+
+    @property
+    def found(self) -> bool:
+        """Whether the `tablaReser` array was found in the page."""
+        return self._state != "search"
+
+    @property
+    def session_expired(self) -> bool:
+        return _SESSION_EXPIRED.search(self._envelope) is not None
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """
+        Consume the next piece of the response text.
+
+        Args:
+            chunk: Response text following the previous chunk
+
+        Returns:
+            list[dict]: Raw records completed by this chunk
+
+        Raises:
+            ValueError: If the html field is not a valid JSON string
+        """
+        position = 0
+        while position < len(chunk):
+            if self._in_html:
+                position = self._feed_html_string(chunk, position)
+            else:
+                position = self._feed_envelope(chunk, position)
+
+        records, self._records = self._records, []
+        return records
+
+    def close(self) -> None:
+        """
+        Check that the response ended in a consistent state.
+
+        Raises:
+            ValueError: If the html field or the array was cut short or invalid
+        """
+        if self._in_html:
+            raise ValueError("Unterminated html field in ACCESOS response")
+        if self._state == "array":
+            raise ValueError("Invalid or unterminated tablaReser array")
+        if not self._html_seen and not self.session_expired:
+            raise ValueError("No html field in ACCESOS response")
+
+    def _feed_envelope(self, chunk: str, position: int) -> int:
+        # Keep a tail long enough to match a key split across chunks
+        start = max(0, len(self._envelope) - 16)
+        self._envelope += chunk[position:]
+        if self._html_seen:
+            return len(chunk)
+
+        match = _HTML_KEY.search(self._envelope, start)
+        if not match:
+            return len(chunk)
+
+        consumed = len(chunk) - (len(self._envelope) - match.end())
+        self._envelope = self._envelope[: match.start()]
+        self._in_html = True
+        self._html_seen = True
+        return consumed
+
+    def _feed_html_string(self, chunk: str, position: int) -> int:
+        """Decode the JSON string value of `html`, passing text to the page."""
+        text = self._raw_tail + chunk[position:]
+        held = len(self._raw_tail)
+        self._raw_tail = ""
+
+        try:
+            html_text, end = scanstring(text, 0)
+        except json.JSONDecodeError:
+            # No closing quote in this chunk, the value continues
+            pass
+        else:
+            # Closing quote of the html value, the rest is envelope again
+            self._in_html = False
+            self._feed_page(html_text)
+            return position + end - held
+
+        tail = _ESCAPE_TAIL.search(text, max(0, len(text) - 16))
+        cut = len(text)
+        if tail:
+            cut = tail.start()
+            while cut > 0 and text[cut - 1] == "\\":
+                cut -= 1
+        self._raw_tail = text[cut:]
+        if cut:
+            self._feed_page(json.loads(f'"{text[:cut]}"'))
+        return len(chunk)
+
+    def _feed_page(self, text: str) -> None:
+        if self._state == "done":
+            return
+
+        if self._state == "search":
+            text = self._buffer + text
+            match = _ARRAY_START.search(text)
+            if not match:
+                self._buffer = text[-_SEARCH_CARRY:]
+                return
+            self._state = "array"
+            self._buffer = ""
+            text = text[match.end() :]
+
+        self._scan_array(self._buffer + text)
+
+    def _scan_array(self, text: str) -> None:
+        position = 0
+        length = len(text)
+        while True:
+            while position < length and text[position] in _SEPARATORS:
+                position += 1
+            if position == length:
+                self._buffer = ""
+                return
+            if text[position] == "]":
+                self._state = "done"
+                self._buffer = ""
+                return
+
+            try:
+                record, position = _decoder.raw_decode(text, position)
+            except json.JSONDecodeError:
+                # Record continues in the next chunk
+                self._buffer = text[position:]
+                return
+            self._records.append(record)
+
+
+def parse_access_chunk(
+    stream: TablaReserStream, text: str
+) -> tuple[TablaReserStream, AccessRecords]:
+    """
+    Parse stage for `ParseExecutor`: feed the next piece of the response and
+    map the records it completes into a new container.
+
+    The stream is returned because in the `process` mode the stage works on
+    a copy of it. Only its small state and the new rows travel between the
+    processes, the caller extends its own container with them.
+
+    Raises:
+        ValueError: If the html field is not a valid JSON string
+    """
+    return stream, AccessDataMapper.map_access_columns(stream.feed(text))
@@ -0,0 +1,360 @@
+"""
+HTML parser backends for the pages scraped from the source system.
+
+Every backend only locates the nodes we need and hands their text to the
+shared builders below, so all of them produce identical models. The lxml
+backend is used when lxml is installed, BeautifulSoup with the pure-Python
+`html.parser` is the fallback.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Protocol
+
+from bs4 import BeautifulSoup, Tag
+
+from app.mappers.access_mappers import AccessDataMapper
+from app.models.user import AbmUser, User, UserAccess
+from utils.date_format import format_chilean_date_times_to_utc
+
+try:
+    import lxml.html
+    from lxml.etree import ParserError
+except ImportError:  # pragma: no cover - depends on the environment
+    lxml = None
+
+IMAGE_URL_PREFIX = "https://storage.googleapis.com/"
+ACCESS_HISTORY_COLUMNS = ["fecha", "sede", "actividad", "registro"]
+
+
+class HtmlParser(Protocol):
+    name: str
+
+    def parse_abm_user(self, html_str: str, run: str) -> AbmUser | None: ...
+
+    def parse_inbody_links(self, html_str: str, base_url: str) -> list[str]: ...
+
+    def parse_user(self, html_str: str) -> User: ...
+
+
+def build_abm_user(cells: list[str], run: str) -> AbmUser | None:
+    """
+    Build the ABM user from the cell texts of the first `table#listado` row.
+
+    Args:
+        cells: Stripped text of every cell of the row
+        run: The RUN that was searched, upper case
+
+    Returns:
+        AbmUser | None: The user or None if the row is for another RUN
+    """
+    if len(cells) < 4 or cells[1].upper() != run:
+        return None
+
+    return AbmUser(
+        run=run,
+        first_name=cells[3],
+        last_name=cells[2],
+        external_id=int(cells[0]),
+    )
+
+
+def build_inbody_links(hrefs: list[str], base_url: str) -> list[str]:
+    """
+    Turn the links of the uploaded files panel into absolute URLs, newest
+    first.
+    """
+    file_links = []
+    for href in hrefs:
+        if href.startswith("uploads_inbody/"):
+            file_links.append(f"{base_url}/{href}")
+        elif href.startswith("http"):
+            file_links.append(href)
+
+    return list(reversed(file_links))
+
+
+def is_access_history_table(header_texts: list[str]) -> bool:
+    joined = " ".join(header_texts)
+    return (
+        all(col in joined for col in ACCESS_HISTORY_COLUMNS)
+        or "historial de accesos" in joined
+    )
+
+
+def build_user(
+    image_name: str | None,
+    admin_comment: str | None,
+    history_rows: list[list[str]],
+) -> User:
+    """
+    Build the profile from the extracted node texts.
+
+    Args:
+        image_name: `name` attribute of the first image of the page
+        admin_comment: Text of the `span.adminComment` holding the contact JSON
+        history_rows: Stripped cell texts of every access history row
+
+    Returns:
+        User: The user profile
+    """
+    image_url: str | None = None
+    if image_name and image_name.startswith(IMAGE_URL_PREFIX):
+        image_url = image_name
+
+    first_name = ""
+    last_name = ""
+    run = ""
+
+    if admin_comment and "CONTACTO: " in admin_comment:
+        json_part = admin_comment.split("CONTACTO: ", 1)[1]
+        try:
+            contact_data: dict[str, Any] = json.loads(json_part)
+            first_name = contact_data.get("CONTACTOCAMPO2", "")
+            last_name = contact_data.get("CONTACTOCAMPO1", "")
+            run = contact_data.get("CONTACTOCAMPO7", "")
+        except json.JSONDecodeError:
+            # Fallback: try to extract using regex
+            first_name_match = re.search(r'"CONTACTOCAMPO2":"([^"]*)"', json_part)
+            last_name_match = re.search(r'"CONTACTOCAMPO1":"([^"]*)"', json_part)
+            run_match = re.search(r'"CONTACTOCAMPO7":"([^"]*)"', json_part)
+            if first_name_match:
+                first_name = first_name_match.group(1)
+            if last_name_match:
+                last_name = last_name_match.group(1)
+            if run_match:
+                run = run_match.group(1)
+
+    # Column order: Fecha, Sede, Actividad, Registro
+    history_rows = [cells for cells in history_rows if len(cells) >= 4]
+
+    locations = []
+    entry_values: list[tuple[str, str | None]] = []
+    exit_values: list[tuple[str, str | None]] = []
+    for cells in history_rows:
+        date_text = cells[0]
+        try:
+            locations.append(int(AccessDataMapper._map_location(cells[1])))
+        except (ValueError, TypeError):
+            locations.append(0)
+
+        entry_time = ""
+        exit_time = None
+        if cells[3]:
+            # Split by space to get entry and exit times
+            time_parts = cells[3].split()
+            entry_time = time_parts[0] + ":00"
+            if len(time_parts) >= 2:
+                exit_time = time_parts[1] + ":00"
+
+        entry_values.append((date_text, entry_time))
+        exit_values.append((date_text, exit_time))
+
+    access_history = [
+        UserAccess(location=location_id, entry_at=entry_at, exit_at=exit_at)
+        for location_id, entry_at, exit_at in zip(
+            locations,
+            format_chilean_date_times_to_utc(entry_values),
+            format_chilean_date_times_to_utc(exit_values),
+            strict=True,
+        )
+    ]
+
+    return User(
+        image_url=image_url,
+        run=run,
+        first_name=first_name,
+        last_name=last_name,
+        access_history=access_history,
+    )
+
+
+class SoupParser:
+    """BeautifulSoup backend on the pure-Python `html.parser`."""
+
+    name = "bs4"
+
+    def parse_abm_user(self, html_str: str, run: str) -> AbmUser | None:
+        soup = BeautifulSoup(html_str, "html.parser")
+        table = soup.find("table", id="listado")
+        if not table or not isinstance(table, Tag):
+            return None
+
+        tbody = table.find("tbody")
+        if not tbody or not isinstance(tbody, Tag):
+            return None
+
+        first_row = tbody.find("tr")
+        if not first_row or not isinstance(first_row, Tag):
+            return None
+
+        cells = [td.get_text(strip=True) for td in first_row.find_all("td")]
+        return build_abm_user(cells, run)
+
+    def parse_inbody_links(self, html_str: str, base_url: str) -> list[str]:
+        soup = BeautifulSoup(html_str, "html.parser")
+        # Find the panel containing uploaded files
+        uploaded_files_panel = soup.find("div", class_="archivosSubidos")
+        if not uploaded_files_panel or not isinstance(uploaded_files_panel, Tag):
+            return []
+
+        # Find the panel body containing the file links
+        panel_body = uploaded_files_panel.find("div", class_="panel-body")
+        if not panel_body or not isinstance(panel_body, Tag):
+            return []
+
+        hrefs = []
+        for link in panel_body.find_all("a", href=True):
+            if isinstance(link, Tag):
+                href = link.get("href")
+                if href and isinstance(href, str):
+                    hrefs.append(href)
+
+        return build_inbody_links(hrefs, base_url)
+
+    def parse_user(self, html_str: str) -> User:
+        soup = BeautifulSoup(html_str, "html.parser")
+
+        # The image URL is in the 'name' attribute, not 'src'
+        image_name = None
+        image_element = soup.find("img")
+        if image_element and isinstance(image_element, Tag):
+            image_name = str(image_element.get("name", ""))
+
+        admin_comment = None
+        admin_comment_element = soup.find("span", class_="adminComment")
+        if admin_comment_element and isinstance(admin_comment_element, Tag):
+            admin_comment = admin_comment_element.get_text()
+
+        history_rows: list[list[str]] = []
+        for table in soup.find_all("table"):
+            if not isinstance(table, Tag):
+                continue
+
+            header_texts = [
+                th.get_text(strip=True).lower()
+                for th in table.find_all("th")
+                if isinstance(th, Tag)
+            ]
+            if not is_access_history_table(header_texts):
+                continue
+
+            tbody = table.find("tbody")
+            if tbody and isinstance(tbody, Tag):
+                for row in tbody.find_all("tr"):
+                    if isinstance(row, Tag):
+                        history_rows.append(
+                            [td.get_text(strip=True) for td in row.find_all("td")]
+                        )
+            break  # Found the access table, no need to check others
+
+        return build_user(image_name, admin_comment, history_rows)
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlParser:
+    """lxml backend, locating the target nodes with XPath in C."""
+
+    name = "lxml"
+
+    @staticmethod
+    def _root(html_str: str) -> Any | None:
+        try:
+            return lxml.html.document_fromstring(html_str)
+        except ParserError:
+            # Empty document
+            return None
+        except ValueError:
+            # Unicode strings with an encoding declaration must go in as bytes
+            return lxml.html.document_fromstring(html_str.encode("utf-8"))
+
+    @staticmethod
+    def _text(element: Any) -> str:
+        # Same result as BeautifulSoup's get_text(strip=True)
+        return "".join(text.strip() for text in element.itertext())
+
+    def parse_abm_user(self, html_str: str, run: str) -> AbmUser | None:
+        root = self._root(html_str)
+        if root is None:
+            return None
+
+        tables = root.xpath("//table[@id='listado']")
+        if not tables:
+            return None
+
+        tbody = tables[0].find(".//tbody")
+        if tbody is None:
+            return None
+
+        first_row = tbody.find(".//tr")
+        if first_row is None:
+            return None
+
+        cells = [self._text(td) for td in first_row.iter("td")]
+        return build_abm_user(cells, run)
+
+    def parse_inbody_links(self, html_str: str, base_url: str) -> list[str]:
+        root = self._root(html_str)
+        if root is None:
+            return []
+
+        panels = root.xpath(f"//div[{_has_class('archivosSubidos')}]")
+        if not panels:
+            return []
+
+        panel_bodies = panels[0].xpath(f".//div[{_has_class('panel-body')}]")
+        if not panel_bodies:
+            return []
+
+        hrefs = [href for href in panel_bodies[0].xpath(".//a/@href") if href]
+        return build_inbody_links(hrefs, base_url)
+
+    def parse_user(self, html_str: str) -> User:
+        root = self._root(html_str)
+        if root is None:
+            return build_user(None, None, [])
+
+        images = root.xpath("//img")
+        image_name = images[0].get("name", "") if images else None
+
+        comments = root.xpath(f"//span[{_has_class('adminComment')}]")
+        admin_comment = "".join(comments[0].itertext()) if comments else None
+
+        history_rows: list[list[str]] = []
+        for table in root.iter("table"):
+            header_texts = [self._text(th).lower() for th in table.iter("th")]
+            if not is_access_history_table(header_texts):
+                continue
+
+            tbodies = table.xpath(".//tbody")
+            if tbodies:
+                for row in tbodies[0].iter("tr"):
+                    history_rows.append([self._text(td) for td in row.iter("td")])
+            break  # Found the access table, no need to check others
+
+        return build_user(image_name, admin_comment, history_rows)
+
+
+def get_html_parser(name: str = "auto") -> HtmlParser:
+    """
+    Get a parser backend by name.
+
+    Args:
+        name: `lxml`, `bs4` or `auto` for the fastest one installed
+
+    Returns:
+        HtmlParser: The parser backend
+    """
+    logger = logging.getLogger("HtmlParser")
+
+    if name in ("auto", "lxml"):
+        if lxml is not None:
+            return LxmlParser()
+        if name == "lxml":
+            logger.warning("lxml is not installed, falling back to BeautifulSoup")
+
+    return SoupParser()
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from app.models.access_model import AccessEvent
+from app.services.access_poller import AccessPoller
+from config.env import config
+from utils.decorators import singleton
+
+
+@singleton
+class AccessBroadcaster:
+    """
+    Fan-out of access snapshot changes to any number of subscribers.
+
+    Subscribers do not get their own queue: every one of them waits on the
+    poller's change signal and reads its delta from the shared snapshot, so a
+    single upstream fetch serves all streams and slow consumers never block
+    the others.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._poller = AccessPoller()
+        self._heartbeat: float = config.ACCESS_STREAM_HEARTBEAT
+        self._subscribers: int = 0
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    async def subscribe(self, last_event_id: str | None) -> AsyncIterator[AccessEvent]:
+        """
+        Stream access events.
+
+        Without a known `last_event_id` the stream starts with a `reset` event
+        followed by the full snapshot. Otherwise only the events after it are
+        replayed before switching to live events.
+
+        Args:
+            last_event_id: Id of the last event the client received
+
+        Yields:
+            AccessEvent: `reset`, `entry`, `exit` or `ping` events
+        """
+        self._subscribers += 1
+        self._logger.info(f"Subscriber joined ({self._subscribers} active)")
+        cursor = last_event_id
+
+        try:
+            while True:
+                signal = self._poller.change_signal
+                events, cursor, reset = self._poller.events_since(cursor)
+                if reset:
+                    yield AccessEvent(event="reset")
+
+                for event_id, record in events:
+                    yield AccessEvent(
+                        id=event_id,
+                        event="entry" if record.exit_at is None else "exit",
+                        record=record,
+                    )
+
+                try:
+                    await asyncio.wait_for(signal.wait(), self._heartbeat)
+                except TimeoutError:
+                    yield AccessEvent(event="ping")
+        finally:
+            self._subscribers -= 1
+            self._logger.info(f"Subscriber left ({self._subscribers} active)")
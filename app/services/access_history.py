@@ -0,0 +1,107 @@
+import logging
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.models.access_model import AccessFilter
+from app.models.access_records import AccessRecords
+from app.services.access_poller import AccessPoller
+from app.services.access_store import AccessStore
+from app.services.source_service import UPSTREAM_ERRORS, SourceService
+from config.env import config
+from utils.adaptive_limiter import Priority, upstream_priority
+from utils.decorators import singleton
+from utils.fan_out import map_as_completed
+
+
+@singleton
+class AccessHistory:
+    """
+    Access records of any range of days.
+
+    Closed days are fetched from the source system once, one request per day
+    run in parallel, and served from the local store afterwards. Only the
+    current day is read live, from the poller snapshot.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._source_service = SourceService()
+        self._access_poller = AccessPoller()
+        self._store = AccessStore()
+        self._concurrency: int = config.ACCESS_RANGE_CONCURRENCY
+
+    async def get_range(
+        self,
+        start: date,
+        end: date,
+        access_filter: AccessFilter | None = None,
+    ) -> AccessRecords:
+        """
+        Get the access records between two local dates.
+
+        Args:
+            start: First day of the range
+            end: Last day of the range, inclusive. Future days are ignored
+            access_filter: Only the records matching this filter
+
+        Returns:
+            AccessRecords: The records ordered by day and entry time
+
+        Raises:
+            Exception: If a missing day could not be fetched from the source
+        """
+        today = datetime.now(ZoneInfo("America/Santiago")).date()
+        end = min(end, today)
+        if start > end:
+            return AccessRecords()
+
+        access_filter = access_filter or AccessFilter()
+        records = AccessRecords()
+        if start < today:
+            last_closed = min(end, today - timedelta(days=1))
+            await self._fill(start, last_closed)
+            stored = await self._store.get_range(
+                start.isoformat(),
+                last_closed.isoformat(),
+                location=access_filter.location,
+                run=access_filter.run,
+            )
+            records = stored.where(access_filter)
+
+        if end == today:
+            if not self._access_poller.ready:
+                self._access_poller.apply(await self._source_service.get_today_access())
+            today_records = self._access_poller.query(access_filter)[0]
+            records.extend(AccessRecords.from_models(today_records))
+
+        return records
+
+    async def _fill(self, start: date, end: date) -> None:
+        """Fetch and store every closed day of the range that is not stored."""
+        stored = await self._store.stored_days(start.isoformat(), end.isoformat())
+        missing = [
+            day.isoformat()
+            for day in (
+                start + timedelta(days=n) for n in range((end - start).days + 1)
+            )
+            if day.isoformat() not in stored
+        ]
+        if not missing:
+            return
+
+        self._logger.info(f"Fetching {len(missing)} missing days from the source")
+        results = map_as_completed(
+            missing,
+            self._source_service.get_access_columns_by_date,
+            self._concurrency,
+            errors=UPSTREAM_ERRORS,
+        )
+        # Bulk sync, queued behind interactive upstream calls. Closing the
+        # results on error cancels the days still being fetched.
+        with upstream_priority(Priority.BACKGROUND):
+            async with aclosing(results):
+                async for day, day_records, error in results:
+                    if error is not None:
+                        raise error
+                    await self._store.save_day(day, day_records)
@@ -0,0 +1,122 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+from app.models.access_model import Access, AccessFilter
+
+# Position of a record in the entry time order, also its identity
+type OrderKey = tuple[str, int, str]
+
+
+def order_key(record: Access) -> OrderKey:
+    return (record.entry_at, record.external_id, record.location)
+
+
+def format_page_cursor(key: OrderKey) -> str:
+    entry_at, external_id, location = key
+    return f"{entry_at},{external_id},{location}"
+
+
+def parse_page_cursor(cursor: str) -> OrderKey:
+    """
+    Raises:
+        ValueError: If the cursor was not returned by `format_page_cursor`
+    """
+    entry_at, external_id, location = cursor.split(",")
+    return (entry_at, int(external_id), location)
+
+
+class AccessIndex:
+    """
+    Secondary indexes over a day of access records.
+
+    Records are kept sorted by entry time, with hash indexes by location, RUN,
+    activity and open visits pointing into that order. They are updated as
+    records are merged, so a filtered page is an intersection and a bisect
+    instead of a scan of the whole day.
+    """
+
+    def __init__(self):
+        self._records: dict[OrderKey, Access] = {}
+        self._order: list[OrderKey] = []
+        self._by_location: defaultdict[str, set[OrderKey]] = defaultdict(set)
+        self._by_run: defaultdict[str, set[OrderKey]] = defaultdict(set)
+        self._by_activity: defaultdict[str, set[OrderKey]] = defaultdict(set)
+        self._open: set[OrderKey] = set()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._order.clear()
+        self._by_location.clear()
+        self._by_run.clear()
+        self._by_activity.clear()
+        self._open.clear()
+
+    def add(self, record: Access) -> None:
+        """Insert a record, or replace it when only its exit time changed."""
+        key = order_key(record)
+        if key not in self._records:
+            insort(self._order, key)
+            self._by_location[record.location].add(key)
+            self._by_run[record.run.upper()].add(key)
+            self._by_activity[record.activity.casefold()].add(key)
+
+        self._records[key] = record
+        if record.exit_at is None:
+            self._open.add(key)
+        else:
+            self._open.discard(key)
+
+    def query(
+        self,
+        access_filter: AccessFilter,
+        after: OrderKey | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Access], OrderKey | None]:
+        """
+        Get one page of the records matching a filter, in entry time order.
+
+        Args:
+            access_filter: The filter to apply
+            after: Key of the last record of the previous page
+            limit: Maximum number of records, all of them if None
+
+        Returns:
+            tuple: The records and the key to pass as `after` for the next
+            page, None on the last page
+        """
+        candidates: list[set[OrderKey]] = []
+        if access_filter.location is not None:
+            candidates.append(self._by_location.get(access_filter.location, set()))
+        if access_filter.run is not None:
+            candidates.append(self._by_run.get(access_filter.run.upper(), set()))
+        if access_filter.activity is not None:
+            candidates.append(
+                self._by_activity.get(access_filter.activity.casefold(), set())
+            )
+        if access_filter.open_only:
+            candidates.append(self._open)
+
+        if candidates:
+            candidates.sort(key=len)
+            keys = sorted(candidates[0].intersection(*candidates[1:]))
+        else:
+            keys = self._order
+
+        start = 0
+        if access_filter.entry_from is not None:
+            start = bisect_left(keys, (access_filter.entry_from,))
+        if after is not None:
+            start = max(start, bisect_right(keys, after))
+
+        end = len(keys)
+        if access_filter.entry_to is not None:
+            # Every key of the last second sorts before the next character
+            end = bisect_right(keys, (access_filter.entry_to + "\x00",))
+
+        stop = end if limit is None else min(end, start + limit)
+        page = [self._records[key] for key in keys[start:stop]]
+        next_key = keys[stop - 1] if stop < end and page else None
+        return page, next_key
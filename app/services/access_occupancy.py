@@ -0,0 +1,94 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.const.enum import Location, LocationStr
+from app.models import access_model
+from app.models.access_model import Access, LocationOccupancy
+
+_CHILE_TZ = ZoneInfo("America/Santiago")
+
+
+class _Counters:
+    __slots__ = ("inside", "entries_by_hour", "closed_visits", "stay_seconds")
+
+    def __init__(self):
+        self.inside: int = 0
+        self.entries_by_hour: list[int] = [0] * 24
+        self.closed_visits: int = 0
+        self.stay_seconds: float = 0.0
+
+
+class OccupancyCounters:
+    """
+    Running occupancy figures of every location for the current day.
+
+    Each merged record adjusts the counters of its location by the difference
+    with the version it replaces, so reading them costs one pass over the
+    locations and never a scan of the day's records.
+    """
+
+    def __init__(self):
+        self._counters: dict[Location, _Counters] = {
+            location: _Counters() for location in Location
+        }
+
+    def clear(self) -> None:
+        for location in Location:
+            self._counters[location] = _Counters()
+
+    def update(self, previous: Access | None, record: Access) -> None:
+        """
+        Account for a new record or for a record whose exit time changed.
+
+        Args:
+            previous: The version of the record being replaced, if any
+            record: The new version of the record
+        """
+        counters = self._counters_for(record)
+        if counters is None:
+            return
+
+        if previous is None:
+            hour = datetime.fromisoformat(record.entry_at).astimezone(_CHILE_TZ).hour
+            counters.entries_by_hour[hour] += 1
+        else:
+            self._count_visit(counters, previous, -1)
+        self._count_visit(counters, record, 1)
+
+    def _counters_for(self, record: Access) -> _Counters | None:
+        try:
+            return self._counters[Location(int(record.location))]
+        except ValueError:
+            # Location unknown to the enum, mapped to "0"
+            return None
+
+    @staticmethod
+    def _count_visit(counters: _Counters, record: Access, sign: int) -> None:
+        if record.exit_at is None:
+            counters.inside += sign
+            return
+
+        stay = datetime.fromisoformat(record.exit_at) - datetime.fromisoformat(
+            record.entry_at
+        )
+        counters.closed_visits += sign
+        counters.stay_seconds += sign * stay.total_seconds()
+
+    def snapshot(self) -> list[LocationOccupancy]:
+        """Return the current figures of every location."""
+        return [
+            LocationOccupancy(
+                location=access_model.Location(
+                    id=location.value, name=LocationStr[location.name].value
+                ),
+                inside=counters.inside,
+                entries=sum(counters.entries_by_hour),
+                entries_by_hour=list(counters.entries_by_hour),
+                average_stay_seconds=(
+                    counters.stay_seconds / counters.closed_visits
+                    if counters.closed_visits
+                    else None
+                ),
+            )
+            for location, counters in self._counters.items()
+        ]
@@ -0,0 +1,293 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from app.const.scheduler import get_sleep_seconds
+from app.models.access_model import Access, AccessFilter, LocationOccupancy
+from app.services.access_index import AccessIndex, OrderKey
+from app.services.access_occupancy import OccupancyCounters
+from app.services.source_service import UPSTREAM_ERRORS, SourceService
+from config.env import config
+from utils.adaptive_limiter import Priority, upstream_priority
+from utils.decorators import singleton
+
+type AccessKey = tuple[int, str, str]
+
+
+def access_key(record: Access) -> AccessKey:
+    """
+    Identity of an access row. The upstream feed has no row id, so a visit is
+    identified by member, location and entry time.
+    """
+    return (record.external_id, record.location, record.entry_at)
+
+
+@singleton
+class AccessPoller:
+    """
+    Background poller that keeps a single authoritative snapshot of today's
+    access records and a versioned change log clients can read incrementally.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._source_service = SourceService()
+        self._interval: float = config.ACCESS_POLL_INTERVAL
+        self._task: asyncio.Task | None = None
+
+        self._day: str = self._today()
+        self._version: int = 0
+        # Records ordered by the version that last changed them, oldest first
+        self._records: OrderedDict[AccessKey, Access] = OrderedDict()
+        self._versions: dict[AccessKey, int] = {}
+        self._index = AccessIndex()
+        self._occupancy = OccupancyCounters()
+        self._ready: bool = False
+        self._applied_at: float = 0.0
+        self._open: bool = False
+        # Replaced on every change so waiters wake up exactly once per update
+        self._changed = asyncio.Event()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(ZoneInfo("America/Santiago")).strftime("%Y-%m-%d")
+
+    @property
+    def ready(self) -> bool:
+        """Whether the snapshot holds at least one successful poll of today."""
+        self._roll_day()
+        return self._ready
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was last confirmed by a full fetch."""
+        return time.monotonic() - self._applied_at
+
+    @property
+    def cursor(self) -> str:
+        return f"{self._day}.{self._version}"
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="access-poller")
+            self._logger.info(f"Access poller started (interval {self._interval}s)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._logger.info("Access poller stopped")
+
+    async def _run(self) -> None:
+        # Polls queue behind interactive upstream calls
+        with upstream_priority(Priority.BACKGROUND):
+            while True:
+                sleep_seconds = get_sleep_seconds()
+                if sleep_seconds > 0:
+                    if self._open:
+                        # One last sweep after closing to catch late exits
+                        self._open = False
+                        await self.poll_once()
+                    self._logger.info(
+                        f"Outside opening hours, poller idle for {int(sleep_seconds)}s"
+                    )
+                    await asyncio.sleep(sleep_seconds)
+                    continue
+
+                self._open = True
+                await self.poll_once()
+                await asyncio.sleep(self._interval)
+
+    async def poll_once(self) -> None:
+        try:
+            records = await self._source_service.get_today_access()
+        except UPSTREAM_ERRORS as e:
+            self._logger.error(f"Access poll failed: {str(e)}")
+            return
+
+        changed = self.apply(records)
+        if changed:
+            self._logger.info(f"Access snapshot updated: {len(changed)} changes")
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._version = 0
+            self._records.clear()
+            self._versions.clear()
+            self._index.clear()
+            self._occupancy.clear()
+            self._ready = False
+            self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def change_signal(self) -> asyncio.Event:
+        """
+        Event set on the next snapshot change. Take it before reading the
+        snapshot so a change made while the reader is busy is never missed.
+        """
+        return self._changed
+
+    def apply(self, records: list[Access]) -> list[Access]:
+        """
+        Merge a full fetch of today's records into the snapshot.
+
+        Args:
+            records: Today's records as returned by the source system
+
+        Returns:
+            list[Access]: Records that are new or whose exit time changed
+        """
+        self._roll_day()
+        changed: list[Access] = []
+
+        for record in records:
+            key = access_key(record)
+            current = self._records.get(key)
+            if current is not None and current.exit_at == record.exit_at:
+                continue
+
+            self._version += 1
+            self._records[key] = record
+            self._records.move_to_end(key)
+            self._versions[key] = self._version
+            self._index.add(record)
+            self._occupancy.update(current, record)
+            changed.append(record)
+            # The member's cached access history no longer matches upstream
+            self._source_service.mark_profile_stale(record.external_id)
+
+        self._ready = True
+        self._applied_at = time.monotonic()
+        if changed:
+            self._notify()
+        return changed
+
+    def checkpoint(self) -> dict[str, Any]:
+        """Get today's snapshot with its change versions, JSON-serializable."""
+        self._roll_day()
+        return {
+            "day": self._day,
+            "version": self._version,
+            "age": self.age if self._ready else None,
+            "records": [
+                (self._versions[key], record.model_dump())
+                for key, record in self._records.items()
+            ],
+        }
+
+    def restore(self, state: dict[str, Any], elapsed: float) -> bool:
+        """
+        Load a snapshot returned by `checkpoint` if it is from today, keeping
+        its versions so the cursors clients hold stay valid.
+
+        Args:
+            state: The saved snapshot
+            elapsed: Seconds since it was saved
+
+        Returns:
+            bool: Whether the snapshot was loaded
+        """
+        self._roll_day()
+        if state["day"] != self._day or state["age"] is None or self._ready:
+            return False
+
+        for version, data in state["records"]:
+            record = Access.model_validate(data)
+            key = access_key(record)
+            self._records[key] = record
+            self._versions[key] = version
+            self._index.add(record)
+            self._occupancy.update(None, record)
+
+        self._version = state["version"]
+        self._ready = True
+        self._applied_at = time.monotonic() - state["age"] - elapsed
+        self._notify()
+        return True
+
+    def snapshot(self) -> list[Access]:
+        """Return every record of today, ordered by their last change."""
+        self._roll_day()
+        return list(self._records.values())
+
+    def query(
+        self,
+        access_filter: AccessFilter,
+        after: OrderKey | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Access], OrderKey | None]:
+        """
+        Get one page of today's records matching a filter, in entry time
+        order. See `AccessIndex.query`.
+        """
+        self._roll_day()
+        return self._index.query(access_filter, after, limit)
+
+    def occupancy(self) -> list[LocationOccupancy]:
+        """Return today's running occupancy figures of every location."""
+        self._roll_day()
+        return self._occupancy.snapshot()
+
+    def changes_since(self, since: str | None) -> tuple[list[Access], str, bool]:
+        """
+        Get the records that changed after the given cursor.
+
+        Args:
+            since: Cursor previously returned to the client
+
+        Returns:
+            tuple: Changed records, the new cursor and whether the client must
+            discard its state (unknown cursor or a new day)
+        """
+        events, cursor, reset = self.events_since(since)
+        return [record for _, record in events], cursor, reset
+
+    def events_since(
+        self, since: str | None
+    ) -> tuple[list[tuple[str, Access]], str, bool]:
+        """
+        Same as `changes_since`, pairing every record with the cursor of its
+        own change so streams can resume from any delivered event.
+        """
+        self._roll_day()
+        version = self._parse_cursor(since)
+        if version is None:
+            version = 0
+            reset = True
+        else:
+            reset = False
+
+        events: list[tuple[str, Access]] = []
+        for key in reversed(self._records):
+            record_version = self._versions[key]
+            if record_version <= version:
+                break
+            events.append((f"{self._day}.{record_version}", self._records[key]))
+        events.reverse()
+
+        return events, self.cursor, reset
+
+    def _parse_cursor(self, since: str | None) -> int | None:
+        if not since:
+            return None
+        day, _, version = since.rpartition(".")
+        if day != self._day or not version.isdigit():
+            return None
+        version_number = int(version)
+        if version_number > self._version:
+            return None
+        return version_number
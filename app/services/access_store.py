@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+from app.models.access_records import AccessRecords
+from config.env import config
+from utils.decorators import singleton
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS access (
+    date TEXT NOT NULL,
+    external_id INTEGER NOT NULL,
+    run TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    entry_at TEXT NOT NULL,
+    exit_at TEXT,
+    activity TEXT NOT NULL,
+    location TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS access_date_location ON access (date, location);
+-- RUNs are stored as sent upstream and matched case-insensitively
+DROP INDEX IF EXISTS access_run;
+CREATE INDEX IF NOT EXISTS access_run_upper ON access (UPPER(run));
+CREATE TABLE IF NOT EXISTS access_day (
+    date TEXT PRIMARY KEY,
+    record_count INTEGER NOT NULL,
+    stored_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+);
+"""
+
+_COLUMNS = "external_id, run, full_name, entry_at, exit_at, activity, location"
+
+
+@singleton
+class AccessStore:
+    """
+    Local SQLite store of the access records of closed days.
+
+    Past days never change upstream, so each one is written once, together
+    with a row in `access_day` marking it complete, and read from disk from
+    then on. The database runs in WAL mode so range reads are not blocked by
+    a day being written. Queries run in a worker thread.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._path = Path(config.ACCESS_STORE_PATH)
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._logger.info(f"Access store opened at {self._path}")
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def stored_days(self, start: str, end: str) -> set[str]:
+        """
+        Get the days of a range that are already stored.
+
+        Args:
+            start: First local date, 'YYYY-MM-DD'
+            end: Last local date, inclusive
+
+        Returns:
+            set[str]: The stored dates
+        """
+        return await asyncio.to_thread(self._stored_days, start, end)
+
+    def _stored_days(self, start: str, end: str) -> set[str]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT date FROM access_day WHERE date BETWEEN ? AND ?",
+                (start, end),
+            )
+            return {date for (date,) in rows}
+
+    async def save_day(self, day: str, records: AccessRecords) -> None:
+        """
+        Store the complete records of a closed day, replacing any partial
+        copy of it.
+
+        Args:
+            day: Local date, 'YYYY-MM-DD'
+            records: Every access record of that day
+        """
+        await asyncio.to_thread(self._save_day, day, records)
+
+    def _save_day(self, day: str, records: AccessRecords) -> None:
+        rows = [(day, *row) for row in records.rows()]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM access WHERE date = ?", (day,))
+                connection.executemany(
+                    f"INSERT INTO access (date, {_COLUMNS})"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO access_day (date, record_count)"
+                    " VALUES (?, ?)",
+                    (day, len(rows)),
+                )
+
+    async def get_range(
+        self,
+        start: str,
+        end: str,
+        location: str | None = None,
+        run: str | None = None,
+    ) -> AccessRecords:
+        """
+        Get the stored records of a range of days, ordered by day and entry.
+
+        Args:
+            start: First local date, 'YYYY-MM-DD'
+            end: Last local date, inclusive
+            location: Only records of this location id
+            run: Only records of this RUN
+
+        Returns:
+            AccessRecords: The stored records
+        """
+        return await asyncio.to_thread(self._get_range, start, end, location, run)
+
+    def _get_range(
+        self, start: str, end: str, location: str | None, run: str | None
+    ) -> AccessRecords:
+        query = f"SELECT {_COLUMNS} FROM access WHERE date BETWEEN ? AND ?"
+        params: list[str] = [start, end]
+        if location is not None:
+            query += " AND location = ?"
+            params.append(location)
+        if run is not None:
+            query += " AND UPPER(run) = ?"
+            params.append(run.upper())
+
+        records = AccessRecords()
+        with self._lock:
+            for row in self._connect().execute(
+                query + " ORDER BY date, entry_at", params
+            ):
+                records.append(*row)
+        return records
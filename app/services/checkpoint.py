@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+import gzip
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from app.services.access_poller import AccessPoller
+from app.services.source_service import SourceService
+from config.env import config
+from utils.decorators import singleton
+
+# Bumped when the saved layout changes, older checkpoints are ignored
+FORMAT_VERSION = 1
+
+# Raised by a checkpoint that cannot be read or does not have the saved layout
+_INVALID_CHECKPOINT = (
+    OSError,
+    EOFError,
+    ValueError,
+    LookupError,
+    TypeError,
+    AttributeError,
+)
+# Raised by a save that cannot be written or serialized
+_SAVE_FAILED = (OSError, TypeError, ValueError)
+
+
+@singleton
+class Checkpoint:
+    """
+    Warm restart state: the upstream session cookies, today's access snapshot
+    and the member caches, saved to a local file at intervals and on shutdown
+    and loaded at startup.
+
+    The state is collected on the event loop, so it is consistent, and
+    written from a worker thread to a temporary file renamed over the
+    previous one, so a crash mid-write never leaves a broken checkpoint. The
+    file holds session cookies and is only readable by its owner.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._path = Path(config.CHECKPOINT_PATH)
+        self._interval: float = config.CHECKPOINT_INTERVAL
+        self._source_service = SourceService()
+        self._access_poller = AccessPoller()
+        self._task: asyncio.Task | None = None
+
+    async def load(self) -> bool:
+        """
+        Restore the saved state, if any. Call before the session and the
+        poller are started.
+
+        Returns:
+            bool: Whether a checkpoint was loaded
+        """
+        if not self._path.exists():
+            return False
+        try:
+            state = await asyncio.to_thread(self._read)
+            if state.get("format") != FORMAT_VERSION:
+                self._logger.info(f"Ignoring checkpoint of another format {self._path}")
+                return False
+
+            elapsed = max(0.0, time.time() - state["saved_at"])
+            self._source_service.restore(state["source"], elapsed)
+            snapshot_loaded = self._access_poller.restore(state["access"], elapsed)
+        except _INVALID_CHECKPOINT as e:
+            self._logger.error(f"Could not load checkpoint {self._path}: {str(e)}")
+            return False
+
+        self._logger.info(
+            f"Restored checkpoint from {int(elapsed)}s ago"
+            f"{'' if snapshot_loaded else ', access snapshot outdated'}"
+        )
+        return True
+
+    async def save(self) -> None:
+        state = {
+            "format": FORMAT_VERSION,
+            "saved_at": time.time(),
+            "source": self._source_service.checkpoint(),
+            "access": self._access_poller.checkpoint(),
+        }
+        await asyncio.to_thread(self._write, state)
+
+    def start(self) -> None:
+        if self._interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run(), name="checkpoint")
+
+    async def stop(self) -> None:
+        """Stop the periodic saves and save one last time."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.save()
+        except _SAVE_FAILED as e:
+            self._logger.error(f"Could not save checkpoint {self._path}: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.save()
+            except _SAVE_FAILED as e:
+                self._logger.error(f"Could not save checkpoint {self._path}: {str(e)}")
+
+    def _read(self) -> dict[str, Any]:
+        with gzip.open(self._path, "rt", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _write(self, state: dict[str, Any]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self._path.with_name(f"{self._path.name}.tmp")
+        # A file left by a crashed write keeps its mode when reopened, so it is
+        # replaced by one created with owner-only permissions
+        temporary.unlink(missing_ok=True)
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with (
+                os.fdopen(descriptor, "wb") as raw,
+                gzip.open(raw, "wt", encoding="utf-8", compresslevel=1) as file,
+            ):
+                json.dump(state, file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temporary, self._path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
@@ -0,0 +1,53 @@
+from collections.abc import Iterator
+
+from utils.decorators import singleton
+from utils.metrics import SIZE_BUCKETS, Counter, Histogram
+
+
+@singleton
+class Metrics:
+    """
+    Process-wide latency, size and retry metrics of the upstream calls, and
+    counts of abandoned requests.
+
+    Observing costs a dict lookup and a bisect, the text rendering only
+    happens when `/metrics` is scraped.
+    """
+
+    def __init__(self):
+        self.upstream_seconds = Histogram(
+            "spl_upstream_request_seconds",
+            "Duration of upstream requests, body included, by operation",
+            ("operation",),
+        )
+        self.upstream_bytes = Histogram(
+            "spl_upstream_response_bytes",
+            "Size of upstream response bodies by operation",
+            ("operation",),
+            buckets=SIZE_BUCKETS,
+        )
+        self.stage_seconds = Histogram(
+            "spl_parse_stage_seconds",
+            "Duration of parse and map stages, pool wait included, by stage",
+            ("stage",),
+        )
+        self.relogins = Counter(
+            "spl_upstream_relogins_total",
+            "Re-authentications after an expired session, by operation",
+            ("operation",),
+        )
+        self.abandoned_requests = Counter(
+            "spl_requests_abandoned_total",
+            "Requests given up before completion, by reason",
+            ("reason",),
+        )
+
+    def render(self) -> Iterator[str]:
+        for metric in (
+            self.upstream_seconds,
+            self.upstream_bytes,
+            self.stage_seconds,
+            self.relogins,
+            self.abandoned_requests,
+        ):
+            yield from metric.render()
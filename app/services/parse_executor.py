@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from app.services.metrics import Metrics
+from config.env import config
+from utils.decorators import singleton
+
+
+@singleton
+class ParseExecutor:
+    """
+    Runs CPU-bound parse and map stages off the event loop.
+
+    `PARSE_EXECUTOR_MODE` selects `inline`, `thread` or `process`. Payloads
+    smaller than `PARSE_INLINE_MAX_SIZE` characters always run inline, since
+    handing them to a pool costs more than parsing them. With the `process`
+    mode the stage function and its arguments must be picklable.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._mode: str = config.PARSE_EXECUTOR_MODE
+        self._workers: int = config.PARSE_WORKERS
+        self._inline_max_size: int = config.PARSE_INLINE_MAX_SIZE
+        self._executor: Executor | None = None
+        self._metrics = Metrics()
+
+        self.pending: int = 0
+        self.max_pending: int = 0
+        self.inline_runs: int = 0
+        self.offloaded_runs: int = 0
+
+        if self._mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="parse"
+            )
+        elif self._mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        elif self._mode != "inline":
+            self._logger.warning(f"Unknown parse mode {self._mode!r}, using inline")
+            self._mode = "inline"
+
+        self._logger.info(f"Parsing in {self._mode} mode ({self._workers} workers)")
+
+    @property
+    def inline_max_size(self) -> int:
+        """Payload size, in characters, from which stages go to the pool."""
+        return self._inline_max_size
+
+    async def run[T](self, size: int, func: Callable[..., T], *args) -> T:
+        """
+        Run a parse stage inline or in the pool depending on payload size.
+
+        Args:
+            size: Size of the payload being parsed, in characters
+            func: The stage function
+            *args: Arguments for the stage function
+
+        Returns:
+            The result of the stage function
+        """
+        with self._metrics.stage_seconds.time(func.__name__):
+            if self._executor is None or size < self._inline_max_size:
+                self.inline_runs += 1
+                return func(*args)
+
+            self.offloaded_runs += 1
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+            finally:
+                self.pending -= 1
+
+    def stats(self) -> dict[str, int | str]:
+        """
+        Get the execution mode and queue counters.
+
+        Returns:
+            dict: Mode, stages waiting or running in the pool, the highest
+            such depth seen and the number of inline and offloaded runs
+        """
+        return {
+            "mode": self._mode,
+            "workers": self._workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "inline_runs": self.inline_runs,
+            "offloaded_runs": self.offloaded_runs,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
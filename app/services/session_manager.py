@@ -0,0 +1,175 @@
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from app.services.metrics import Metrics
+from config.env import config
+
+# Expiries seen sooner than this after login are treated as upstream restarts
+# rather than as the session lifetime
+MIN_SESSION_LIFETIME = 60.0
+
+
+class SessionManager:
+    """
+    Owner of the upstream login session.
+
+    Every successful login starts a new session generation. Callers remember
+    the generation they used for a request and, when it turns out to be
+    expired, ask for a refresh of that generation: only the first caller logs
+    in, everyone else waits on the lock and reuses the newer session.
+
+    The lifetime of a session is learned from the expiries observed upstream
+    (or taken from config) and a background task logs in again shortly before
+    it runs out, so request paths rarely pay the login latency.
+
+    A session restored from a checkpoint is used as is: if it has expired
+    meanwhile the first request finds out and logs in again like for any
+    other expiry.
+    """
+
+    def __init__(
+        self,
+        login_func: Callable[[], Awaitable[Any]],
+        login_errors: tuple[type[Exception], ...],
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._login_func = login_func
+        # Failures of a login, retried later by the proactive refresh
+        self._login_errors = login_errors
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+        self._generation: int = 0
+        self._logged_in_at: float | None = None
+        self._lifetime: float | None = config.SOURCE_SESSION_TTL or None
+        # Whether the current session was restored rather than logged into
+        self._restored: bool = False
+        self._refresh_ratio: float = config.SOURCE_SESSION_REFRESH_RATIO
+
+        self.logins: int = 0
+        self.expirations: int = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def lifetime(self) -> float | None:
+        """Session lifetime in seconds, None until configured or observed."""
+        return self._lifetime
+
+    async def start(self, background: bool = False) -> None:
+        """
+        Log in, unless a session was restored, and start the proactive
+        refresh task.
+
+        Args:
+            background: Return right away and leave the initial login to the
+                refresh task, so startup does not wait for the upstream
+        """
+        if not background and self._logged_in_at is None:
+            await self.refresh(self._generation, expired=False)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="session-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def refresh(
+        self, seen_generation: int, expired: bool = True, operation: str | None = None
+    ) -> int:
+        """
+        Log in again unless the session was already renewed.
+
+        Args:
+            seen_generation: Generation the caller's failed request used
+            expired: Whether the upstream reported the session as expired, used
+                to learn the session lifetime
+            operation: Upstream operation that found the session expired, for
+                the re-login counter
+
+        Returns:
+            int: The current session generation
+        """
+        async with self._lock:
+            if self._generation != seen_generation:
+                return self._generation
+
+            if expired:
+                self._observe_expiry()
+
+            await self._login_func()
+            self._generation += 1
+            self._logged_in_at = time.monotonic()
+            self._restored = False
+            self.logins += 1
+            if expired and operation is not None:
+                Metrics().relogins.inc(operation)
+            self._logger.info(f"Session generation {self._generation} started")
+
+        return self._generation
+
+    def checkpoint(self) -> dict[str, float | None]:
+        """Login time (Unix time) and learned lifetime of the session."""
+        return {
+            "logged_in_at": None
+            if self._logged_in_at is None
+            else time.time() - (time.monotonic() - self._logged_in_at),
+            "lifetime": self._lifetime,
+        }
+
+    def restore(self, state: dict[str, float | None]) -> None:
+        """
+        Adopt a session saved by `checkpoint`, whose cookies the client
+        already holds. Must be called before `start`.
+        """
+        if state["logged_in_at"] is not None:
+            age = max(0.0, time.time() - state["logged_in_at"])
+            self._logged_in_at = time.monotonic() - age
+            self._restored = True
+        if state["lifetime"] is not None and self._lifetime is None:
+            self._lifetime = state["lifetime"]
+
+    def _observe_expiry(self) -> None:
+        self.expirations += 1
+        if self._logged_in_at is None or self._restored:
+            # The upstream may have dropped a restored session for any reason
+            return
+
+        observed = time.monotonic() - self._logged_in_at
+        if observed < MIN_SESSION_LIFETIME:
+            return
+        if self._lifetime is None or observed < self._lifetime:
+            self._lifetime = observed
+            self._logger.info(f"Observed session lifetime of {int(observed)}s")
+
+    def _refresh_due_in(self) -> float | None:
+        if self._logged_in_at is None:
+            # Never logged in
+            return 0.0
+        if self._lifetime is None:
+            return None
+        refresh_at = self._logged_in_at + self._lifetime * self._refresh_ratio
+        return refresh_at - time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            due_in = self._refresh_due_in()
+            if due_in is None or due_in > 0:
+                # Lifetime unknown yet: check again once one may have been observed
+                await asyncio.sleep(60.0 if due_in is None else due_in)
+                continue
+
+            try:
+                await self.refresh(self._generation, expired=False)
+            except self._login_errors as e:
+                self._logger.error(f"Proactive session refresh failed: {str(e)}")
+                await asyncio.sleep(30.0)
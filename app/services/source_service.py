@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 from httpx import Cookies, Response, Timeout
 
@@ -5,18 +6,67 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from config.env import config
-from app.mappers.access_mappers import AccessDataMapper
-import re
 import json
 import logging
 from app.models.access_model import Access
-from app.models.user import AbmUser, User, UserAccess
-from typing import Callable, Awaitable
+from app.models.access_records import AccessRecords
+from app.models.user import AbmUser, User
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Awaitable
 
 from utils.decorators import singleton
-from bs4 import BeautifulSoup, Tag
-
-from utils.date_format import format_chilean_date_time_to_utc
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import TTLCache
+from utils.swr_cache import SWRCache
+from utils.disk_cache import CachedFile, ContentAddressedCache
+from utils.cassette import RecordingTransport, ReplayTransport
+from utils.adaptive_limiter import AdaptiveLimiter, Priority, QueueTimeout
+from utils.circuit_breaker import CircuitBreaker, CircuitOpen
+from utils.hedging import Hedger
+from utils.deadline import DeadlineExceeded, check_deadline, expired, remaining
+from utils.stale import StaleStore, note_stale
+from app.services.session_manager import SessionManager
+from app.parsers.html_parser import get_html_parser
+from app.parsers.access_stream import TablaReserStream, parse_access_chunk
+from app.services.parse_executor import ParseExecutor
+from app.services.metrics import Metrics
+
+
+# Login form fields, never written to cassettes
+CREDENTIAL_FIELDS = ("LOGIN", "CLAVE")
+
+# Most concurrent calls per upstream operation. They add up to the
+# connection pool size, so admitted calls never wait for a connection.
+UPSTREAM_LIMITS = {
+    "login": 2,
+    "ACCESOS": 4,
+    "VERPERFIL": 16,
+    "ADJUNTARARCHIVOINBODY": 8,
+    "abm_socios": 12,
+    "uploads_inbody": 8,
+}
+
+# Cheap, side-effect free request through each operation's own endpoint and
+# query, used to check whether it answers again. Logins and file downloads have
+# no such request and recover through the breaker's half-open trial call only
+PROBE_REQUESTS: dict[str, tuple[str, str, dict[str, Any] | None]] = {
+    "ACCESOS": (
+        "POST",
+        "main_servidor.php",
+        {"QUERY": "ACCESOS", "DATOSFORM": "FECHAINI=2100-01-01&FECHAFIN=2100-01-01"},
+    ),
+    "VERPERFIL": ("POST", "main_servidor.php", {"QUERY": "VERPERFIL", "IDCONTACTO": 0}),
+    "ADJUNTARARCHIVOINBODY": (
+        "POST",
+        "main_servidor.php",
+        {"QUERY": "ADJUNTARARCHIVOINBODY", "IDCONTACTO": 0},
+    ),
+    "abm_socios": ("GET", "/abm/abm_socios.php?CONTACTOCAMPO7=", None),
+}
+
+# Idempotent reads worth sending twice when slow, files are too large
+HEDGED_OPERATIONS = ("ACCESOS", "VERPERFIL", "abm_socios")
 
 
 @singleton
@@ -38,25 +88,449 @@ class SourceService:
             pool=60.0,  # Timeout para obtener conexión del pool
         )
 
+        self._max_connections: int = sum(UPSTREAM_LIMITS.values())
+        limits = httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=self._max_connections,
+            keepalive_expiry=5.0,
+        )
+        transport = self._cassette_transport(limits)
         self._client = httpx.AsyncClient(
             base_url=self._base_url,
             timeout=self._timeout,
             headers={"user-agent": ""},
-            proxy=self._proxy,
+            # A custom transport gets the proxy itself, client mounts bypass it
+            proxy=self._proxy if transport is None else None,
             cookies=self._cookies,
-            limits=httpx.Limits(
-                max_keepalive_connections=20,
-                max_connections=50,
-                keepalive_expiry=5.0,
-            ),
+            limits=limits,
+            transport=transport,
             http2=False,
             follow_redirects=True,
         )
 
+        self._session = SessionManager(self.login, login_errors=UPSTREAM_ERRORS)
+        self._parser = get_html_parser(config.HTML_PARSER)
+        self._parse_executor = ParseExecutor()
+        self._metrics = Metrics()
+
+        # Admission per operation, interactive calls ahead of background work
+        queue_timeouts = {
+            Priority.INTERACTIVE: config.UPSTREAM_QUEUE_TIMEOUT,
+            Priority.BACKGROUND: config.UPSTREAM_BACKGROUND_QUEUE_TIMEOUT,
+        }
+        self._limiters: dict[str, AdaptiveLimiter] = {
+            operation: AdaptiveLimiter(
+                operation,
+                initial_limit=max(1, max_limit // 2),
+                max_limit=max_limit,
+                queue_timeouts=queue_timeouts,
+                latency_tolerance=config.UPSTREAM_LATENCY_TOLERANCE,
+            )
+            for operation, max_limit in UPSTREAM_LIMITS.items()
+        }
+        # Fail fast while an operation is down instead of waiting for timeouts
+        self._breakers: dict[str, CircuitBreaker] = {
+            operation: CircuitBreaker(
+                operation,
+                failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+                probe=partial(self._probe_upstream, operation)
+                if operation in PROBE_REQUESTS
+                else None,
+            )
+            for operation in UPSTREAM_LIMITS
+        }
+        # Slow reads are sent again, the first answer wins
+        self._hedgers: dict[str, Hedger] = {}
+        if config.UPSTREAM_HEDGING:
+            self._hedgers = {
+                operation: Hedger(
+                    operation,
+                    percentile=config.UPSTREAM_HEDGE_PERCENTILE,
+                    budget=config.UPSTREAM_HEDGE_BUDGET,
+                )
+                for operation in HEDGED_OPERATIONS
+            }
+        self._logger.info(f"Using {self._parser.name} HTML parser")
+
+        # Identical concurrent calls share one upstream request and one parse
+        self._flights: dict[str, SingleFlight] = {
+            "ACCESOS": SingleFlight(),
+            "VERPERFIL": SingleFlight(),
+            "ADJUNTARARCHIVOINBODY": SingleFlight(),
+            "abm_socios": SingleFlight(),
+            "uploads_inbody": SingleFlight(),
+        }
+
+        # RUN -> ABM user, unknown RUNs are cached as None for a shorter time
+        self._abm_cache: TTLCache[str, AbmUser] = TTLCache(
+            maxsize=config.ABM_CACHE_SIZE,
+            ttl=config.ABM_CACHE_TTL,
+            negative_ttl=config.ABM_CACHE_NEGATIVE_TTL,
+        )
+        # External id -> profile, served stale while it is refreshed
+        self._profile_cache: SWRCache[int, User | None] = SWRCache(
+            maxsize=config.PROFILE_CACHE_SIZE,
+            soft_ttl=config.PROFILE_CACHE_SOFT_TTL,
+            hard_ttl=config.PROFILE_CACHE_HARD_TTL,
+            refresh_errors=UPSTREAM_ERRORS,
+        )
+        # File URL -> downloaded InBody file, uploads never change
+        self._inbody_files = ContentAddressedCache(
+            config.INBODY_CACHE_DIR, config.INBODY_CACHE_MAX_BYTES
+        )
+        # Last value loaded per key, served while the operation is down
+        self._last_good: dict[str, StaleStore] = {
+            "abm_socios": StaleStore(config.ABM_CACHE_SIZE),
+            "VERPERFIL": StaleStore(config.PROFILE_CACHE_SIZE),
+            "ADJUNTARARCHIVOINBODY": StaleStore(config.PROFILE_CACHE_SIZE),
+        }
+
+    def _cassette_transport(
+        self, limits: httpx.Limits
+    ) -> httpx.AsyncBaseTransport | None:
+        """
+        Transport recording upstream traffic to the cassette or replaying it,
+        per `SOURCE_CASSETTE_MODE`. None for the default network transport.
+        """
+        mode = config.SOURCE_CASSETTE_MODE
+        path = config.SOURCE_CASSETTE_PATH
+
+        if mode == "record":
+            self._logger.info(f"Recording upstream traffic to {path}")
+            return RecordingTransport(
+                httpx.AsyncHTTPTransport(limits=limits, proxy=self._proxy),
+                path,
+                CREDENTIAL_FIELDS,
+            )
+        if mode == "replay":
+            return ReplayTransport(
+                path, config.SOURCE_CASSETTE_SPEED, CREDENTIAL_FIELDS
+            )
+        if mode != "off":
+            self._logger.warning(f"Unknown cassette mode {mode!r}, ignoring it")
+        return None
+
+    @property
+    def session(self) -> SessionManager:
+        return self._session
+
+    def coalescing_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get per-operation counters of the request coalescing layer.
+
+        Returns:
+            dict: Calls received, calls collapsed into an in-flight request,
+            requests currently in flight and requests cancelled once every
+            caller went away, by upstream operation
+        """
+        return {
+            operation: {
+                "calls": flight.calls,
+                "collapsed": flight.collapsed,
+                "in_flight": flight.in_flight,
+                "abandoned": flight.abandoned,
+            }
+            for operation, flight in self._flights.items()
+        }
+
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get size, hit, miss and eviction counters of the member caches.
+
+        Returns:
+            dict: Counters by cache name
+        """
+        return {
+            "abm_user": self._abm_cache.stats(),
+            "profile": self._profile_cache.stats(),
+            "inbody_file": self._inbody_files.stats(),
+        }
+
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Get connection counts of the upstream HTTP connection pool.
+
+        Returns:
+            dict: Open, idle and busy connections, requests waiting for a
+            connection and the pool limit
+        """
+        transports = [self._client._transport, *self._client._mounts.values()]
+        connections = idle = waiting = 0
+        for transport in transports:
+            # Unwrap the recording transport
+            transport = getattr(transport, "transport", transport)
+            # httpcore internals, read defensively across versions
+            pool = getattr(transport, "_pool", None)
+            if pool is None:
+                continue
+            for connection in getattr(pool, "connections", []):
+                connections += 1
+                idle += connection.is_idle()
+            waiting += sum(
+                1
+                for request in getattr(pool, "_requests", [])
+                if getattr(request, "connection", None) is None
+            )
+
+        return {
+            "connections": connections,
+            "idle": idle,
+            "active": connections - idle,
+            "waiting": waiting,
+            "max_connections": self._max_connections,
+        }
+
+    def limiter_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get the adaptive concurrency limit and queue of every operation.
+
+        Returns:
+            dict: Current limit, calls in flight and waiting, admitted and
+            rejected calls and limit decreases, by upstream operation
+        """
+        return {
+            operation: limiter.stats() for operation, limiter in self._limiters.items()
+        }
+
+    def breaker_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get the circuit breaker state of every operation.
+
+        Returns:
+            dict: State, consecutive failures, times opened and calls
+            rejected, by upstream operation
+        """
+        return {
+            operation: breaker.stats() for operation, breaker in self._breakers.items()
+        }
+
+    def hedge_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get the hedging figures of every hedged operation.
+
+        Returns:
+            dict: Current hedge delay, calls, hedges sent, hedges answering
+            first and hedges skipped for lack of budget, by upstream
+            operation; empty when hedging is off
+        """
+        return {
+            operation: hedger.stats() for operation, hedger in self._hedgers.items()
+        }
+
+    def circuit_open(self, operation: str) -> bool:
+        """Whether calls of an upstream operation currently fail fast."""
+        return self._breakers[operation].open_for > 0
+
+    def _request_timeout(self) -> Timeout:
+        """
+        Client timeouts, cut to what is left of the request deadline.
+
+        Raises:
+            DeadlineExceeded: If the deadline has already passed
+        """
+        left = remaining()
+        if left is None:
+            return self._timeout
+        if left <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return Timeout(
+            connect=min(self._timeout.connect, left),
+            read=min(self._timeout.read, left),
+            write=min(self._timeout.write, left),
+            pool=min(self._timeout.pool, left),
+        )
+
+    @asynccontextmanager
+    async def _upstream(self, operation: str) -> AsyncIterator[Timeout]:
+        """
+        Admit an upstream call through the operation's circuit breaker and
+        limiter and time it. Transport errors and 5xx responses, which the
+        block reports with `_check_status` or `raise_for_status`, count as
+        failures of the operation. The block should only hold the HTTP
+        exchange, parsing the body belongs after it.
+
+        Yields:
+            Timeout: Client timeouts for the call, within the request deadline
+
+        Raises:
+            CircuitOpen: If the operation is known to be down
+            QueueTimeout: If the operation is saturated
+            DeadlineExceeded: If the request deadline passed before or
+                during the call
+        """
+        timeout = self._request_timeout()
+        breaker = self._breakers[operation]
+        breaker.check()
+        try:
+            async with self._limiters[operation].slot(is_failure=_is_congestion):
+                with self._metrics.upstream_seconds.time(operation):
+                    yield timeout
+        except httpx.TransportError as e:
+            if isinstance(e, httpx.TimeoutException) and expired():
+                # Cut short by the caller, says nothing about the upstream
+                raise DeadlineExceeded(
+                    f"Request deadline exceeded in {operation}"
+                ) from e
+            breaker.record_failure()
+            raise
+        except UpstreamServerError:
+            breaker.record_failure()
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+
+    async def _hedged[T](self, operation: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Run an idempotent upstream call, hedged when hedging is on."""
+        hedger = self._hedgers.get(operation)
+        if hedger is None:
+            return await call()
+        return await hedger.run(call)
+
+    @staticmethod
+    def _check_status(operation: str, response: Response) -> None:
+        """
+        Raises:
+            UpstreamServerError: If the source system answered with a 5xx
+        """
+        if response.status_code >= 500:
+            raise UpstreamServerError(operation, response.status_code)
+
+    async def _probe_upstream(self, operation: str) -> bool:
+        """
+        Whether an operation answers again, bypassing admission. Only a 2xx
+        counts, a 4xx from a proxy or maintenance page is no recovery.
+        """
+        method, url, data = PROBE_REQUESTS[operation]
+        try:
+            response = await self._client.request(method, url, data=data, timeout=5.0)
+        except httpx.HTTPError as e:
+            self._logger.info(f"Probe of {operation} failed: {str(e)}")
+            return False
+        return response.is_success
+
+    async def _stale_fallback[K, T](
+        self, operation: str, key: K, load: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Load a value, or while the operation is down return the last known
+        good one instead and mark the request as served stale.
+
+        Raises:
+            CircuitOpen: If the operation is down and the key was never loaded
+            httpx.TransportError: If the source system could not be reached
+                and the key was never loaded
+            UpstreamServerError: If the source system failed and the key was
+                never loaded
+        """
+        store = self._last_good[operation]
+        try:
+            value = await load()
+        except (CircuitOpen, httpx.TransportError, UpstreamServerError):
+            stale = store.get(key)
+            if stale is None:
+                raise
+            value, age = stale
+            note_stale(age)
+        return value
+
+    def checkpoint(self) -> dict[str, Any]:
+        """
+        Get the session and member caches in a JSON-serializable form, to be
+        saved and handed to `restore` by the next process.
+        """
+        return {
+            "cookies": [
+                {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "domain": cookie.domain,
+                    "path": cookie.path,
+                }
+                for cookie in self._client.cookies.jar
+                if not cookie.is_expired()
+            ],
+            "session": self._session.checkpoint(),
+            "abm_users": [
+                (run, ttl, None if user is None else user.model_dump())
+                for run, ttl, user in self._abm_cache.dump()
+            ],
+            "profiles": [
+                (external_id, age, stale, None if user is None else user.model_dump())
+                for external_id, age, stale, user in self._profile_cache.dump()
+            ],
+        }
+
+    def restore(self, state: dict[str, Any], elapsed: float) -> None:
+        """
+        Load a state returned by `checkpoint`, before the session is started.
+
+        Args:
+            state: The saved state
+            elapsed: Seconds since it was saved
+        """
+        if state["cookies"] and state["session"]["logged_in_at"] is not None:
+            for cookie in state["cookies"]:
+                self._client.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie["domain"],
+                    path=cookie["path"],
+                )
+            self._session.restore(state["session"])
+
+        self._abm_cache.load(
+            [
+                (run, ttl, None if user is None else AbmUser.model_validate(user))
+                for run, ttl, user in state["abm_users"]
+            ],
+            elapsed,
+        )
+        self._profile_cache.load(
+            [
+                (
+                    external_id,
+                    age,
+                    stale,
+                    None if user is None else User.model_validate(user),
+                )
+                for external_id, age, stale, user in state["profiles"]
+            ],
+            elapsed,
+        )
+
+    def invalidate_abm_user(self, run: str) -> bool:
+        """
+        Drop a RUN from the ABM user cache.
+
+        Returns:
+            bool: Whether the RUN was cached
+        """
+        return self._abm_cache.invalidate(run.upper())
+
+    def mark_profile_stale(self, external_id: int) -> bool:
+        """
+        Hint that a member's cached profile, e.g. its access history, is
+        outdated. The next read serves it and reloads it in the background.
+
+        Returns:
+            bool: Whether the profile was cached
+        """
+        return self._profile_cache.mark_stale(external_id)
+
     async def login(self) -> Response:
         form_data = {"LOGIN": config.SOURCE_USERNAME, "CLAVE": config.SOURCE_PASSWORD}
 
-        response = await self._client.post("login_servidor.php", data=form_data)
+        async with self._upstream("login") as timeout:
+            response = await self._client.post(
+                "login_servidor.php", data=form_data, timeout=timeout
+            )
+            self._check_status("login", response)
 
         if not response.json()["estado"]["sesion"]:
             raise Unauthorized("Login failed - invalid credentials")
@@ -67,13 +541,22 @@ class SourceService:
         return response
 
     async def _retry_with_login[T](
-        self, operation_func: Callable[[], Awaitable[T]], max_retries: int = 3
+        self,
+        operation_func: Callable[[], Awaitable[T]],
+        generation: int,
+        operation: str,
+        max_retries: int = 3,
     ) -> T:
         """
         Retry an operation after re-authenticating.
 
+        Only one caller per expired session generation actually logs in, the
+        rest wait for it and retry with the renewed session.
+
         Args:
             operation_func: Async function to retry after login
+            generation: Session generation the failed request was sent with
+            operation: Upstream operation name, for the re-login counter
             max_retries: Maximum number of retry attempts
 
         Returns:
@@ -83,16 +566,17 @@ class SourceService:
             Unauthorized: If login fails or max retries exceeded
         """
         for attempt in range(max_retries + 1):
+            # No point in another attempt the caller will not wait for
+            check_deadline()
             try:
                 self._logger.info(
                     f"Attempting to re-authenticate (attempt {attempt + 1}/{max_retries + 1})"
                 )
 
-                # Attempt to login
-                login_response = await self.login()
-
-                if not login_response.json()["estado"]["sesion"]:
-                    raise Unauthorized("Login failed - invalid credentials")
+                # Attempt to login, unless another request already did
+                generation = await self._session.refresh(
+                    generation, operation=operation
+                )
 
                 # Retry the original operation with new session
                 return await operation_func()
@@ -108,6 +592,9 @@ class SourceService:
                         f"Authentication retry failed after {max_retries + 1} attempts: {str(e)}"
                     )
 
+            except DeadlineExceeded:
+                raise
+
             except Exception as e:
                 self._logger.error(f"Unexpected error during retry: {str(e)}")
                 raise e
@@ -119,43 +606,126 @@ class SourceService:
 
     async def get_today_access(self) -> list[Access]:
         """
-        Internal method to get today's access data that can be retried.
+        Get today's access data from the source system.
+
+        Returns:
+            list[Access]: Today's access records
         """
         today = datetime.now(ZoneInfo("America/Santiago")).strftime("%Y-%m-%d")
+        return await self.get_access_by_date(today)
+
+    async def get_access_by_date(self, day: str) -> list[Access]:
+        """
+        Get the access data of a single day from the source system.
+
+        Args:
+            day: Local date in the format 'YYYY-MM-DD'
+
+        Returns:
+            list[Access]: The day's access records, empty if the page has no
+            `tablaReser` array
+        """
+        try:
+            access_records = await self.get_access_columns_by_date(day)
+        except AccessDataNotFound as e:
+            # The live views show an empty day rather than fail
+            self._logger.error(str(e))
+            return []
+        return access_records.to_models()
+
+    async def get_access_columns_by_date(self, day: str) -> AccessRecords:
+        """
+        Get the access data of a single day as a columnar container.
+
+        The container may be shared with concurrent callers, do not modify it.
 
+        Args:
+            day: Local date in the format 'YYYY-MM-DD'
+
+        Returns:
+            AccessRecords: The day's access records
+
+        Raises:
+            AccessDataNotFound: If the page has no `tablaReser` array
+            ParseException: If the array is invalid
+        """
+        return await self._flights["ACCESOS"].do(
+            ("main_servidor.php", "ACCESOS", day),
+            lambda: self._hedged("ACCESOS", lambda: self._fetch_access(day)),
+        )
+
+    async def _fetch_access(self, day: str) -> AccessRecords:
+        """
+        Internal method to get a day's access data that can be retried.
+        """
         form_data = {
             "QUERY": "ACCESOS",
-            "DATOSFORM": f"FECHAINI={today}&FECHAFIN={today}",
+            "DATOSFORM": f"FECHAINI={day}&FECHAFIN={day}",
         }
-        response = await self._client.post(
-            "main_servidor.php",
-            data=form_data,
-        )
+        generation = self._session.generation
+        stream = TablaReserStream()
+        access_records = AccessRecords()
+        # Chunks are parsed in batches large enough to be worth the parse pool,
+        # by a task of their own so parsing never holds the upstream slot
+        batch_size = self._parse_executor.inline_max_size
+        batches: asyncio.Queue[str | None] = asyncio.Queue()
+        pending: list[str] = []
+        pending_size = 0
+
+        async def parse_batches() -> None:
+            nonlocal stream
+            while (text := await batches.get()) is not None:
+                stream, batch = await self._parse_executor.run(
+                    len(text), parse_access_chunk, stream, text
+                )
+                access_records.extend(batch)
 
+        parser = asyncio.create_task(parse_batches())
         try:
-            response_data = response.json()
-            if response_data.get("sesion") is False:
-                return await self._retry_with_login(self.get_today_access)
-        except Exception as e:
-            raise e
+            async with (
+                self._upstream("ACCESOS") as timeout,
+                self._client.stream(
+                    "POST", "main_servidor.php", data=form_data, timeout=timeout
+                ) as response,
+            ):
+                self._check_status("ACCESOS", response)
+                # Records are mapped as they arrive, the page is never held
+                # whole unless parsing falls behind the download
+                async for chunk in response.aiter_text():
+                    pending.append(chunk)
+                    pending_size += len(chunk)
+                    if pending_size >= batch_size:
+                        batches.put_nowait("".join(pending))
+                        pending.clear()
+                        pending_size = 0
+                        if parser.done():
+                            # The page is invalid, raised below
+                            break
+            if pending:
+                batches.put_nowait("".join(pending))
+            batches.put_nowait(None)
+            self._metrics.upstream_bytes.observe(
+                response.num_bytes_downloaded, "ACCESOS"
+            )
+            await parser
+            if not stream.session_expired:
+                stream.close()
+        except ValueError as e:
+            raise ParseException(f"Error parsing access data: {str(e)}") from e
+        finally:
+            parser.cancel()
+
+        if stream.session_expired:
+            return await self._retry_with_login(
+                lambda: self._fetch_access(day),
+                generation,
+                "ACCESOS",
+            )
 
-        html_content = response.json()["html"]
+        if not stream.found:
+            raise AccessDataNotFound("No access data match found on the html body")
 
-        match = re.search(r"tablaReser\s*=\s*(\[.*?\]);", html_content, re.DOTALL)
-        if match:
-            # Extract the array content
-            array_content = match.group(1)
-            # Clean and parse the JSON
-            try:
-                raw_data = json.loads(array_content)
-                return AccessDataMapper.map_access_records(raw_data)
-            except json.JSONDecodeError:
-                raise ParseException("Error parsing JSON")
-            except Exception as e:
-                raise e
-        else:
-            self._logger.error("No access data match found on the html body")
-            return []
+        return access_records
 
     async def get_abm_user_by_run(self, run: str) -> AbmUser | None:
         """
@@ -164,79 +734,102 @@ class SourceService:
         Returns:
             AbmUser | None: The user information or None if not found
         """
-        response = await self._client.get(
-            f"/abm/abm_socios.php?CONTACTOCAMPO7={run.upper()}",
+        run = run.upper()
+        found, abm_user = self._abm_cache.lookup(run)
+        if found:
+            return abm_user
+
+        return await self._stale_fallback(
+            "abm_socios",
+            run,
+            lambda: self._flights["abm_socios"].do(
+                ("/abm/abm_socios.php", run),
+                lambda: self._load_abm_user(run),
+            ),
+        )
+
+    async def _load_abm_user(self, run: str) -> AbmUser | None:
+        abm_user = await self._hedged(
+            "abm_socios", lambda: self._fetch_abm_user_by_run(run)
         )
+        self._abm_cache.set(run, abm_user)
+        self._last_good["abm_socios"].set(run, abm_user)
+        return abm_user
+
+    async def _fetch_abm_user_by_run(self, run: str) -> AbmUser | None:
+        generation = self._session.generation
+        async with self._upstream("abm_socios") as timeout:
+            response = await self._client.get(
+                f"/abm/abm_socios.php?CONTACTOCAMPO7={run.upper()}",
+                timeout=timeout,
+            )
+            self._check_status("abm_socios", response)
+        self._metrics.upstream_bytes.observe(len(response.content), "abm_socios")
 
         try:
             response_data = response.text
             if response_data == "OPCION DISPONIBLE SOLO PARA ADMINISTRADORES":
                 return await self._retry_with_login(
-                    lambda: self.get_abm_user_by_run(run)
+                    lambda: self._fetch_abm_user_by_run(run),
+                    generation,
+                    "abm_socios",
                 )
         except Exception as e:
             raise e
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        table = soup.find("table", id="listado")
-        if not table:
-            return None
-
-        if not table or not isinstance(table, Tag):
-            return None
-
-        tbody = table.find("tbody")
-        if not tbody or not isinstance(tbody, Tag):
-            return None
-
-        rows = tbody.find_all("tr")
-        if not rows:
-            return None
-
-        # Process the first row to extract user data
-        first_row = rows[0]
-
-        if not isinstance(first_row, Tag):
-            return None
-        cells = first_row.find_all("td")
-        cell_run = cells[1].get_text(strip=True).upper() if cells[1] else ""
-
-        if cell_run != run.upper():
-            return None
-
-        external_id = cells[0].get_text(strip=True) if cells[0] else ""
-        last_name = cells[2].get_text(strip=True) if cells[2] else ""
-        first_name = cells[3].get_text(strip=True) if cells[3] else ""
-
-        return AbmUser(
-            run=run.upper(),
-            first_name=first_name,
-            last_name=last_name,
-            external_id=int(external_id),
+        return await self._parse_executor.run(
+            len(response.text), self._parser.parse_abm_user, response.text, run.upper()
         )
 
-    async def get_user_by_external_id(self, external_id: int):
+    async def get_user_by_external_id(self, external_id: int) -> User | None:
         """
         Get the user information from the system.
 
         Returns:
             User | None: The user information or None if not found
         """
+        return await self._stale_fallback(
+            "VERPERFIL",
+            external_id,
+            lambda: self._profile_cache.get(
+                external_id,
+                lambda: self._flights["VERPERFIL"].do(
+                    ("main_servidor.php", "VERPERFIL", external_id),
+                    lambda: self._load_user(external_id),
+                ),
+            ),
+        )
+
+    async def _load_user(self, external_id: int) -> User | None:
+        user = await self._hedged(
+            "VERPERFIL", lambda: self._fetch_user_by_external_id(external_id)
+        )
+        self._last_good["VERPERFIL"].set(external_id, user)
+        return user
+
+    async def _fetch_user_by_external_id(self, external_id: int) -> User | None:
         form_data = {
             "QUERY": "VERPERFIL",
             "IDCONTACTO": external_id,
         }
 
-        response = await self._client.post(
-            "main_servidor.php",
-            data=form_data,
-        )
+        generation = self._session.generation
+        async with self._upstream("VERPERFIL") as timeout:
+            response = await self._client.post(
+                "main_servidor.php",
+                data=form_data,
+                timeout=timeout,
+            )
+            self._check_status("VERPERFIL", response)
+        self._metrics.upstream_bytes.observe(len(response.content), "VERPERFIL")
 
         try:
             response_data = response.json()
             if response_data.get("sesion") is False:
                 return await self._retry_with_login(
-                    lambda: self.get_user_by_external_id(external_id)
+                    lambda: self._fetch_user_by_external_id(external_id),
+                    generation,
+                    "VERPERFIL",
                 )
         except Exception as e:
             raise e
@@ -246,7 +839,9 @@ class SourceService:
         if "Contacto no encontrado" in html_str:
             return None
 
-        return extract_user_info(html_str)
+        return await self._parse_executor.run(
+            len(html_str), self._parser.parse_user, html_str
+        )
 
     async def get_inbody_by_external_id(self, external_id: int) -> list[str]:
         """
@@ -255,21 +850,45 @@ class SourceService:
         Returns:
             list[str]: The in-body information or an empty list if not found
         """
+        return await self._stale_fallback(
+            "ADJUNTARARCHIVOINBODY",
+            external_id,
+            lambda: self._flights["ADJUNTARARCHIVOINBODY"].do(
+                ("main_servidor.php", "ADJUNTARARCHIVOINBODY", external_id),
+                lambda: self._load_inbody(external_id),
+            ),
+        )
+
+    async def _load_inbody(self, external_id: int) -> list[str]:
+        inbody = await self._fetch_inbody_by_external_id(external_id)
+        self._last_good["ADJUNTARARCHIVOINBODY"].set(external_id, inbody)
+        return inbody
+
+    async def _fetch_inbody_by_external_id(self, external_id: int) -> list[str]:
         form_data = {
             "QUERY": "ADJUNTARARCHIVOINBODY",
             "IDCONTACTO": external_id,
         }
 
-        response = await self._client.post(
-            "main_servidor.php",
-            data=form_data,
+        generation = self._session.generation
+        async with self._upstream("ADJUNTARARCHIVOINBODY") as timeout:
+            response = await self._client.post(
+                "main_servidor.php",
+                data=form_data,
+                timeout=timeout,
+            )
+            self._check_status("ADJUNTARARCHIVOINBODY", response)
+        self._metrics.upstream_bytes.observe(
+            len(response.content), "ADJUNTARARCHIVOINBODY"
         )
 
         try:
             response = response.json()
             if response.get("sesion") is False:
                 return await self._retry_with_login(
-                    lambda: self.get_inbody_by_external_id(external_id)
+                    lambda: self._fetch_inbody_by_external_id(external_id),
+                    generation,
+                    "ADJUNTARARCHIVOINBODY",
                 )
         except Exception as e:
             raise e
@@ -279,163 +898,111 @@ class SourceService:
         if "No se encontró la carpeta de registros" in html_str:
             return []
 
-        soup = BeautifulSoup(html_str, "html.parser")
-        # Find the panel containing uploaded files
-        uploaded_files_panel = soup.find("div", class_="archivosSubidos")
-        if not uploaded_files_panel or not isinstance(uploaded_files_panel, Tag):
-            return []
+        return await self._parse_executor.run(
+            len(html_str), self._parser.parse_inbody_links, html_str, self._base_url
+        )
 
-        # Find the panel body containing the file links
-        panel_body = uploaded_files_panel.find("div", class_="panel-body")
-        if not panel_body or not isinstance(panel_body, Tag):
-            return []
+    async def get_inbody_file(self, url: str) -> CachedFile:
+        """
+        Get an InBody file from the disk cache, downloading it on a miss.
 
-        # Extract all anchor tags with href attributes
-        file_links = []
-        links = panel_body.find_all("a", href=True)
+        Args:
+            url: Absolute URL of the file, as returned by
+                `get_inbody_by_external_id`
 
-        for link in links:
-            if isinstance(link, Tag):
-                href = link.get("href")
-                if href and isinstance(href, str):
-                    # Convert relative URLs to absolute URLs
-                    if href.startswith("uploads_inbody/"):
-                        full_url = f"{self._base_url}/{href}"
-                        file_links.append(full_url)
-                    elif href.startswith("http"):
-                        # Already absolute URL
-                        file_links.append(href)
+        Returns:
+            CachedFile: The cached file, kept on disk until the URL is passed
+                to `release_inbody_file`
 
-        return list(reversed(file_links))
+        Raises:
+            httpx.HTTPStatusError: If the source system did not return the file
+        """
+        # Pinned before the lookup so a concurrent put cannot evict the file
+        # between the download and the response opening it
+        self._inbody_files.pin(url)
+        try:
+            cached = await self._inbody_files.get(url)
+            if cached is not None:
+                return cached
+
+            return await self._flights["uploads_inbody"].do(
+                url, lambda: self._fetch_inbody_file(url)
+            )
+        except BaseException:
+            await self._inbody_files.unpin(url)
+            raise
+
+    async def release_inbody_file(self, url: str) -> None:
+        """Let eviction delete a file returned by `get_inbody_file` again."""
+        await self._inbody_files.unpin(url)
+
+    async def _fetch_inbody_file(self, url: str) -> CachedFile:
+        async with (
+            self._upstream("uploads_inbody") as timeout,
+            self._client.stream("GET", url, timeout=timeout) as response,
+        ):
+            response.raise_for_status()
+            content_type = response.headers.get(
+                "content-type", "application/octet-stream"
+            )
+            # Written to disk as it arrives, the file is never held in memory
+            cached = await self._inbody_files.put(
+                url, response.aiter_bytes(), content_type
+            )
+        self._metrics.upstream_bytes.observe(cached.size, "uploads_inbody")
+        return cached
+
+
+def _is_congestion(error: Exception) -> bool:
+    """Whether an upstream call failed in a way that calls for less load."""
+    if isinstance(error, httpx.TimeoutException):
+        # Cut short by the caller's deadline, says nothing about the upstream
+        return not expired()
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.TransportError, UpstreamServerError))
 
 
 class ParseException(Exception):
     pass
 
 
+class AccessDataNotFound(ParseException):
+    """
+    Raised when an ACCESOS page has no `tablaReser` array, which is not known
+    to mean a day without visits and so must not be stored as one.
+    """
+
+
+class UpstreamServerError(Exception):
+    """
+    Raised when the source system answers with a server error.
+
+    Attributes:
+        operation: Upstream operation that failed
+        status_code: HTTP status of the answer
+    """
+
+    def __init__(self, operation: str, status_code: int):
+        super().__init__(f"{operation} failed upstream with status {status_code}")
+        self.operation = operation
+        self.status_code = status_code
+
+
 class Unauthorized(Exception):
     pass
 
 
-def extract_user_info(html_str: str) -> User | None:
-    soup = BeautifulSoup(html_str, "html.parser")
-
-    # Extract image URL from img tag with name attribute (not id)
-    image_url: str | None = None
-    image_element = soup.find("img")
-    if image_element and isinstance(image_element, Tag):
-        # The image URL is in the 'name' attribute, not 'src'
-        src = str(image_element.get("name", ""))
-        if src and src.startswith("https://storage.googleapis.com/"):
-            image_url = src
-
-    # Extract first and last name from JSON data in admin comment
-    first_name = ""
-    last_name = ""
-    run = ""
-
-    # Look for the admin comment containing JSON data
-    admin_comment = soup.find("span", class_="adminComment")
-    if admin_comment and isinstance(admin_comment, Tag):
-        comment_text = admin_comment.get_text()
-        # Extract JSON part after "CONTACTO: "
-        if "CONTACTO: " in comment_text:
-            json_part = comment_text.split("CONTACTO: ", 1)[1]
-            try:
-                contact_data = json.loads(json_part)
-                first_name = contact_data.get("CONTACTOCAMPO2", "")
-                last_name = contact_data.get("CONTACTOCAMPO1", "")
-                run = contact_data.get("CONTACTOCAMPO7", "")
-            except json.JSONDecodeError:
-                # Fallback: try to extract using regex
-                first_name_match = re.search(r'"CONTACTOCAMPO2":"([^"]*)"', json_part)
-                last_name_match = re.search(r'"CONTACTOCAMPO1":"([^"]*)"', json_part)
-                run_match = re.search(r'"CONTACTOCAMPO7":"([^"]*)"', json_part)
-                if first_name_match:
-                    first_name = first_name_match.group(1)
-                if last_name_match:
-                    last_name = last_name_match.group(1)
-                if run_match:
-                    run = run_match.group(1)
-
-    # Extract access history from "Historial de Accesos" table
-    access_history = []
-
-    # Find all tables and look for one containing access history
-    tables = soup.find_all("table")
-    for table in tables:
-        if not isinstance(table, Tag):
-            continue
-
-        # Look for table headers that indicate this is the access history
-        headers = table.find_all("th")
-        header_texts = [
-            th.get_text(strip=True).lower() for th in headers if isinstance(th, Tag)
-        ]
-
-        # Check if this looks like an access history table
-        # Look for the specific column headers: Fecha, Sede, Actividad, Registro
-        if any(
-            all(
-                col in " ".join(header_texts)
-                for col in ["fecha", "sede", "actividad", "registro"]
-            )
-            for header_texts in [header_texts]
-        ) or "historial de accesos" in " ".join(header_texts):
-            tbody = table.find("tbody")
-            if tbody and isinstance(tbody, Tag):
-                rows = tbody.find_all("tr")
-                for row in rows:
-                    if not isinstance(row, Tag):
-                        continue
-
-                    cells = row.find_all("td")
-                    if (
-                        len(cells) >= 4
-                    ):  # Ensure we have at least Fecha, Sede, Actividad, Registro columns
-                        # Column order: Fecha, Sede, Actividad, Registro
-                        # Extract location from Sede column (index 1)
-                        date_text = cells[0].get_text(strip=True) if cells[0] else ""
-
-                        location_text = (
-                            cells[1].get_text(strip=True) if cells[1] else ""
-                        )
-                        try:
-                            location_id = int(
-                                AccessDataMapper._map_location(location_text)
-                            )
-                        except (ValueError, TypeError):
-                            location_id = 0
-
-                        registro_text = (
-                            cells[3].get_text(strip=True) if cells[3] else ""
-                        )
-                        entry_time = ""
-                        exit_time = None
-
-                        if registro_text:
-                            # Split by space to get entry and exit times
-                            time_parts = registro_text.split()
-                            entry_time = time_parts[0] + ":00"
-                            if len(time_parts) >= 2:
-                                exit_time = time_parts[1] + ":00"
-
-                        user_access = UserAccess(
-                            location=location_id,
-                            entry_at=format_chilean_date_time_to_utc(
-                                date_text, entry_time
-                            ),
-                            exit_at=None
-                            if not exit_time
-                            else format_chilean_date_time_to_utc(date_text, exit_time),
-                        )
-                        access_history.append(user_access)
-            break  # Found the access table, no need to check others
-
-    return User(
-        image_url=image_url,
-        run=run,
-        first_name=first_name,
-        last_name=last_name,
-        access_history=access_history,
-    )
+# Failures of a call to the source system, as opposed to bugs: unreachable,
+# refused by admission, or answering with an error or a malformed response
+UPSTREAM_ERRORS: tuple[type[Exception], ...] = (
+    httpx.HTTPError,
+    CircuitOpen,
+    QueueTimeout,
+    DeadlineExceeded,
+    UpstreamServerError,
+    Unauthorized,
+    ParseException,
+    LookupError,
+    ValueError,
+)
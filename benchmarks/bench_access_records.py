@@ -0,0 +1,137 @@
+"""
+Benchmark of the access record representations.
+
+Compares mapping raw ACCESOS rows into `Access` models with
+`map_access_records` against mapping them into the columnar `AccessRecords`
+with `map_access_columns`: mapping throughput, serialization throughput, both
+together (the range endpoint path) and memory retained by the mapped rows.
+
+Usage:
+    uv run python -m benchmarks.bench_access_records --rows 20000 --days 7
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from app.const.enum import LocationStr
+from app.mappers.access_mappers import AccessDataMapper
+
+
+def make_raw_rows(count: int, days: int) -> list[dict[str, Any]]:
+    rng = random.Random(42)
+    members = [
+        (
+            rng.randint(1000, 99999),
+            f"{rng.randint(5, 25) * 1000000}-{rng.randint(0, 9)}",
+        )
+        for _ in range(max(1, count // 8))
+    ]
+    rows = []
+    for _ in range(count):
+        external_id, run = rng.choice(members)
+        entry = rng.randint(6 * 3600, 21 * 3600)
+        exit_ = entry + rng.randint(1800, 7200) if rng.random() < 0.8 else None
+        rows.append(
+            {
+                "IDCONTACTO": external_id,
+                "RUT": run,
+                "SOCIO": f"Socio {external_id}",
+                "FECHA": f"2025-03-{rng.randint(1, days):02d}",
+                "TURNOINI": time.strftime("%H:%M:%S", time.gmtime(entry)),
+                "TURNOFIN": None
+                if exit_ is None
+                else time.strftime("%H:%M:%S", time.gmtime(exit_)),
+                "ACTIVIDAD": rng.choice(["Musculación", "Spinning", "Yoga"]),
+                "SEDE": rng.choice([location.value for location in LocationStr]),
+            }
+        )
+    return rows
+
+
+def measure(func: Callable[[], Any], count: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def retained_bytes(func: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = make_raw_rows(args.rows, args.days)
+    models = AccessDataMapper.map_access_records(raw)
+    columns = AccessDataMapper.map_access_columns(raw)
+
+    map_models = measure(
+        lambda: AccessDataMapper.map_access_records(raw), args.rows, args.repeat
+    )
+    map_columns = measure(
+        lambda: AccessDataMapper.map_access_columns(raw), args.rows, args.repeat
+    )
+    dump_models = measure(
+        lambda: [record.model_dump(by_alias=True) for record in models],
+        args.rows,
+        args.repeat,
+    )
+    dump_columns = measure(columns.to_dicts, args.rows, args.repeat)
+    both_models = measure(
+        lambda: [
+            record.model_dump(by_alias=True)
+            for record in AccessDataMapper.map_access_records(raw)
+        ],
+        args.rows,
+        args.repeat,
+    )
+    both_columns = measure(
+        lambda: AccessDataMapper.map_access_columns(raw).to_dicts(),
+        args.rows,
+        args.repeat,
+    )
+    memory_models = retained_bytes(lambda: AccessDataMapper.map_access_records(raw))
+    memory_columns = retained_bytes(lambda: AccessDataMapper.map_access_columns(raw))
+
+    print(f"rows: {args.rows}, days: {args.days}")
+    print(f"map     models:  {map_models:>12,.0f} rows/s")
+    print(
+        f"map     columns: {map_columns:>12,.0f} rows/s "
+        f"({map_columns / map_models:.1f}x)"
+    )
+    print(f"dump    models:  {dump_models:>12,.0f} rows/s")
+    print(
+        f"dump    columns: {dump_columns:>12,.0f} rows/s "
+        f"({dump_columns / dump_models:.1f}x)"
+    )
+    print(f"both    models:  {both_models:>12,.0f} rows/s")
+    print(
+        f"both    columns: {both_columns:>12,.0f} rows/s "
+        f"({both_columns / both_models:.1f}x)"
+    )
+    print(f"memory  models:  {memory_models / args.rows:>12,.0f} bytes/row")
+    print(
+        f"memory  columns: {memory_columns / args.rows:>12,.0f} bytes/row "
+        f"({memory_models / memory_columns:.1f}x smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark of the parse hot paths on pages recorded in a cassette.
+
+Runs the `tablaReser` extraction and mapping of the ACCESOS pages and the
+HTML parser backends on the VERPERFIL, ADJUNTARARCHIVOINBODY and ABM pages of
+a cassette recorded with `SOURCE_CASSETTE_MODE=record`, so real page shapes
+can be measured offline and at full CPU speed. `--profile` prints the
+functions the time went to.
+
+Usage:
+    SOURCE_CASSETTE_MODE=record uv run python main.py  # then use the API
+    uv run python -m benchmarks.bench_cassette data/source.cassette.gz --profile
+"""
+
+import argparse
+import cProfile
+import json
+import pstats
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl
+
+from app.mappers.access_mappers import AccessDataMapper
+from app.models.access_records import AccessRecords
+from app.parsers.access_stream import TablaReserStream
+from app.parsers.html_parser import LxmlParser, SoupParser, lxml
+from utils.cassette import exchange_content, read_cassette
+
+# Roughly what httpx hands to `aiter_text` per read
+CHUNK_SIZE = 65536
+
+
+def load_pages(path: Path) -> dict[str, list[str]]:
+    """Response texts of the cassette by upstream operation."""
+    pages: dict[str, list[str]] = {}
+    for exchange in read_cassette(path):
+        if exchange["status"] != 200:
+            continue
+        if "abm_socios.php" in exchange["url"]:
+            operation = "abm_socios"
+        else:
+            operation = dict(parse_qsl(exchange["body"])).get("QUERY")
+        if operation is None:
+            continue
+        text = exchange_content(exchange).decode("utf-8", errors="replace")
+        pages.setdefault(operation, []).append(text)
+    return pages
+
+
+def extract_access(text: str) -> AccessRecords:
+    stream = TablaReserStream()
+    records = AccessRecords()
+    for start in range(0, len(text), CHUNK_SIZE):
+        raw_records = stream.feed(text[start : start + CHUNK_SIZE])
+        if raw_records:
+            AccessDataMapper.map_access_columns(raw_records, records)
+    stream.close()
+    return records
+
+
+def html_of(text: str) -> str:
+    return str(json.loads(text)["html"])
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    pages = load_pages(args.cassette)
+    backends = [SoupParser()] + ([LxmlParser()] if lxml is not None else [])
+
+    # Name -> (work, number of pages, characters)
+    stages: dict[str, tuple[Callable[[], Any], int, int]] = {}
+    access_pages = pages.get("ACCESOS", [])
+    if access_pages:
+        stages["ACCESOS tablaReser"] = (
+            lambda: [extract_access(text) for text in access_pages],
+            len(access_pages),
+            sum(map(len, access_pages)),
+        )
+    for backend in backends:
+        for operation, parse in (
+            ("VERPERFIL", backend.parse_user),
+            ("ADJUNTARARCHIVOINBODY", partial(backend.parse_inbody_links, base_url="")),
+            # The searched RUN only matters after the page has been parsed
+            ("abm_socios", partial(backend.parse_abm_user, run="")),
+        ):
+            texts = pages.get(operation, [])
+            if operation != "abm_socios":
+                texts = [html_of(text) for text in texts]
+            if texts:
+                stages[f"{operation} {backend.name}"] = (
+                    lambda parse=parse, texts=texts: [parse(html) for html in texts],
+                    len(texts),
+                    sum(map(len, texts)),
+                )
+
+    if not stages:
+        print(f"No parseable pages in {args.cassette}")
+        return
+
+    profiler = cProfile.Profile() if args.profile else None
+    for name, (work, count, size) in stages.items():
+        if profiler:
+            profiler.enable()
+        seconds = measure(work, args.repeat)
+        if profiler:
+            profiler.disable()
+        print(
+            f"{name:<32} {count:>5} pages {size / 1e6:>8.2f} MB  "
+            f"{count / seconds:>10,.1f} pages/s {size / 1e6 / seconds:>8.1f} MB/s"
+        )
+
+    if profiler:
+        print()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
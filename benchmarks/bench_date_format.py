@@ -0,0 +1,79 @@
+"""
+Benchmark of the Chilean to UTC timestamp conversion used by the mappers.
+
+Compares converting every value on its own with `format_chilean_date_time_to_utc`
+against the column conversion `format_chilean_date_times_to_utc`, on a day of
+synthetic access rows (entry and exit per row).
+
+Usage:
+    uv run python -m benchmarks.bench_date_format --rows 5000
+"""
+
+import argparse
+import random
+import time
+
+from utils.date_format import (
+    format_chilean_date_time_to_utc,
+    format_chilean_date_times_to_utc,
+)
+
+
+def make_rows(count: int, days: int) -> list[tuple[str, str, str | None]]:
+    rng = random.Random(42)
+    rows = []
+    for _ in range(count):
+        date = f"2025-03-{rng.randint(1, days):02d}"
+        entry = rng.randint(6 * 3600, 21 * 3600)
+        exit_ = entry + rng.randint(1800, 7200) if rng.random() < 0.8 else None
+        rows.append(
+            (
+                date,
+                time.strftime("%H:%M:%S", time.gmtime(entry)),
+                None
+                if exit_ is None
+                else time.strftime("%H:%M:%S", time.gmtime(exit_)),
+            )
+        )
+    return rows
+
+
+def per_value(rows: list[tuple[str, str, str | None]]) -> None:
+    for date, entry, exit_ in rows:
+        format_chilean_date_time_to_utc(date, entry)
+        if exit_:
+            format_chilean_date_time_to_utc(date, exit_)
+
+
+def batch(rows: list[tuple[str, str, str | None]]) -> None:
+    format_chilean_date_times_to_utc((date, entry) for date, entry, _ in rows)
+    format_chilean_date_times_to_utc((date, exit_) for date, _, exit_ in rows)
+
+
+def measure(func, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.days)
+    before = measure(per_value, rows, args.repeat)
+    after = measure(batch, rows, args.repeat)
+
+    print(f"rows: {args.rows}, distinct dates: {args.days}")
+    print(f"per value: {before:>12,.0f} rows/s")
+    print(f"batch:     {after:>12,.0f} rows/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Local stand-in for the SPL source system.
+
+Implements the endpoints `SourceService` calls, `login_servidor.php`,
+`main_servidor.php` (ACCESOS, VERPERFIL and ADJUNTARARCHIVOINBODY),
+`/abm/abm_socios.php` and the `uploads_inbody/` files, with synthetic data
+generated from a seed. Every response is delayed by a configurable latency
+and jitter, and sessions expire after a configurable lifetime, answering
+`sesion: false` (or the ABM administrators notice) like the real system.
+
+Today's ACCESOS page only holds the visits that already started, Chilean
+time, so the poller sees the day grow; it is rebuilt once a minute, pages of
+other days only once.
+
+Usage:
+    uv run python -m benchmarks.fake_upstream --rows 20000 --latency 0.05 --jitter 0.02
+    SOURCE_BASE_URL=http://127.0.0.1:4100 uv run python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+from datetime import date, datetime, timedelta
+from typing import Annotated, Any
+from urllib.parse import parse_qsl
+from zoneinfo import ZoneInfo
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.const.enum import LocationStr
+
+SESSION_COOKIE = "PHPSESSID"
+ACTIVITIES = ["Musculación", "Spinning", "Yoga", "Funcional", "Pilates"]
+FIRST_NAMES = ["Camila", "Javiera", "Valentina", "Matías", "Benjamín", "Vicente"]
+LAST_NAMES = ["González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras"]
+ABM_SESSION_EXPIRED = "OPCION DISPONIBLE SOLO PARA ADMINISTRADORES"
+SANTIAGO = ZoneInfo("America/Santiago")
+
+
+def run_check_digit(number: int) -> str:
+    """Check digit of a Chilean RUN number."""
+    total, factor = 0, 2
+    for digit in reversed(str(number)):
+        total += int(digit) * factor
+        factor = 2 if factor == 7 else factor + 1
+    remainder = 11 - total % 11
+    return {11: "0", 10: "K"}.get(remainder, str(remainder))
+
+
+class Member:
+    __slots__ = ("external_id", "run", "first_name", "last_name", "inbody_files")
+
+    def __init__(self, index: int, rng: random.Random):
+        number = 5_000_000 + index * 1_733
+        self.external_id = 10_000 + index
+        self.run = f"{number}-{run_check_digit(number)}"
+        self.first_name = rng.choice(FIRST_NAMES)
+        self.last_name = rng.choice(LAST_NAMES)
+        # A third of the members never uploaded an InBody file
+        self.inbody_files = [
+            f"{self.external_id}_{n}.pdf"
+            for n in range(index % 3 and rng.randint(1, 4))
+        ]
+
+
+def make_members(count: int, seed: int = 42) -> list[Member]:
+    """The member base, identical for the same count and seed."""
+    rng = random.Random(seed)
+    return [Member(index, rng) for index in range(count)]
+
+
+class FakeUpstream:
+    """
+    Synthetic data and session state behind the fake endpoints.
+
+    Args:
+        rows: ACCESOS rows per day
+        members: Size of the member base
+        latency: Mean delay added to every response, in seconds
+        jitter: Maximum deviation from the mean delay, in seconds
+        session_ttl: Session lifetime in seconds, 0 for sessions that never
+            expire
+        file_size: Size of the InBody files, in bytes
+        seed: Seed of the generated data
+    """
+
+    def __init__(
+        self,
+        rows: int = 20000,
+        members: int = 2000,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        session_ttl: float = 0,
+        file_size: int = 200_000,
+        seed: int = 42,
+    ):
+        self.rows = rows
+        self.latency = latency
+        self.jitter = jitter
+        self.session_ttl = session_ttl
+        self.file_size = file_size
+        self.seed = seed
+        self.members = make_members(members, seed)
+        self._by_id = {member.external_id: member for member in self.members}
+        self._by_run = {member.run: member for member in self.members}
+        self._rng = random.Random(seed)
+        # Session token -> monotonic expiry time
+        self._sessions: dict[str, float] = {}
+        # Day -> (minute of day it was built at, encoded body) of the last page
+        self._pages: dict[str, tuple[int, bytes]] = {}
+        # Day -> visits of the day, the 32 most recently built
+        self._day_rows: dict[str, list[tuple[int, int, dict[str, Any]]]] = {}
+
+        self.requests: int = 0
+        self.logins: int = 0
+        self.expired: int = 0
+
+    async def delay(self) -> None:
+        self.requests += 1
+        seconds = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def login(self) -> str:
+        token = secrets.token_hex(16)
+        expiry = (
+            time.monotonic() + self.session_ttl if self.session_ttl else float("inf")
+        )
+        self._sessions[token] = expiry
+        self.logins += 1
+        return token
+
+    def session_valid(self, token: str | None) -> bool:
+        expiry = self._sessions.get(token or "")
+        if expiry is None:
+            return False
+        if expiry < time.monotonic():
+            del self._sessions[token]
+            self.expired += 1
+            return False
+        return True
+
+    def day_rows(self, day: str) -> list[tuple[int, int, dict[str, Any]]]:
+        """All the visits of a day as (entry, exit, record), by entry time."""
+        cached = self._day_rows.get(day)
+        if cached is not None:
+            return cached
+
+        rng = random.Random(f"{self.seed}-{day}")
+        locations = [location.value for location in LocationStr]
+        entries = sorted(rng.randint(6 * 3600, 22 * 3600) for _ in range(self.rows))
+        rows = []
+        for entry in entries:
+            member = rng.choice(self.members)
+            exit_ = entry + rng.randint(1800, 7200)
+            record = {
+                "IDCONTACTO": member.external_id,
+                "RUT": member.run,
+                "SOCIO": f"{member.first_name} {member.last_name}",
+                "FECHA": day,
+                "TURNOINI": _clock(entry),
+                "TURNOFIN": _clock(exit_) if exit_ < 86400 else None,
+                "ACTIVIDAD": rng.choice(ACTIVITIES),
+                "SEDE": rng.choice(locations),
+            }
+            rows.append((entry, exit_, record))
+        if len(self._day_rows) >= 32:
+            del self._day_rows[next(iter(self._day_rows))]
+        self._day_rows[day] = rows
+        return rows
+
+    def access_page(self, day: str) -> bytes:
+        """The ACCESOS response body of a day."""
+        now = datetime.now(SANTIAGO)
+        today = now.strftime("%Y-%m-%d")
+        # Today's page moves on once a minute, past days never change
+        minute = now.hour * 60 + now.minute if day == today else -1
+        cached = self._pages.get(day)
+        if cached is not None and cached[0] == minute:
+            return cached[1]
+
+        if day > today:
+            records = []
+        elif day < today:
+            records = [record for _, _, record in self.day_rows(day)]
+        else:
+            cutoff = minute * 60
+            records = [
+                record if exit_ <= cutoff else {**record, "TURNOFIN": None}
+                for entry, exit_, record in self.day_rows(day)
+                if entry <= cutoff
+            ]
+
+        html = (
+            "<html><body><table id='reservas'></table><script>"
+            f"var tablaReser = {json.dumps(records, ensure_ascii=False)};"
+            "</script></body></html>"
+        )
+        body = json.dumps({"sesion": True, "html": html}).encode()
+        self._pages[day] = (minute, body)
+        return body
+
+    def profile_html(self, external_id: int) -> str:
+        member = self._by_id.get(external_id)
+        if member is None:
+            return "<div class='alert'>Contacto no encontrado</div>"
+
+        rng = random.Random(f"{self.seed}-profile-{external_id}")
+        contact = json.dumps(
+            {
+                "CONTACTOCAMPO1": member.last_name,
+                "CONTACTOCAMPO2": member.first_name,
+                "CONTACTOCAMPO7": member.run,
+            },
+            ensure_ascii=False,
+        )
+        history = []
+        day = date.today()
+        for _ in range(rng.randint(5, 40)):
+            day -= timedelta(days=rng.randint(1, 4))
+            entry = rng.randint(6 * 3600, 20 * 3600)
+            history.append(
+                f"<tr><td>{day.isoformat()}</td>"
+                f"<td>{rng.choice(list(LocationStr)).value}</td>"
+                f"<td>{rng.choice(ACTIVITIES)}</td>"
+                f"<td>{_clock(entry)[:5]} {_clock(entry + 3600)[:5]}</td></tr>"
+            )
+        return (
+            "<div class='perfil'>"
+            f"<img src='' name='https://storage.googleapis.com/fake/{external_id}.jpg'>"
+            f"<span class='adminComment'>CONTACTO: {contact}</span>"
+            "<table><thead><tr><th>Fecha</th><th>Sede</th><th>Actividad</th>"
+            "<th>Registro</th></tr></thead>"
+            f"<tbody>{''.join(history)}</tbody></table></div>"
+        )
+
+    def inbody_html(self, external_id: int) -> str:
+        member = self._by_id.get(external_id)
+        if member is None or not member.inbody_files:
+            return "<div>No se encontró la carpeta de registros</div>"
+
+        links = "".join(
+            f"<a href='uploads_inbody/{name}'>{name}</a><br>"
+            for name in member.inbody_files
+        )
+        return (
+            "<div class='panel archivosSubidos'>"
+            f"<div class='panel-body'>{links}</div></div>"
+        )
+
+    def abm_html(self, run: str) -> str:
+        member = self._by_run.get(run.upper())
+        row = (
+            f"<tr><td>{member.external_id}</td><td>{member.run}</td>"
+            f"<td>{member.last_name}</td><td>{member.first_name}</td></tr>"
+            if member
+            else ""
+        )
+        return f"<table id='listado'><tbody>{row}</tbody></table>"
+
+    def file_content(self, name: str) -> bytes:
+        header = b"%PDF-1.4\n% " + name.encode() + b"\n"
+        return header + random.Random(name).randbytes(self.file_size - len(header))
+
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def create_app(upstream: FakeUpstream) -> FastAPI:
+    app = FastAPI(title="Fake SPL source")
+
+    @app.post("/login_servidor.php")
+    async def login():
+        await upstream.delay()
+        response = JSONResponse({"estado": {"sesion": True}})
+        response.set_cookie(SESSION_COOKIE, upstream.login())
+        return response
+
+    @app.post("/main_servidor.php")
+    async def main_servidor(request: Request):
+        await upstream.delay()
+        if not upstream.session_valid(request.cookies.get(SESSION_COOKIE)):
+            return JSONResponse({"sesion": False})
+
+        # Parsed by hand, FastAPI's Form needs python-multipart
+        form = dict(parse_qsl((await request.body()).decode()))
+        query = form.get("QUERY")
+        external_id = int(form.get("IDCONTACTO", 0))
+        if query == "ACCESOS":
+            fields = dict(parse_qsl(form.get("DATOSFORM", "")))
+            return Response(
+                upstream.access_page(fields["FECHAINI"]),
+                media_type="application/json",
+            )
+        if query == "VERPERFIL":
+            return JSONResponse(
+                {"sesion": True, "html": upstream.profile_html(external_id)}
+            )
+        if query == "ADJUNTARARCHIVOINBODY":
+            return JSONResponse(
+                {"sesion": True, "html": upstream.inbody_html(external_id)}
+            )
+        return JSONResponse({"sesion": True, "html": ""})
+
+    @app.get("/abm/abm_socios.php")
+    async def abm_socios(
+        request: Request, run: Annotated[str, Query(alias="CONTACTOCAMPO7")] = ""
+    ):
+        await upstream.delay()
+        if not upstream.session_valid(request.cookies.get(SESSION_COOKIE)):
+            return Response(ABM_SESSION_EXPIRED, media_type="text/html")
+        return Response(upstream.abm_html(run), media_type="text/html")
+
+    @app.get("/uploads_inbody/{name}")
+    async def uploads_inbody(name: str):
+        await upstream.delay()
+        return Response(upstream.file_content(name), media_type="application/pdf")
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            "requests": upstream.requests,
+            "logins": upstream.logins,
+            "expired": upstream.expired,
+        }
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4100)
+    parser.add_argument("--rows", type=int, default=20000, help="ACCESOS rows per day")
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument("--session-ttl", type=float, default=0, help="seconds, 0 never")
+    parser.add_argument("--file-size", type=int, default=200_000, help="bytes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(
+        rows=args.rows,
+        members=args.members,
+        latency=args.latency,
+        jitter=args.jitter,
+        session_ttl=args.session_ttl,
+        file_size=args.file_size,
+        seed=args.seed,
+    )
+    uvicorn.run(
+        create_app(upstream), host=args.host, port=args.port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
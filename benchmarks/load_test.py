@@ -0,0 +1,387 @@
+"""
+Load test of the API routes against the fake SPL upstream.
+
+Starts `benchmarks.fake_upstream` and the API as separate processes, drives
+every route at each concurrency level and reports p50/p95/p99 latency,
+throughput, errors and the API's resident memory. Results are saved as JSON
+and can be compared with a previous run. The streaming routes
+(`/access/stream`, `/access/ws`) hold connections open and are left out.
+
+Usage:
+    uv run python -m benchmarks.load_test --rows 20000 --concurrency 1 8 32
+    uv run python -m benchmarks.load_test --compare benchmarks/results/<run>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from benchmarks.fake_upstream import make_members
+
+RESULTS_DIR = Path(__file__).parent / "results"
+AUTH_STRING = "load-test"
+
+
+class Scenario:
+    """
+    A route to drive and how to build each request to it.
+
+    Args:
+        name: Name in the report
+        method: HTTP method
+        build: Returns the path and JSON body of the next request
+    """
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        build: Callable[[random.Random], tuple[str, Any]],
+    ):
+        self.name = name
+        self.method = method
+        self.build = build
+
+
+def make_scenarios(members: int, seed: int, cursor: str) -> list[Scenario]:
+    base = make_members(members, seed)
+    with_files = [member for member in base if member.inbody_files]
+    yesterday = date.today() - timedelta(days=1)
+    week_ago = yesterday - timedelta(days=6)
+
+    def get(path: str) -> Callable[[random.Random], tuple[str, Any]]:
+        return lambda rng: (path, None)
+
+    return [
+        Scenario("health", "GET", get("/")),
+        Scenario("metrics", "GET", get("/metrics")),
+        Scenario("access_snapshot", "GET", get("/access")),
+        Scenario("access_since", "GET", get(f"/access?since={cursor}")),
+        Scenario(
+            "access_filtered",
+            "GET",
+            lambda rng: (
+                f"/access?location={rng.choice([101, 102, 104])}&limit=100",
+                None,
+            ),
+        ),
+        Scenario(
+            "access_range",
+            "GET",
+            get(f"/access?from={week_ago.isoformat()}&to={yesterday.isoformat()}"),
+        ),
+        Scenario("access_occupancy", "GET", get("/access/occupancy")),
+        Scenario(
+            "abm_user",
+            "GET",
+            lambda rng: (f"/user/abm/{rng.choice(base).run}", None),
+        ),
+        Scenario(
+            "abm_batch",
+            "POST",
+            lambda rng: (
+                "/user/abm/batch",
+                {"runs": [member.run for member in rng.sample(base, 50)]},
+            ),
+        ),
+        Scenario(
+            "user_profile",
+            "GET",
+            lambda rng: (f"/user/{rng.choice(base).external_id}", None),
+        ),
+        Scenario(
+            "user_batch",
+            "POST",
+            lambda rng: (
+                "/user/batch",
+                {
+                    "externalIds": [
+                        member.external_id for member in rng.sample(base, 50)
+                    ]
+                },
+            ),
+        ),
+        Scenario(
+            "inbody_links",
+            "GET",
+            lambda rng: (f"/user/{rng.choice(base).run}/inbody", None),
+        ),
+        Scenario(
+            "inbody_file",
+            "GET",
+            lambda rng: _inbody_file_path(rng.choice(with_files)),
+        ),
+    ]
+
+
+def _inbody_file_path(member) -> tuple[str, Any]:
+    return f"/user/{member.run}/inbody/{member.inbody_files[0]}", None
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def read_rss(pid: int) -> tuple[float, float] | None:
+    """Current and peak resident memory of a process in MiB, Linux only."""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    values = {}
+    for line in status.splitlines():
+        key, _, value = line.partition(":")
+        if key in ("VmRSS", "VmHWM"):
+            values[key] = int(value.split()[0]) / 1024
+    return values.get("VmRSS", 0.0), values.get("VmHWM", 0.0)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    seed: int,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    prepared = [scenario.build(rng) for _ in range(requests)]
+    latencies: list[float] = []
+    errors = 0
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_request
+        while next_request < len(prepared):
+            path, body = prepared[next_request]
+            next_request += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, json=body)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_rps": requests / elapsed,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up in {timeout} seconds")
+
+
+def start_processes(args: argparse.Namespace, workdir: Path) -> tuple[list, str]:
+    upstream_port = free_port()
+    api_port = free_port()
+    python = sys.executable
+
+    # The children keep their own copies of the log file descriptors
+    with open(workdir / "upstream.log", "w") as log:
+        upstream = subprocess.Popen(
+            [
+                python,
+                "-m",
+                "benchmarks.fake_upstream",
+                f"--port={upstream_port}",
+                f"--rows={args.rows}",
+                f"--members={args.members}",
+                f"--latency={args.latency}",
+                f"--jitter={args.jitter}",
+                f"--session-ttl={args.session_ttl}",
+                f"--seed={args.seed}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+        )
+    env = {
+        **os.environ,
+        "SOURCE_BASE_URL": f"http://127.0.0.1:{upstream_port}",
+        "SOURCE_USERNAME": "load",
+        "SOURCE_PASSWORD": "test",
+        "AUTH_STRING": AUTH_STRING,
+        "ACCESS_STORE_PATH": str(workdir / "access.db"),
+        "INBODY_CACHE_DIR": str(workdir / "inbody"),
+        "CHECKPOINT_PATH": str(workdir / "checkpoint.json.gz"),
+    }
+    with open(workdir / "api.log", "w") as log:
+        api = subprocess.Popen(
+            [python, "-m", "uvicorn", "app.main:app", f"--port={api_port}"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+        )
+
+    wait_until_up(f"http://127.0.0.1:{upstream_port}/stats", upstream, 30)
+    wait_until_up(f"http://127.0.0.1:{api_port}/", api, 60)
+    return [upstream, api], f"http://127.0.0.1:{api_port}"
+
+
+async def run_load(args: argparse.Namespace, base_url: str, api_pid: int) -> list:
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"X-Auth-String": AUTH_STRING},
+        timeout=120.0,
+        limits=limits,
+    ) as client:
+        snapshot = (await client.get("/access")).json()
+        cursor = snapshot["data"]["cursor"]
+
+        results = []
+        for scenario in make_scenarios(args.members, args.seed, cursor):
+            if args.only and scenario.name not in args.only:
+                continue
+            for concurrency in args.concurrency:
+                # Warm caches and connections, then measure
+                await run_scenario(
+                    client, scenario, concurrency, concurrency, args.seed
+                )
+                result = await run_scenario(
+                    client, scenario, concurrency, args.requests, args.seed + 1
+                )
+                rss = read_rss(api_pid)
+                result["rss_mib"] = rss[0] if rss else None
+                results.append(result)
+                print(format_result(result), flush=True)
+        return results
+
+
+def format_result(result: dict[str, Any]) -> str:
+    rss = f"{result['rss_mib']:>7.1f}" if result["rss_mib"] is not None else "      -"
+    return (
+        f"{result['scenario']:<18} c={result['concurrency']:<4} "
+        f"p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  "
+        f"p99 {result['p99_ms']:>8.1f} ms  {result['throughput_rps']:>8.1f} req/s  "
+        f"err {result['errors']:<4} rss {rss} MiB"
+    )
+
+
+def compare(current: dict[str, Any], previous_path: Path) -> None:
+    previous = json.loads(previous_path.read_text())
+    before = {(r["scenario"], r["concurrency"]): r for r in previous["results"]}
+    print(f"\nchange against {previous_path} ({previous.get('commit') or 'unknown'}):")
+    for result in current["results"]:
+        old = before.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+        p95 = _change(old["p95_ms"], result["p95_ms"])
+        throughput = _change(old["throughput_rps"], result["throughput_rps"])
+        print(
+            f"{result['scenario']:<18} c={result['concurrency']:<4} "
+            f"p95 {p95:>+7.1f}%  throughput {throughput:>+7.1f}%"
+        )
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="per level")
+    parser.add_argument("--only", nargs="+", help="scenario names to run")
+    parser.add_argument("--rows", type=int, default=20000, help="ACCESOS rows per day")
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument("--session-ttl", type=float, default=0, help="seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="results file")
+    parser.add_argument("--compare", type=Path, help="previous results file")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory(prefix="spl-load-") as workdir:
+        processes, base_url = start_processes(args, Path(workdir))
+        try:
+            results = asyncio.run(run_load(args, base_url, processes[1].pid))
+            peak = read_rss(processes[1].pid)
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = {
+        "date": started.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": git_commit(),
+        "settings": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("output", "compare")
+        },
+        "peak_rss_mib": peak[1] if peak else None,
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"load-{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    peak_text = f"{peak[1]:.1f} MiB" if peak else "-"
+    print(f"\npeak rss: {peak_text}, saved to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,93 @@ class Config:
         self.SOURCE_BASE_URL = os.getenv("SOURCE_BASE_URL", "")
         self.SOURCE_USERNAME = os.getenv("SOURCE_USERNAME", "")
         self.SOURCE_PASSWORD = os.getenv("SOURCE_PASSWORD", "")
+        # Session lifetime in seconds, 0 to learn it from observed expiries
+        self.SOURCE_SESSION_TTL = float(os.getenv("SOURCE_SESSION_TTL", "0"))
+        self.SOURCE_SESSION_REFRESH_RATIO = float(
+            os.getenv("SOURCE_SESSION_REFRESH_RATIO", "0.8")
+        )
+
+        # Upstream traffic cassette: off, record or replay
+        self.SOURCE_CASSETTE_MODE = os.getenv("SOURCE_CASSETTE_MODE", "off")
+        self.SOURCE_CASSETTE_PATH = os.getenv(
+            "SOURCE_CASSETTE_PATH", "data/source.cassette.gz"
+        )
+        # Divisor of the recorded latencies on replay, 0 to answer immediately
+        self.SOURCE_CASSETTE_SPEED = float(os.getenv("SOURCE_CASSETTE_SPEED", "1"))
+
+        # Upstream admission: seconds a call may queue for a slot before
+        # failing with 503, and the latency over the baseline that counts as
+        # overload
+        self.UPSTREAM_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "5"))
+        self.UPSTREAM_BACKGROUND_QUEUE_TIMEOUT = float(
+            os.getenv("UPSTREAM_BACKGROUND_QUEUE_TIMEOUT", "30")
+        )
+        self.UPSTREAM_LATENCY_TOLERANCE = float(
+            os.getenv("UPSTREAM_LATENCY_TOLERANCE", "2.0")
+        )
+        # Upstream circuit breakers: consecutive failures that open an
+        # operation's circuit, and seconds between recovery trials
+        self.CIRCUIT_FAILURE_THRESHOLD = int(
+            os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")
+        )
+        self.CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+        # Hedging of idempotent upstream reads: a call slower than this
+        # percentile of recent latencies is sent again, for at most the
+        # budget's fraction of extra calls
+        self.UPSTREAM_HEDGING = os.getenv("UPSTREAM_HEDGING", "false").lower() == "true"
+        self.UPSTREAM_HEDGE_PERCENTILE = float(
+            os.getenv("UPSTREAM_HEDGE_PERCENTILE", "95")
+        )
+        self.UPSTREAM_HEDGE_BUDGET = float(os.getenv("UPSTREAM_HEDGE_BUDGET", "0.05"))
+
+        # Default request deadline in seconds, 0 for none; clients may set a
+        # shorter one with X-Request-Timeout or X-Request-Deadline
+        self.REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+
+        # HTML parser backend: auto, lxml or bs4
+        self.HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+
+        # Parse Executor Configuration: inline, thread or process
+        self.PARSE_EXECUTOR_MODE = os.getenv("PARSE_EXECUTOR_MODE", "thread")
+        self.PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "4"))
+        # Payloads smaller than this (in characters) are parsed on the event loop
+        self.PARSE_INLINE_MAX_SIZE = int(os.getenv("PARSE_INLINE_MAX_SIZE", "65536"))
+
+        # Member Cache Configuration (TTLs in seconds)
+        self.ABM_CACHE_SIZE = int(os.getenv("ABM_CACHE_SIZE", "20000"))
+        self.ABM_CACHE_TTL = float(os.getenv("ABM_CACHE_TTL", "86400"))
+        self.ABM_CACHE_NEGATIVE_TTL = float(os.getenv("ABM_CACHE_NEGATIVE_TTL", "300"))
+
+        self.PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "5000"))
+        self.PROFILE_CACHE_SOFT_TTL = float(os.getenv("PROFILE_CACHE_SOFT_TTL", "300"))
+        self.PROFILE_CACHE_HARD_TTL = float(os.getenv("PROFILE_CACHE_HARD_TTL", "3600"))
+
+        # InBody File Cache Configuration
+        self.INBODY_CACHE_DIR = os.getenv("INBODY_CACHE_DIR", "data/inbody")
+        self.INBODY_CACHE_MAX_BYTES = int(
+            os.getenv("INBODY_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+        )
+
+        # Warm restart checkpoint: file and seconds between saves, 0 to only
+        # save on shutdown
+        self.CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "data/checkpoint.json.gz")
+        self.CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", "300"))
+
+        # Batch Lookup Configuration
+        self.BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+        self.BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "5000"))
+
+        # Access Poller Configuration
+        self.ACCESS_POLL_INTERVAL = float(os.getenv("ACCESS_POLL_INTERVAL", "10"))
+        self.ACCESS_STREAM_HEARTBEAT = float(os.getenv("ACCESS_STREAM_HEARTBEAT", "15"))
+
+        # Access History Configuration
+        self.ACCESS_STORE_PATH = os.getenv("ACCESS_STORE_PATH", "data/access.db")
+        self.ACCESS_RANGE_CONCURRENCY = int(os.getenv("ACCESS_RANGE_CONCURRENCY", "4"))
+        self.ACCESS_RANGE_MAX_DAYS = int(os.getenv("ACCESS_RANGE_MAX_DAYS", "366"))
+        # Deadline of /access date range reads in seconds, 0 for none
+        self.ACCESS_RANGE_DEADLINE = float(os.getenv("ACCESS_RANGE_DEADLINE", "600"))
 
         # Additional Configuration
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.controllers import access_controller
+from app.main import app
+from app.mappers.access_mappers import AccessDataMapper
+from app.services.access_poller import AccessPoller
+from app.services.access_store import AccessStore
+from app.services.source_service import SourceService
+from config.env import config
+
+HEADERS = {"X-Auth-String": config.AUTH_STRING}
+
+
+def cold_poller() -> AccessPoller:
+    """The poller back to its state before the first poll, as on a day roll."""
+    poller = AccessPoller()
+    poller._day = ""
+    poller._roll_day()
+    return poller
+
+
+def page_without_array(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"sesion": True, "html": "<p>Mantención</p>"})
+
+
+class AccessPageWithoutArrayTest(unittest.TestCase):
+    """An ACCESOS page without `tablaReser` while the poller is still cold."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = AccessStore()
+        self.store.close()
+        self.store._path = Path(self.directory.name) / "access.db"
+
+        self.source_service = SourceService()
+        self.original_client = self.source_service._client
+        self.source_service._client = httpx.AsyncClient(
+            base_url="http://source.test/",
+            transport=httpx.MockTransport(page_without_array),
+        )
+        cold_poller()
+        # Without a context manager the lifespan, and so the poller, never runs
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.source_service._client = self.original_client
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_today_is_served_empty(self):
+        response = self.client.get("/access", headers=HEADERS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["data"]["count"], 0)
+
+        response = self.client.get("/access/occupancy", headers=HEADERS)
+        self.assertEqual(response.status_code, 200)
+
+    def test_closed_day_is_not_stored(self):
+        day = (date.today() - timedelta(days=3)).isoformat()
+        response = self.client.get(
+            "/access", params={"from": day, "to": day}, headers=HEADERS
+        )
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(
+            response.json(), {"detail": {"code": "UPSTREAM_INVALID_RESPONSE"}}
+        )
+        self.assertEqual(
+            self.store._stored_days("2000-01-01", date.today().isoformat()), set()
+        )
+
+
+class AccessPagingTest(unittest.TestCase):
+    def setUp(self):
+        today = date.today().isoformat()
+        cold_poller().apply(
+            AccessDataMapper.map_access_records(
+                [
+                    {
+                        "IDCONTACTO": n,
+                        "RUT": f"{n}-9",
+                        "SOCIO": "Camila Soto",
+                        "FECHA": today,
+                        "TURNOINI": f"{8 + n:02d}:00:00",
+                        "TURNOFIN": None,
+                        "ACTIVIDAD": "Yoga",
+                        "SEDE": "Dominicos",
+                    }
+                    for n in range(3)
+                ]
+            )
+        )
+        self.client = TestClient(app)
+
+    def test_only_the_first_page_resets(self):
+        first = self.client.get("/access", params={"limit": 2}, headers=HEADERS).json()[
+            "data"
+        ]
+        self.assertTrue(first["reset"])
+        self.assertEqual(first["count"], 2)
+
+        second = self.client.get(
+            "/access", params={"limit": 2, "after": first["next"]}, headers=HEADERS
+        ).json()["data"]
+        self.assertFalse(second["reset"])
+        self.assertEqual(second["count"], 1)
+        self.assertIsNone(second["next"])
+
+
+class SnapshotBodyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.poller = cold_poller()
+        self.poller.apply([])
+        access_controller._snapshot_bodies.clear()
+
+    def test_older_encoding_keeps_newer_body(self):
+        day, _, version = self.poller.cursor.rpartition(".")
+        older, newer = f"{day}.{int(version) - 1}", f"{day}.{int(version) + 1}"
+        access_controller._snapshot_bodies[older] = object()
+        access_controller._snapshot_bodies[newer] = object()
+
+        asyncio.run(access_controller._encode_snapshot())
+
+        self.assertEqual(
+            set(access_controller._snapshot_bodies), {self.poller.cursor, newer}
+        )
+
+    def test_etag_is_stable_while_the_snapshot_is(self):
+        client = TestClient(app)
+        first = client.get("/access", headers=HEADERS)
+        second = client.get("/access", headers=HEADERS)
+        self.assertEqual(first.headers["ETag"], second.headers["ETag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
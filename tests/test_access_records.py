@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from app.mappers.access_mappers import AccessDataMapper
+from app.models.access_model import AccessFilter
+from app.models.access_records import AccessRecords, epoch_to_utc, utc_to_epoch
+
+ACTIVITIES = ["Musculación", "Spinning", "Yoga"]
+LOCATIONS = ["Dominicos", "Chicureo", "Sede desconocida"]
+
+
+def raw_day(day: str, rows: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    records = []
+    for _ in range(rows):
+        hours, seconds = divmod(rng.randint(0, 86399), 3600)
+        records.append(
+            {
+                "IDCONTACTO": rng.randint(1, 50),
+                "RUT": f"{rng.randint(1, 50)}-{rng.choice('0K')}",
+                "SOCIO": rng.choice(["Camila Soto", "Vicente Rojas"]),
+                "FECHA": day,
+                "TURNOINI": f"{hours:02d}:{seconds // 60:02d}:{seconds % 60:02d}",
+                "TURNOFIN": rng.choice([None, "23:59:59"]),
+                "ACTIVIDAD": rng.choice(ACTIVITIES),
+                "SEDE": rng.choice(LOCATIONS),
+            }
+        )
+    return records
+
+
+class AccessRecordsTest(unittest.TestCase):
+    """The columnar container must read back exactly like the models."""
+
+    def setUp(self):
+        # A DST transition day and a regular one
+        raw = raw_day("2026-04-04", 300) + raw_day("2026-10-17", 300, seed=7)
+        self.models = AccessDataMapper.map_access_records(raw)
+        self.records = AccessDataMapper.map_access_columns(raw)
+
+    def test_serializes_like_the_models(self):
+        self.assertEqual(
+            self.records.to_dicts(),
+            [model.model_dump(by_alias=True) for model in self.models],
+        )
+        self.assertEqual(self.records.to_models(), self.models)
+
+    def test_from_models_and_extend(self):
+        copied = AccessRecords()
+        copied.extend(AccessRecords.from_models(self.models))
+        self.assertEqual(copied.to_models(), self.models)
+
+    def test_where_matches_the_model_filter(self):
+        filters = [
+            AccessFilter(),
+            AccessFilter(location=self.models[0].location),
+            AccessFilter(run=self.models[0].run.lower()),
+            AccessFilter(activity="MUSCULACIÓN"),
+            AccessFilter(open_only=True),
+            AccessFilter(
+                entry_from="2026-10-17T12:00:00Z", entry_to="2026-10-17T18:00:00Z"
+            ),
+        ]
+        for access_filter in filters:
+            with self.subTest(access_filter=access_filter):
+                self.assertEqual(
+                    self.records.where(access_filter).to_models(),
+                    [model for model in self.models if access_filter.matches(model)],
+                )
+
+    def test_epoch_round_trip(self):
+        for value in ("1970-01-01T00:00:00Z", "2024-02-29T23:59:59Z"):
+            with self.subTest(value=value):
+                self.assertEqual(epoch_to_utc(utc_to_epoch(value)), value)
+
+
+if __name__ == "__main__":
+    unittest.main()
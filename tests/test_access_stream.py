@@ -0,0 +1,122 @@
+import json
+import random
+import re
+import unittest
+
+from app.mappers.access_mappers import AccessDataMapper
+from app.models.access_records import AccessRecords
+from app.parsers.access_stream import TablaReserStream, parse_access_chunk
+
+# Characters that stress the html string decoding: escapes, quotes, markup,
+# non-ASCII and astral code points encoded as surrogate pairs
+ALPHABET = 'abcXYZ 019 "\\/\n\t<>{}[],:=ñÑáé€😀𝄞'
+LOCATIONS = ["Dominicos", "Chicureo", "Sede desconocida"]
+
+
+def random_text(rng: random.Random) -> str:
+    text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 24)))
+    # The old regex ends the array at the first '];', keep it unambiguous
+    return text.replace("];", "]")
+
+
+def random_record(rng: random.Random, day: str) -> dict:
+    entry = rng.randint(6 * 3600, 22 * 3600)
+    return {
+        "IDCONTACTO": rng.randint(1, 99999),
+        "RUT": f"{rng.randint(5_000_000, 25_000_000)}-{rng.choice('0123456789K')}",
+        "SOCIO": random_text(rng),
+        "FECHA": day,
+        "TURNOINI": f"{entry // 3600:02d}:{entry // 60 % 60:02d}:00",
+        "TURNOFIN": rng.choice([None, f"{entry // 3600 + 1:02d}:00:00"]),
+        "ACTIVIDAD": random_text(rng),
+        "SEDE": rng.choice(LOCATIONS),
+    }
+
+
+def random_page(rng: random.Random) -> tuple[str, list[dict]]:
+    day = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    records = [random_record(rng, day) for _ in range(rng.randint(0, 20))]
+    array = json.dumps(
+        records, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1])
+    )
+    html = (
+        f"<html><body><p>{random_text(rng).replace('tablaReser', '')}</p>"
+        f"<script>var tablaReser{rng.choice(['', ' ', '  '])}="
+        f"{rng.choice(['', ' ', chr(10)])}{array};</script></body></html>"
+    )
+    envelope = {"sesion": True, "html": html, "otro": random_text(rng)}
+    if rng.random() < 0.5:
+        envelope = {"html": html, "sesion": True}
+    return json.dumps(envelope, ensure_ascii=rng.random() < 0.5), records
+
+
+def regex_parse(body: str) -> list[dict] | None:
+    """The parse the stream replaced: decode the envelope, then the array."""
+    html = json.loads(body)["html"]
+    match = re.search(r"tablaReser\s*=\s*(\[.*?\]);", html, re.DOTALL)
+    return json.loads(match.group(1)) if match else None
+
+
+def chunks(body: str, rng: random.Random) -> list[str]:
+    size = rng.choice([1, 3, 16, 64, 257, 1024, 4096, len(body) + 1])
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def stream_parse(pieces: list[str]) -> tuple[TablaReserStream, list[dict]]:
+    stream = TablaReserStream()
+    records = []
+    for piece in pieces:
+        records.extend(stream.feed(piece))
+    stream.close()
+    return stream, records
+
+
+class TablaReserStreamTest(unittest.TestCase):
+    def test_matches_regex_parse_on_randomized_pages(self):
+        rng = random.Random(2026)
+        for page in range(500):
+            body, records = random_page(rng)
+            pieces = chunks(body, rng)
+            with self.subTest(page=page, chunk_size=len(pieces[0])):
+                stream, parsed = stream_parse(pieces)
+                self.assertTrue(stream.found)
+                self.assertFalse(stream.session_expired)
+                self.assertEqual(parsed, regex_parse(body))
+                self.assertEqual(parsed, records)
+
+    def test_mapped_chunks_match_mapping_the_whole_page(self):
+        rng = random.Random(7)
+        for page in range(50):
+            body, records = random_page(rng)
+            with self.subTest(page=page):
+                stream, mapped = TablaReserStream(), AccessRecords()
+                for piece in chunks(body, rng):
+                    stream, batch = parse_access_chunk(stream, piece)
+                    mapped.extend(batch)
+                expected = AccessDataMapper.map_access_columns(records)
+                self.assertEqual(mapped.to_dicts(), expected.to_dicts())
+
+    def test_session_expired(self):
+        stream, records = stream_parse(['{"ses', 'ion": fal', "se}"])
+        self.assertTrue(stream.session_expired)
+        self.assertEqual(records, [])
+
+    def test_page_without_array(self):
+        body = json.dumps({"sesion": True, "html": "<p>Sin registros</p>"})
+        stream, records = stream_parse(chunks(body, random.Random(1)))
+        self.assertFalse(stream.found)
+        self.assertEqual(records, [])
+
+    def test_truncated_responses_raise(self):
+        body, _ = random_page(random.Random(3))
+        cut = body.index("tablaReser") + 20
+        for truncated in (body[:cut], '{"sesion": true}'):
+            with self.subTest(body=truncated[-20:]):
+                stream = TablaReserStream()
+                stream.feed(truncated)
+                with self.assertRaises(ValueError):
+                    stream.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
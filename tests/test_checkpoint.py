@@ -0,0 +1,43 @@
+import asyncio
+import gzip
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.services.checkpoint import Checkpoint
+
+
+class CheckpointFileTest(unittest.TestCase):
+    """The checkpoint holds session cookies, only its owner may read it."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.checkpoint = Checkpoint()
+        self.original_path = self.checkpoint._path
+        self.checkpoint._path = Path(self.directory.name) / "checkpoint.json.gz"
+
+    def tearDown(self):
+        self.checkpoint._path = self.original_path
+
+    def test_leftover_temporary_file_is_not_reused(self):
+        temporary = self.checkpoint._path.with_name("checkpoint.json.gz.tmp")
+        temporary.write_bytes(b"partial")
+        temporary.chmod(0o644)
+
+        self.checkpoint._write({"format": 0})
+
+        self.assertFalse(temporary.exists())
+        mode = stat.S_IMODE(self.checkpoint._path.stat().st_mode)
+        self.assertEqual(mode, 0o600)
+
+    def test_invalid_checkpoint_is_ignored(self):
+        for content in (b"not gzip", gzip.compress(b"[1, 2]")):
+            with self.subTest(content=content[:8]):
+                self.checkpoint._path.write_bytes(content)
+                self.assertFalse(asyncio.run(self.checkpoint.load()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from datetime import date, timedelta
+
+from utils.date_format import (
+    format_chilean_date_time_to_utc,
+    format_chilean_date_times_to_utc,
+)
+
+
+def convert_one(day: str | None, hour: str | None) -> str | None:
+    return None if hour is None else format_chilean_date_time_to_utc(day, hour)
+
+
+class BatchUtcConversionTest(unittest.TestCase):
+    """The batch conversion must match the per-value one exactly."""
+
+    def assert_same(self, values: list[tuple[str | None, str | None]]) -> None:
+        self.assertEqual(
+            format_chilean_date_times_to_utc(values),
+            [convert_one(day, hour) for day, hour in values],
+        )
+
+    def test_every_twenty_minutes_2022_to_2026(self):
+        hours = [
+            f"{minute // 60:02d}:{minute % 60:02d}:00" for minute in range(0, 1440, 20)
+        ]
+        day = date(2022, 1, 1)
+        while day.year < 2027:
+            with self.subTest(day=day):
+                self.assert_same([(day.isoformat(), hour) for hour in hours])
+            day += timedelta(days=1)
+
+    def test_dst_transition_days(self):
+        # Santiago clocks changed on these days, every value of them takes
+        # the per-value path
+        for day in ("2024-04-06", "2024-04-07", "2024-09-07", "2024-09-08"):
+            with self.subTest(day=day):
+                self.assert_same(
+                    [(day, f"{h:02d}:{m:02d}:00") for h in range(24) for m in (0, 30)]
+                )
+
+    def test_missing_and_non_canonical_values(self):
+        self.assert_same(
+            [
+                ("2026-10-17", None),
+                (None, "08:15:00"),
+                ("", "23:59:59"),
+                ("2026-10-17", "8:15:00"),
+                ("2026-10-17", "08:15:0"),
+            ]
+        )
+
+    def test_invalid_values_raise_like_the_per_value_conversion(self):
+        for day, hour in (("2026-10-17", "24:00:00"), ("2026-13-01", "08:00:00")):
+            with self.subTest(day=day, hour=hour):
+                with self.assertRaises(ValueError):
+                    format_chilean_date_time_to_utc(day, hour)
+                with self.assertRaises(ValueError):
+                    format_chilean_date_times_to_utc([(day, hour)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+
+from utils.disk_cache import ContentAddressedCache
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+class ContentAddressedCacheTest(unittest.IsolatedAsyncioTestCase):
+    """Eviction must not delete a file that is still being served."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = ContentAddressedCache(self.directory.name, max_bytes=8)
+
+    async def test_pinned_file_outlives_eviction(self):
+        self.cache.pin("a")
+        served = await self.cache.put("a", chunks(b"aaaa", b"aa"), "text/plain")
+        await self.cache.put("b", chunks(b"bbbbbb"), "text/plain")
+
+        self.assertEqual(served.path.read_bytes(), b"aaaaaa")
+
+        await self.cache.unpin("a")
+        self.assertFalse(served.path.exists())
+        self.assertIsNone(await self.cache.get("a"))
+
+    async def test_index_is_rebuilt_from_disk(self):
+        stored = await self.cache.put("a", chunks(b"aaaa"), "text/plain")
+
+        reopened = ContentAddressedCache(self.directory.name, max_bytes=8)
+        cached = await reopened.get("a")
+        self.assertEqual(cached.digest, stored.digest)
+        self.assertEqual(cached.content_type, "text/plain")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from pathlib import Path
+
+from app.parsers.html_parser import LxmlParser, SoupParser, lxml
+
+FIXTURES = Path(__file__).parent / "fixtures"
+BASE_URL = "https://spl.example.cl"
+
+
+def fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@unittest.skipIf(lxml is None, "lxml is not installed")
+class HtmlParserParityTest(unittest.TestCase):
+    """Both backends must build the same models from the recorded pages."""
+
+    def setUp(self):
+        self.soup = SoupParser()
+        self.lxml = LxmlParser()
+
+    def test_abm_user(self):
+        cases = [
+            ("abm_socios.html", "12345678-K"),
+            ("abm_socios.html", "12345679-8"),
+            ("abm_socios_empty.html", "12345678-K"),
+            ("verperfil_not_found.html", "12345678-K"),
+        ]
+        for name, run in cases:
+            with self.subTest(page=name, run=run):
+                html_str = fixture(name)
+                self.assertEqual(
+                    self.soup.parse_abm_user(html_str, run),
+                    self.lxml.parse_abm_user(html_str, run),
+                )
+
+        user = self.lxml.parse_abm_user(fixture("abm_socios.html"), "12345678-K")
+        self.assertIsNotNone(user)
+        self.assertEqual(user.external_id, 48213)
+        self.assertEqual(user.last_name, "MuñozContreras")
+
+    def test_user(self):
+        for name in (
+            "verperfil.html",
+            "verperfil_broken_contact.html",
+            "verperfil_not_found.html",
+            "abm_socios.html",
+        ):
+            with self.subTest(page=name):
+                html_str = fixture(name)
+                self.assertEqual(
+                    self.soup.parse_user(html_str), self.lxml.parse_user(html_str)
+                )
+
+        user = self.lxml.parse_user(fixture("verperfil.html"))
+        self.assertEqual(user.run, "12345678-K")
+        self.assertEqual(len(user.access_history), 4)
+
+    def test_inbody_links(self):
+        for name in ("inbody.html", "inbody_empty.html", "verperfil.html"):
+            with self.subTest(page=name):
+                html_str = fixture(name)
+                self.assertEqual(
+                    self.soup.parse_inbody_links(html_str, BASE_URL),
+                    self.lxml.parse_inbody_links(html_str, BASE_URL),
+                )
+
+        self.assertEqual(
+            self.lxml.parse_inbody_links(fixture("inbody.html"), BASE_URL),
+            [
+                f"{BASE_URL}/uploads_inbody/48213_2026-09-30.pdf",
+                "https://storage.googleapis.com/spl-inbody/48213_2026-03-15.pdf",
+                f"{BASE_URL}/uploads_inbody/48213_2025-11-02.pdf",
+            ],
+        )
+
+    def test_empty_page(self):
+        self.assertEqual(self.soup.parse_user(""), self.lxml.parse_user(""))
+        self.assertIsNone(self.lxml.parse_abm_user("", "1-9"))
+        self.assertEqual(self.lxml.parse_inbody_links("", BASE_URL), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.request_lifetime import RequestLifetimeMiddleware
+
+
+async def slow_body():
+    for _ in range(3):
+        await asyncio.sleep(0.1)
+        yield b"chunk"
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow-start")
+    async def slow_start():
+        await asyncio.sleep(0.3)
+        return {}
+
+    @app.get("/slow-body")
+    async def slow_body_route():
+        return StreamingResponse(slow_body(), media_type="application/octet-stream")
+
+    app.add_middleware(RequestLifetimeMiddleware)
+    return app
+
+
+class RequestDeadlineTest(unittest.TestCase):
+    """The deadline bounds the wait for the response, not its body."""
+
+    def setUp(self):
+        self.client = TestClient(create_app())
+
+    def test_deadline_before_start_answers_504(self):
+        response = self.client.get("/slow-start", headers={"X-Request-Timeout": "0.1"})
+        self.assertEqual(response.status_code, 504)
+
+    def test_started_body_outlives_deadline(self):
+        response = self.client.get("/slow-body", headers={"X-Request-Timeout": "0.1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"chunk" * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
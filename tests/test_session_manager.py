@@ -0,0 +1,33 @@
+import asyncio
+import unittest
+
+from app.services.metrics import Metrics
+from app.services.session_manager import SessionManager
+
+
+class ReloginCounterTest(unittest.IsolatedAsyncioTestCase):
+    """Only callers that actually log in count as re-logins."""
+
+    async def test_concurrent_expiries_count_one_relogin(self):
+        logins = 0
+
+        async def login():
+            nonlocal logins
+            logins += 1
+            await asyncio.sleep(0.01)
+
+        session = SessionManager(login, login_errors=(OSError,))
+        relogins = Metrics().relogins
+        before = relogins._values.get(("VERPERFIL",), 0)
+
+        await asyncio.gather(
+            *(session.refresh(0, operation="VERPERFIL") for _ in range(5))
+        )
+        await session.refresh(session.generation, expired=False)
+
+        self.assertEqual(logins, 2)
+        self.assertEqual(relogins._values.get(("VERPERFIL",), 0) - before, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import httpx
+
+from app.services.source_service import ParseException, SourceService
+
+
+def source(request: httpx.Request) -> httpx.Response:
+    if request.url.path.startswith("/uploads_inbody/"):
+        return httpx.Response(404)
+    if request.method != "POST":
+        return httpx.Response(405)
+    return httpx.Response(200, json={"sesion": True})
+
+
+class UpstreamAdmissionTest(unittest.IsolatedAsyncioTestCase):
+    """Only congestion of the source system may lower the limits."""
+
+    def setUp(self):
+        self.source_service = SourceService()
+        self.original_client = self.source_service._client
+        self.source_service._client = httpx.AsyncClient(
+            base_url="http://source.test/", transport=httpx.MockTransport(source)
+        )
+
+    async def asyncTearDown(self):
+        await self.source_service._client.aclose()
+        self.source_service._client = self.original_client
+
+    async def test_invalid_page_is_not_congestion(self):
+        limiter = self.source_service._limiters["ACCESOS"]
+        decreases = limiter.decreases
+
+        with self.assertRaises(ParseException):
+            await self.source_service._fetch_access("2026-10-17")
+        self.assertEqual(limiter.decreases, decreases)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_missing_file_is_not_congestion(self):
+        limiter = self.source_service._limiters["uploads_inbody"]
+        decreases = limiter.decreases
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.source_service._fetch_inbody_file(
+                "http://source.test/uploads_inbody/1_0.pdf"
+            )
+        self.assertEqual(limiter.decreases, decreases)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_probe_needs_a_successful_answer(self):
+        self.assertTrue(await self.source_service._probe_upstream("VERPERFIL"))
+        # A 4xx, here a 405 for the GET, is no sign of recovery
+        self.assertFalse(await self.source_service._probe_upstream("abm_socios"))
+
+
+if __name__ == "__main__":
+    unittest.main()
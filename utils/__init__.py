@@ -1,4 +1,42 @@
 from .singleton import Singleton
 from .decorators import singleton
+from .single_flight import SingleFlight
+from .ttl_cache import TTLCache
+from .swr_cache import SWRCache
+from .fan_out import map_as_completed
+from .encoded_body import EncodedBody, dumps_json, etag_matches
+from .disk_cache import CachedFile, ContentAddressedCache
+from .cassette import RecordingTransport, ReplayTransport
+from .adaptive_limiter import AdaptiveLimiter, Priority, QueueTimeout, upstream_priority
+from .circuit_breaker import CircuitBreaker, CircuitOpen, CircuitState
+from .stale import StaleStore, note_stale
+from .hedging import Hedger
+from .deadline import DeadlineExceeded, deadline_scope
 
-__all__ = ["Singleton", "singleton"]
+__all__ = [
+    "Singleton",
+    "singleton",
+    "SingleFlight",
+    "TTLCache",
+    "SWRCache",
+    "map_as_completed",
+    "EncodedBody",
+    "dumps_json",
+    "etag_matches",
+    "CachedFile",
+    "ContentAddressedCache",
+    "RecordingTransport",
+    "ReplayTransport",
+    "AdaptiveLimiter",
+    "Priority",
+    "QueueTimeout",
+    "upstream_priority",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "CircuitState",
+    "StaleStore",
+    "note_stale",
+    "Hedger",
+    "DeadlineExceeded",
+    "deadline_scope",
+]
@@ -0,0 +1,236 @@
+"""
+Adaptive concurrency limit with priority admission.
+
+The limit follows AIMD: it grows by about one slot per limit's worth of
+fast completions and is cut by a factor when a call fails or takes longer
+than `latency_tolerance` times the baseline, the lowest latency recently
+seen. Cuts happen at most once per average latency, so one slow burst
+does not collapse the limit.
+
+Callers over the limit wait in a queue ordered by priority, then arrival.
+A caller that waits longer than its queue timeout gets `QueueTimeout`,
+instead of piling onto a slow upstream.
+
+The priority of upstream work is taken from the context, so a background
+task sets it once with `upstream_priority` and every call it makes queues
+behind interactive requests.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "upstream_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def upstream_priority(priority: Priority) -> Iterator[None]:
+    """Run the calls made inside the block, and tasks they start, at a priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class QueueTimeout(Exception):
+    """
+    Raised when a call waited too long for a slot.
+
+    Attributes:
+        name: Name of the limiter
+        retry_after: Suggested seconds before trying again
+    """
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} is saturated, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """
+    Usage:
+        limiter = AdaptiveLimiter("VERPERFIL", initial_limit=8, max_limit=16)
+        async with limiter.slot():
+            response = await client.post(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        queue_timeouts: dict[Priority, float] | None = None,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.75,
+    ):
+        self.name = name
+        self.limit: float = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._queue_timeouts = queue_timeouts or {
+            Priority.INTERACTIVE: 5.0,
+            Priority.BACKGROUND: 30.0,
+        }
+        self._latency_tolerance = latency_tolerance
+        self._backoff = backoff
+
+        # (priority, arrival, future) of callers waiting for a slot
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._baseline: float | None = None
+        self._latency: float | None = None
+        self._decreased_at: float = 0.0
+
+        self.in_flight: int = 0
+        self.waiting: int = 0
+        self.admitted: int = 0
+        self.rejected: int = 0
+        self.decreases: int = 0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority | None = None,
+        is_failure: Callable[[Exception], bool] | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block and feed its latency and
+        outcome back into the limit. Exceptions raised by the block count as
+        failures, cancellations are ignored.
+
+        Args:
+            priority: Queue priority, defaults to the context's
+            is_failure: Whether an exception signals congestion, the others
+                complete the call like a normal exit. Defaults to all of them
+
+        Raises:
+            QueueTimeout: If no slot was free within the priority's timeout
+        """
+        await self.acquire(current_priority() if priority is None else priority)
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.release(failed=True)
+            else:
+                self.release(time.monotonic() - start)
+            raise
+        self.release(time.monotonic() - start)
+
+    async def acquire(self, priority: Priority) -> None:
+        if self.in_flight < self._capacity and not self.waiting:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(self._queue_timeouts[priority]):
+                await future
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over as the wait was interrupted
+                self.release()
+            else:
+                # Left in the heap, skipped when popped
+                future.cancel()
+                self.waiting -= 1
+            if isinstance(e, TimeoutError):
+                self.rejected += 1
+                raise QueueTimeout(self.name, self.retry_after()) from None
+            raise
+        self.admitted += 1
+
+    def release(self, latency: float | None = None, failed: bool = False) -> None:
+        """
+        Free a slot.
+
+        Args:
+            latency: Duration of the call, None if it was cancelled
+            failed: Whether the call failed
+        """
+        self.in_flight -= 1
+        if failed:
+            self._decrease()
+        elif latency is not None:
+            self._observe(latency)
+        self._wake()
+
+    def retry_after(self) -> int:
+        """Seconds until the queue is likely drained, at least one."""
+        latency = self._latency or 1.0
+        return max(1, math.ceil(latency * (self.waiting + 1) / self._capacity))
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+        }
+
+    @property
+    def _capacity(self) -> int:
+        return max(self._min_limit, int(self.limit))
+
+    def _observe(self, latency: float) -> None:
+        if self._baseline is None:
+            self._baseline = self._latency = latency
+        else:
+            self._latency = 0.8 * self._latency + 0.2 * latency
+            # Follow lasting shifts slowly, drops immediately
+            self._baseline = min(
+                latency, self._baseline + (latency - self._baseline) * 0.01
+            )
+
+        if latency > self._baseline * self._latency_tolerance:
+            self._decrease()
+        elif self.in_flight + 1 >= self._capacity:
+            # Only grow while the limit is actually reached
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._decreased_at < (self._latency or 0.0):
+            return
+        self._decreased_at = now
+        self.limit = max(self._min_limit, self.limit * self._backoff)
+        self.decreases += 1
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self._capacity:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.waiting -= 1
+            self.in_flight += 1
+            future.set_result(None)
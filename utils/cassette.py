@@ -0,0 +1,223 @@
+"""
+Record and replay of HTTP traffic through httpx transports.
+
+`RecordingTransport` wraps the real transport and appends every exchange to
+a cassette: a gzip file of JSON lines, one member per exchange so that a
+crash only loses the exchange being written. `ReplayTransport` serves the
+exchanges of a cassette back without any network, with their recorded
+latency scaled by a speed factor.
+
+Requests are matched by method, URL and body. Bodies and headers are
+scrubbed of credentials before being written, and the same scrubbing is
+applied when matching, so replay works with any configured credentials.
+Repeated requests (e.g. a polled page) are answered in recorded order, the
+last answer is repeated once they run out.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+SCRUBBED = "***"
+# Response headers kept on record, cookies and hop-by-hop headers are dropped
+KEPT_HEADERS = ("content-type", "content-encoding", "location")
+
+
+def scrub_body(body: bytes, secret_fields: Iterable[str]) -> str:
+    """
+    Request body with the values of secret form fields replaced.
+
+    Form bodies are normalized to sorted fields, anything else is kept as text.
+    """
+    text = body.decode("utf-8", errors="replace")
+    fields = parse_qsl(text, keep_blank_values=True)
+    if not fields or "=" not in text:
+        return text
+
+    secret_fields = set(secret_fields)
+    return urlencode(
+        sorted(
+            (name, SCRUBBED if name in secret_fields else value)
+            for name, value in fields
+        )
+    )
+
+
+def _request_key(method: str, url: str, body: str) -> str:
+    return f"{method} {url} {body}"
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Response stream passing chunks through and keeping a copy."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_complete: Callable):
+        self._stream = stream
+        self._on_complete = on_complete
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks = []
+        async for chunk in self._stream:
+            chunks.append(chunk)
+            yield chunk
+        self._on_complete(b"".join(chunks))
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport appending every exchange of the wrapped transport to a cassette.
+
+    Responses are still streamed to the caller, the copy is written once the
+    body has been read completely.
+
+    Usage:
+        transport = RecordingTransport(
+            httpx.AsyncHTTPTransport(), "data/source.cassette.gz", {"CLAVE"}
+        )
+        client = httpx.AsyncClient(transport=transport)
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        path: str | Path,
+        secret_fields: Iterable[str] = (),
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.transport = transport
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._secret_fields = frozenset(secret_fields)
+        self.recorded: int = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+
+        def write(content: bytes) -> None:
+            self._write(request, response, content, time.perf_counter() - started)
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, write),
+            extensions=response.extensions,
+        )
+
+    def _write(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        content: bytes,
+        duration: float,
+    ) -> None:
+        exchange: dict[str, Any] = {
+            "method": request.method,
+            "url": str(request.url),
+            "body": scrub_body(request.content, self._secret_fields),
+            "duration": round(duration, 4),
+            "status": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() in KEPT_HEADERS
+            },
+        }
+        try:
+            exchange["text"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            exchange["base64"] = base64.b64encode(content).decode("ascii")
+
+        # One gzip member per exchange, appended
+        with gzip.open(self._path, "at", encoding="utf-8") as cassette:
+            cassette.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+        self.recorded += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Transport answering from a cassette instead of the network.
+
+    Args:
+        path: Cassette written by `RecordingTransport`
+        speed: Divisor of the recorded latencies, 1 for the original timing
+            and 0 to answer immediately
+        secret_fields: Form fields scrubbed when recording
+
+    Raises:
+        httpx.ConnectError: From requests, when the cassette has no exchange
+            for them
+    """
+
+    def __init__(
+        self, path: str | Path, speed: float = 1.0, secret_fields: Iterable[str] = ()
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._speed = speed
+        self._secret_fields = frozenset(secret_fields)
+        # Request key -> recorded exchanges, in recorded order
+        self._exchanges: dict[str, deque[dict[str, Any]]] = {}
+
+        count = 0
+        for exchange in read_cassette(path):
+            key = _request_key(exchange["method"], exchange["url"], exchange["body"])
+            self._exchanges.setdefault(key, deque()).append(exchange)
+            count += 1
+        self._logger.info(f"Replaying {count} exchanges from {path}")
+
+        self.replayed: int = 0
+        self.unmatched: int = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = scrub_body(await request.aread(), self._secret_fields)
+        exchanges = self._exchanges.get(
+            _request_key(request.method, str(request.url), body)
+        )
+        if not exchanges:
+            self.unmatched += 1
+            raise httpx.ConnectError(
+                f"No recorded exchange for {request.method} {request.url}",
+                request=request,
+            )
+
+        exchange = exchanges.popleft() if len(exchanges) > 1 else exchanges[0]
+        if self._speed > 0:
+            await asyncio.sleep(exchange["duration"] / self._speed)
+
+        self.replayed += 1
+        return httpx.Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            content=exchange_content(exchange),
+            request=request,
+        )
+
+
+def read_cassette(path: str | Path) -> Iterable[dict[str, Any]]:
+    """Iterate the exchanges of a cassette in recorded order."""
+    with gzip.open(path, "rt", encoding="utf-8") as cassette:
+        for line in cassette:
+            if line.strip():
+                yield json.loads(line)
+
+
+def exchange_content(exchange: dict[str, Any]) -> bytes:
+    """Response body of a recorded exchange, as received on the wire."""
+    if "base64" in exchange:
+        return base64.b64decode(exchange["base64"])
+    return exchange["text"].encode("utf-8")
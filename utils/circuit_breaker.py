@@ -0,0 +1,160 @@
+"""
+Circuit breaker for calls to a dependency that can go down.
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+fail immediately with `CircuitOpen` instead of waiting for their timeouts.
+A background probe checks the dependency every `reset_timeout` seconds and
+closes the circuit once it answers. Independently, once `reset_timeout` has
+passed the circuit is half-open: one real call per `reset_timeout` is let
+through as a trial, closing the circuit on success and reopening it on
+failure.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from enum import Enum
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling a dependency known to be down.
+
+    Attributes:
+        name: Name of the circuit
+        retry_after: Seconds until the next trial call
+    """
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} is unavailable, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Usage:
+        # The probe returns whether the dependency answers again, it does
+        # not raise for a failed attempt
+        breaker = CircuitBreaker("VERPERFIL", probe=ping_upstream)
+        breaker.check()  # raises CircuitOpen
+        try:
+            response = await client.post(...)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probe: Callable[[], Awaitable[bool]] | None = None,
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._probe = probe
+        self._probe_task: asyncio.Task | None = None
+
+        self._failures: int = 0
+        self._open: bool = False
+        self._opened_at: float = 0.0
+        self._next_trial_at: float = 0.0
+
+        self.opens: int = 0
+        self.rejected: int = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if not self._open:
+            return CircuitState.CLOSED
+        if time.monotonic() - self._opened_at >= self._reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    @property
+    def open_for(self) -> float:
+        """Seconds since the circuit opened, 0 while closed."""
+        return time.monotonic() - self._opened_at if self._open else 0.0
+
+    def check(self) -> None:
+        """
+        Let a call through, or refuse it while the circuit is open.
+
+        Raises:
+            CircuitOpen: If the circuit is open, or half-open with this
+                period's trial call already let through
+        """
+        if not self._open:
+            return
+
+        now = time.monotonic()
+        if now >= self._next_trial_at:
+            self._next_trial_at = now + self._reset_timeout
+            return
+
+        self.rejected += 1
+        raise CircuitOpen(self.name, math.ceil(self._next_trial_at - now))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._open:
+            self._close()
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        now = time.monotonic()
+        if self._open:
+            # Failed trial, wait a full period for the next one
+            self._next_trial_at = now + self._reset_timeout
+            return
+        if self._failures < self._failure_threshold:
+            return
+
+        self._open = True
+        self._opened_at = now
+        self._next_trial_at = now + self._reset_timeout
+        self.opens += 1
+        self._logger.warning(
+            f"Circuit {self.name} opened after {self._failures} failures"
+        )
+        if self._probe is not None and (
+            self._probe_task is None or self._probe_task.done()
+        ):
+            self._probe_task = asyncio.create_task(
+                self._probe_until_closed(), name=f"circuit-probe-{self.name}"
+            )
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "state": self.state.value,
+            "failures": self._failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+    def _close(self) -> None:
+        self._logger.info(f"Circuit {self.name} closed after {int(self.open_for)}s")
+        self._open = False
+        self._failures = 0
+
+    async def _probe_until_closed(self) -> None:
+        while self._open:
+            await asyncio.sleep(self._reset_timeout)
+            if not self._open:
+                return
+            recovered = await self._probe()
+            if recovered and self._open:
+                self._close()
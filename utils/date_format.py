@@ -1,4 +1,7 @@
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import date as date_type
+from datetime import datetime, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 
@@ -26,3 +29,88 @@ def format_chilean_date_time_to_utc(date: str | None, hour: str) -> str:
         .astimezone(ZoneInfo("UTC"))
         .strftime("%Y-%m-%dT%H:%M:%SZ")
     )
+
+
+@lru_cache(maxsize=1024)
+def _utc_shift_for_date(date: str) -> tuple[date_type, int] | None:
+    """
+    Resolve the Santiago UTC offset of a date once.
+
+    Args:
+        date: Date string in the format 'YYYY-MM-DD'
+
+    Returns:
+        tuple | None: The parsed date and the seconds to add to a local time
+        of that day to get UTC, or None when a DST transition happens that day
+    """
+    chile_tz = ZoneInfo("America/Santiago")
+    day = datetime.strptime(date, "%Y-%m-%d")
+
+    start_offset = day.replace(tzinfo=chile_tz).utcoffset()
+    end_offset = day.replace(hour=23, minute=59, second=59, tzinfo=chile_tz).utcoffset()
+    if start_offset is None or start_offset != end_offset:
+        return None
+
+    return day.date(), -int(start_offset.total_seconds())
+
+
+def _parse_hour(hour: str) -> int | None:
+    """Seconds since midnight of a canonical 'HH:MM:SS' value, else None."""
+    if len(hour) != 8 or hour[2] != ":" or hour[5] != ":":
+        return None
+    hh, mm, ss = hour[0:2], hour[3:5], hour[6:8]
+    if not (hh.isdigit() and mm.isdigit() and ss.isdigit()):
+        return None
+    h, m, s = int(hh), int(mm), int(ss)
+    if h > 23 or m > 59 or s > 59:
+        return None
+    return h * 3600 + m * 60 + s
+
+
+def format_chilean_date_times_to_utc(
+    values: Iterable[tuple[str | None, str | None]],
+) -> list[str | None]:
+    """
+    Convert a column of Chilean date and hour pairs to UTC in one pass.
+
+    Same output as calling `format_chilean_date_time_to_utc` on every pair,
+    but the time zone is resolved once per distinct date and the hours are
+    shifted arithmetically. Days with a DST transition and non-canonical
+    values go through the per-value conversion.
+
+    Args:
+        values: Pairs of date ('YYYY-MM-DD') and hour ('HH:MM:SS'); a None
+            hour yields None
+
+    Returns:
+        list[str | None]: Dates in UTC format 'YYYY-MM-DDTHH:MM:SSZ'
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    # (date, day shift) -> formatted UTC date prefix
+    prefixes: dict[tuple[str, int], str] = {}
+    converted: list[str | None] = []
+
+    for date, hour in values:
+        if hour is None:
+            converted.append(None)
+            continue
+
+        date = date or today
+        seconds = _parse_hour(hour)
+        shift = _utc_shift_for_date(date) if seconds is not None else None
+        if seconds is None or shift is None:
+            converted.append(format_chilean_date_time_to_utc(date, hour))
+            continue
+
+        local_day, offset = shift
+        day_shift, seconds = divmod(seconds + offset, 86400)
+        prefix = prefixes.get((date, day_shift))
+        if prefix is None:
+            prefix = (local_day + timedelta(days=day_shift)).strftime("%Y-%m-%dT")
+            prefixes[(date, day_shift)] = prefix
+
+        minutes, second = divmod(seconds, 60)
+        hour_of_day, minute = divmod(minutes, 60)
+        converted.append(f"{prefix}{hour_of_day:02d}:{minute:02d}:{second:02d}Z")
+
+    return converted
@@ -0,0 +1,90 @@
+"""
+Request deadlines carried through the context.
+
+The request middleware sets the deadline once; code deep in the call stack
+reads `remaining()` to cut its own timeouts and retries short, without the
+deadline being passed down every signature.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the current deadline has passed."""
+
+
+class Deadline:
+    """Point in `time.monotonic()` by which work must be done, None for never."""
+
+    __slots__ = ("at",)
+
+    def __init__(self, at: float | None):
+        self.at = at
+
+    def remaining(self) -> float | None:
+        return None if self.at is None else self.at - time.monotonic()
+
+    def extend(self, other: "Deadline | None") -> None:
+        """Push the deadline back to `other`'s, if later."""
+        if self.at is None:
+            return
+        if other is None or other.at is None:
+            self.at = None
+        else:
+            self.at = max(self.at, other.at)
+
+
+_deadline: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _deadline.get()
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check_deadline() -> None:
+    """
+    Raises:
+        DeadlineExceeded: If the current deadline has passed
+    """
+    if expired():
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[Deadline | None]:
+    """Run the block, and tasks it starts, with a deadline `seconds` from now."""
+    deadline = None if seconds is None else Deadline(time.monotonic() + seconds)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def shared_context() -> tuple[Context, Deadline]:
+    """
+    Copy of the current context for work shared by several callers.
+
+    The copy gets its own deadline, starting as the caller's, which `extend`
+    pushes back as more callers join so the work lasts as long as the most
+    patient of them.
+    """
+    deadline = _deadline.get()
+    shared = Deadline(None if deadline is None else deadline.at)
+    context = copy_context()
+    context.run(_deadline.set, shared)
+    return context, shared
@@ -0,0 +1,262 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from collections.abc import AsyncIterable
+from pathlib import Path
+
+
+class CachedFile:
+    __slots__ = ("path", "digest", "size", "content_type")
+
+    def __init__(self, path: Path, digest: str, size: int, content_type: str):
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.content_type = content_type
+
+
+class ContentAddressedCache:
+    """
+    Size-bounded on-disk cache of files, stored by the SHA-256 of their
+    content with least recently used eviction.
+
+    Every key (e.g. a URL) has a small JSON ref pointing to a blob, so keys
+    with identical content share one file. Refs and blobs survive restarts;
+    recency is kept in the ref's modification time. A blob is deleted when
+    the last ref pointing to it is evicted. Keys being served are pinned and
+    skipped by eviction until unpinned. File I/O runs in a worker thread.
+
+    Usage:
+        cache = ContentAddressedCache("data/files", max_bytes=512 * 1024**2)
+        cache.pin(url)
+        try:
+            cached = await cache.get(url) or await cache.put(
+                url, response.aiter_bytes(), "application/pdf"
+            )
+            ...  # serve cached.path
+        finally:
+            await cache.unpin(url)
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._directory = Path(directory)
+        self._blobs = self._directory / "blobs"
+        self._refs = self._directory / "refs"
+        self._max_bytes = max_bytes
+        # Key -> file, least recently used first
+        self._entries: OrderedDict[str, CachedFile] = OrderedDict()
+        # Digest -> number of keys pointing to the blob
+        self._blob_refs: dict[str, int] = {}
+        # Key -> number of responses serving it
+        self._pins: dict[str, int] = {}
+        # Files to delete, unlinked off the event loop
+        self._garbage: list[Path] = []
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._loaded: bool = False
+        self._load_lock = asyncio.Lock()
+
+    def _ref_path(self, key: str) -> Path:
+        return self._refs / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blobs / digest[:2] / digest
+
+    async def _ensure_loaded(self) -> None:
+        """Rebuild the index from the refs left by a previous run, once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            refs = await asyncio.to_thread(self._scan)
+            for ref, size in refs:
+                self._add_entry(ref["key"], ref["digest"], size, ref["content_type"])
+            self._evict()
+            self._loaded = True
+            await self._collect()
+        self._logger.info(
+            f"Loaded {len(self._entries)} cached files ({self.size} bytes) "
+            f"from {self._directory}"
+        )
+
+    def _scan(self) -> list[tuple[dict, int]]:
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        self._refs.mkdir(parents=True, exist_ok=True)
+
+        refs = []
+        for ref_path in self._refs.glob("*.json"):
+            try:
+                ref = json.loads(ref_path.read_text())
+                blob_path = self._blob_path(ref["digest"])
+                refs.append((ref_path.stat().st_mtime, ref, blob_path.stat().st_size))
+            except (OSError, ValueError, KeyError):
+                ref_path.unlink(missing_ok=True)
+        return [(ref, size) for _, ref, size in sorted(refs, key=lambda item: item[0])]
+
+    async def _collect(self) -> None:
+        if not self._garbage:
+            return
+        garbage, self._garbage = self._garbage, []
+        await asyncio.to_thread(self._unlink, garbage)
+
+    def _unlink(self, paths: list[Path]) -> None:
+        for path in paths:
+            # Skip a blob stored again since it was released
+            if path.name not in self._blob_refs:
+                path.unlink(missing_ok=True)
+
+    def _add_entry(self, key: str, digest: str, size: int, content_type: str) -> None:
+        previous = self._entries.pop(key, None)
+        self._entries[key] = CachedFile(
+            self._blob_path(digest), digest, size, content_type
+        )
+        count = self._blob_refs.get(digest, 0)
+        if count == 0:
+            self.size += size
+        self._blob_refs[digest] = count + 1
+
+        if previous is not None:
+            self._release(previous)
+
+    def _remove_entry(self, key: str) -> None:
+        self._release(self._entries.pop(key))
+        self._garbage.append(self._ref_path(key))
+
+    def _release(self, cached: CachedFile) -> None:
+        count = self._blob_refs[cached.digest] - 1
+        if count:
+            self._blob_refs[cached.digest] = count
+            return
+
+        del self._blob_refs[cached.digest]
+        self.size -= cached.size
+        self._garbage.append(cached.path)
+
+    def _evict(self) -> None:
+        if self.size <= self._max_bytes:
+            return
+        # Keep the most recent entry even if it alone exceeds the budget
+        for key in list(self._entries)[:-1]:
+            if key in self._pins:
+                continue
+            self._remove_entry(key)
+            self.evictions += 1
+            if self.size <= self._max_bytes:
+                return
+
+    async def get(self, key: str) -> CachedFile | None:
+        """
+        Get a cached file and mark it as recently used.
+
+        Returns:
+            CachedFile | None: The file or None if the key is not cached
+        """
+        await self._ensure_loaded()
+
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if not await asyncio.to_thread(self._touch, key, cached):
+            # Deleted from outside the cache
+            if self._entries.get(key) is cached:
+                self._remove_entry(key)
+                await self._collect()
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return cached
+
+    def _touch(self, key: str, cached: CachedFile) -> bool:
+        if not cached.path.exists():
+            return False
+        with contextlib.suppress(OSError):
+            os.utime(self._ref_path(key))
+        return True
+
+    def pin(self, key: str) -> None:
+        """Keep the file of a key on disk while it is served."""
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    async def unpin(self, key: str) -> None:
+        """Release a pin, evicting what was kept over the budget by it."""
+        count = self._pins[key] - 1
+        if count:
+            self._pins[key] = count
+            return
+
+        del self._pins[key]
+        self._evict()
+        await self._collect()
+
+    async def put(
+        self, key: str, chunks: AsyncIterable[bytes], content_type: str
+    ) -> CachedFile:
+        """
+        Store a file streamed in chunks, never holding it whole in memory.
+
+        Args:
+            key: Key of the file
+            chunks: The file content
+            content_type: Media type to serve the file with
+
+        Returns:
+            CachedFile: The stored file
+        """
+        await self._ensure_loaded()
+
+        digest = hashlib.sha256()
+        size = 0
+        handle, temp_name = await asyncio.to_thread(
+            tempfile.mkstemp, dir=self._directory, suffix=".part"
+        )
+        try:
+            with os.fdopen(handle, "wb") as temp_file:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    await asyncio.to_thread(temp_file.write, chunk)
+                    size += len(chunk)
+
+            blob_path = self._blob_path(digest.hexdigest())
+            ref = {
+                "key": key,
+                "digest": digest.hexdigest(),
+                "content_type": content_type,
+            }
+            await asyncio.to_thread(self._commit, temp_name, blob_path, key, ref)
+        except BaseException:
+            await asyncio.to_thread(Path(temp_name).unlink, missing_ok=True)
+            raise
+
+        self._add_entry(key, digest.hexdigest(), size, content_type)
+        self._evict()
+        cached = self._entries[key]
+        await self._collect()
+        return cached
+
+    def _commit(self, temp_name: str, blob_path: Path, key: str, ref: dict) -> None:
+        blob_path.parent.mkdir(exist_ok=True)
+        os.replace(temp_name, blob_path)
+        self._ref_path(key).write_text(json.dumps(ref))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "files": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+def dumps_json(value: Any) -> bytes:
+    """Encode JSON with orjson when installed, the stdlib encoder otherwise."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Whether an `If-None-Match` header lists an ETag, compared weakly."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _accepted_encodings(accept_encoding: str | None) -> set[str]:
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        if coding and quality not in ("0", "0.0", "0.00", "0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class EncodedBody:
+    """
+    A response body serialized once and compressed ahead of time, to be
+    served to any number of requests.
+
+    The ETag is a hash of the uncompressed bytes, weak because the compressed
+    variants share it.
+
+    Usage:
+        body = EncodedBody(dumps_json(payload))
+        if body.matches(request.headers.get("if-none-match")):
+            ...  # 304
+        content, encoding = body.select(request.headers.get("accept-encoding"))
+    """
+
+    def __init__(self, raw: bytes, min_compress_size: int = 1024):
+        self.etag: str = f'W/"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+        self._variants: dict[str, bytes] = {"identity": raw}
+
+        if len(raw) >= min_compress_size:
+            if brotli is not None:
+                # Mid quality, the top levels are too slow for a per-change build
+                self._variants["br"] = brotli.compress(raw, quality=5)
+            self._variants["gzip"] = gzip.compress(raw, compresslevel=6, mtime=0)
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Whether an `If-None-Match` header lists this body's ETag."""
+        return etag_matches(self.etag, if_none_match)
+
+    def select(self, accept_encoding: str | None) -> tuple[bytes, str | None]:
+        """
+        Pick the smallest variant the client accepts.
+
+        Args:
+            accept_encoding: The request's `Accept-Encoding` header
+
+        Returns:
+            tuple: The body bytes and their content coding, None for identity
+        """
+        accepted = _accepted_encodings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self._variants and (coding in accepted or "*" in accepted):
+                return self._variants[coding], coding
+        return self._variants["identity"], None
@@ -0,0 +1,50 @@
+import asyncio
+from collections.abc import AsyncIterator, Hashable, Iterable
+from typing import Awaitable, Callable
+
+
+async def map_as_completed[K: Hashable, T](
+    keys: Iterable[K],
+    func: Callable[[K], Awaitable[T]],
+    limit: int,
+    errors: tuple[type[Exception], ...],
+) -> AsyncIterator[tuple[K, T | None, Exception | None]]:
+    """
+    Run `func` for every distinct key with at most `limit` calls at a time and
+    yield the results in completion order.
+
+    Expected failures are yielded instead of raised, so one bad key does not
+    stop the others. Closing the iterator early cancels the calls still
+    pending.
+
+    Usage:
+        async for key, result, error in map_as_completed(
+            ids, fetch, limit=8, errors=(httpx.HTTPError,)
+        ):
+            ...
+
+    Args:
+        keys: Keys to process, duplicates are processed once
+        func: Coroutine function called with each key
+        limit: Maximum number of concurrent calls
+        errors: Exceptions yielded as the key's error, any other is raised
+
+    Yields:
+        tuple: The key, its result and the exception it raised, if any
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(key: K) -> tuple[K, T | None, Exception | None]:
+        async with semaphore:
+            try:
+                return key, await func(key), None
+            except errors as e:
+                return key, None, e
+
+    tasks = [asyncio.create_task(run(key)) for key in dict.fromkeys(keys)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,134 @@
+"""
+Hedged calls for idempotent reads.
+
+A call that has not answered within a percentile of the recent latencies is
+sent a second time, and whichever attempt succeeds first is used; the other
+is cancelled. Hedges are paid for by a budget: every call earns `budget`
+of a hedge, so at most that fraction of extra calls is ever sent.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # The losing attempt may fail after the winner was returned
+    if not task.cancelled():
+        task.exception()
+
+
+class Hedger:
+    """
+    Usage:
+        hedger = Hedger("VERPERFIL", percentile=95, budget=0.05)
+        user = await hedger.run(lambda: fetch_user(42))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_delay: float = 0.05,
+        window: int = 1000,
+        min_samples: int = 20,
+    ):
+        self.name = name
+        self._percentile = percentile
+        self._budget = budget
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        # Latencies of successful calls, most recent last
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._delay: float | None = None
+        self._observed_since_update: int = 0
+        # Hedges the calls so far have paid for, a few can be saved up
+        self._tokens: float = 0.0
+        self._max_tokens: float = 10.0
+
+        self.calls: int = 0
+        self.hedged: int = 0
+        self.wins: int = 0
+        self.over_budget: int = 0
+
+    @property
+    def delay(self) -> float | None:
+        """Seconds a call may take before it is hedged, None until known."""
+        return self._delay
+
+    async def run[T](self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, sending it again if it is slower than usual.
+
+        Args:
+            call: Coroutine factory, safe to run twice concurrently
+
+        Returns:
+            The result of the first attempt to succeed
+
+        Raises:
+            Exception: The primary attempt's, if every attempt failed
+        """
+        self.calls += 1
+        self._tokens = min(self._max_tokens, self._tokens + self._budget)
+
+        started = time.monotonic()
+        attempts = [asyncio.ensure_future(call())]
+        attempts[0].add_done_callback(_retrieve_exception)
+        try:
+            if self._delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=self._delay)
+                if not done and self._take_token():
+                    attempts.append(asyncio.ensure_future(call()))
+                    attempts[1].add_done_callback(_retrieve_exception)
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if not attempt.cancelled() and attempt.exception() is None:
+                        if attempt is not attempts[0]:
+                            self.wins += 1
+                        # As seen by the caller, so hedged calls keep the tail
+                        self._observe(time.monotonic() - started)
+                        return attempt.result()
+
+            return attempts[0].result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "delay": round(self._delay or 0.0, 4),
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "wins": self.wins,
+            "over_budget": self.over_budget,
+        }
+
+    def _take_token(self) -> bool:
+        if self._tokens < 1:
+            self.over_budget += 1
+            return False
+        self._tokens -= 1
+        self.hedged += 1
+        return True
+
+    def _observe(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._observed_since_update += 1
+        # The percentile is recomputed every few calls, not on each one
+        if len(self._latencies) < self._min_samples or (
+            self._delay is not None and self._observed_since_update < 32
+        ):
+            return
+        self._observed_since_update = 0
+        ordered = sorted(self._latencies)
+        rank = math.ceil(self._percentile / 100 * len(ordered)) - 1
+        self._delay = max(self._min_delay, ordered[max(0, rank)])
@@ -0,0 +1,137 @@
+"""
+Minimal Prometheus text format metrics.
+
+Only what the service needs: counters and fixed-bucket histograms with
+labels, observed with a dict lookup, a bisect and a few additions so they can
+sit on hot paths, plus helpers to render gauges read from existing stats.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Usage:
+        relogins = Counter("relogins_total", "Re-logins", ("operation",))
+        relogins.inc("VERPERFIL")
+    """
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in self._values.items():
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Usage:
+        latency = Histogram("latency_seconds", "Latency", ("operation",))
+        with latency.time("ACCESOS"):
+            ...
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._buckets = buckets
+        # Label values -> [count per bucket..., count above the last, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        values = self._values.get(label_values)
+        if values is None:
+            values = self._values[label_values] = [0] * (len(self._buckets) + 2)
+        # Buckets are inclusive upper bounds
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, values in self._values.items():
+            cumulative = 0
+            for bound, count in zip(
+                (*self._buckets, float("inf")), values, strict=True
+            ):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.label_names, "le"), (*label_values, _format_value(bound))
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(values[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def render_gauge(
+    name: str,
+    help: str,
+    samples: Iterable[tuple[dict[str, str], float]],
+    kind: str = "gauge",
+) -> Iterator[str]:
+    """
+    Render values read from elsewhere, e.g. a `stats()` dict.
+
+    Args:
+        name: Metric name
+        help: Metric description
+        samples: Pairs of labels and value
+        kind: `gauge`, or `counter` for totals kept by another object
+    """
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        label_text = _format_labels(tuple(labels), tuple(labels.values()))
+        yield f"{name}{label_text} {_format_value(value)}"
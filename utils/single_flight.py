@@ -0,0 +1,84 @@
+import asyncio
+from collections.abc import Hashable
+from typing import Awaitable, Callable
+
+from utils.deadline import Deadline, current_deadline, shared_context
+
+
+class _Flight[T]:
+    __slots__ = ("task", "deadline", "waiters")
+
+    def __init__(self, task: asyncio.Task[T], deadline: Deadline):
+        self.task = task
+        self.deadline = deadline
+        self.waiters: int = 0
+
+
+class SingleFlight[T]:
+    """
+    Collapse concurrent calls with the same key into a single execution.
+
+    The first caller for a key starts the work, every caller arriving while it
+    is still running awaits the same task and receives the same result or
+    exception. The work runs until the latest deadline of its callers and is
+    cancelled once every caller has been cancelled.
+
+    Usage:
+        flight = SingleFlight()
+        user = await flight.do(("VERPERFIL", 42), lambda: fetch_user(42))
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, _Flight[T]] = {}
+        self.calls: int = 0
+        self.collapsed: int = 0
+        self.abandoned: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func` unless a call with the same key is already running.
+
+        Args:
+            key: Identity of the call
+            func: Coroutine factory doing the actual work
+
+        Returns:
+            The result of the shared call
+        """
+        self.calls += 1
+        flight = self._in_flight.get(key)
+
+        if flight is None:
+            context, deadline = shared_context()
+            task = asyncio.get_running_loop().create_task(func(), context=context)
+            flight = _Flight(task, deadline)
+            self._in_flight[key] = flight
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.collapsed += 1
+            flight.deadline.extend(current_deadline())
+
+        flight.waiters += 1
+        try:
+            # Shield so one cancelled caller does not cancel the work for the rest
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # The last caller went away, nobody needs the result
+                self.abandoned += 1
+                flight.task.cancel()
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+
+    def _forget(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        flight = self._in_flight.get(key)
+        if flight is not None and flight.task is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,89 @@
+"""
+Last known good values, and the staleness of the data a request was served.
+
+`StaleStore` keeps the last value loaded for each key, to be served while
+the source is unavailable. Code serving such a value calls `note_stale`
+with its age; the request's `StaleResponse` holder, set up by the stale
+headers middleware, keeps the oldest age noted so the response can be
+marked with `Warning` and `Age` headers.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from contextvars import ContextVar
+
+
+class StaleStore[K: Hashable, V]:
+    """
+    Bounded store of the last value loaded for each key, LRU evicted.
+
+    Values never expire: a value is only replaced by a newer one, so it
+    stays available for as long as the source is down.
+
+    Usage:
+        store = StaleStore(maxsize=1000)
+        store.set("a", 1)
+        stale = store.get("a")  # (1, age in seconds) or None
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        # key -> (stored_at, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+        self.served: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> tuple[V, float] | None:
+        """
+        Get the last value stored for a key.
+
+        Returns:
+            tuple | None: The value and its age in seconds, None if the key
+            was never stored or has been evicted
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+        self.served += 1
+        return entry[1], time.monotonic() - entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+class StaleResponse:
+    """Oldest age of the stale data served by a request, None if all fresh."""
+
+    __slots__ = ("age",)
+
+    def __init__(self):
+        self.age: float | None = None
+
+
+_stale_response: ContextVar[StaleResponse | None] = ContextVar(
+    "stale_response", default=None
+)
+
+
+def track_stale() -> StaleResponse:
+    """Start tracking the staleness of the current request."""
+    response = StaleResponse()
+    _stale_response.set(response)
+    return response
+
+
+def note_stale(age: float) -> None:
+    """Record that the current request is being served data `age` seconds old."""
+    response = _stale_response.get()
+    if response is not None and (response.age is None or age > response.age):
+        response.age = age
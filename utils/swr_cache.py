@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Awaitable, Callable
+
+from utils.adaptive_limiter import Priority, upstream_priority
+from utils.deadline import deadline_scope
+
+
+class SWRCache[K: Hashable, V]:
+    """
+    Bounded stale-while-revalidate cache.
+
+    Entries younger than `soft_ttl` are served as is. Between `soft_ttl` and
+    `hard_ttl` (or once marked stale) they are still served immediately while
+    a background task reloads them. Past `hard_ttl` callers wait for a fresh
+    load. A background reload failing with one of `refresh_errors` keeps the
+    old entry, any other exception is left to the task's error logging.
+
+    Usage:
+        cache = SWRCache(
+            maxsize=1000, soft_ttl=60, hard_ttl=600, refresh_errors=(OSError,)
+        )
+        user = await cache.get(42, lambda: fetch_user(42))
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        soft_ttl: float,
+        hard_ttl: float,
+        refresh_errors: tuple[type[Exception], ...],
+    ):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._maxsize = maxsize
+        self._soft_ttl = soft_ttl
+        self._hard_ttl = hard_ttl
+        self._refresh_errors = refresh_errors
+        # key -> (stored_at, stale, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float, bool, V]] = OrderedDict()
+        self._refreshing: dict[K, asyncio.Task] = {}
+
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.misses: int = 0
+        self.refreshes: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """
+        Get a value, loading it when missing or past the hard TTL.
+
+        Args:
+            key: Cache key
+            loader: Coroutine factory producing a fresh value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, stale, value = entry
+            age = time.monotonic() - stored_at
+            if age < self._hard_ttl:
+                self._entries.move_to_end(key)
+                if stale or age >= self._soft_ttl:
+                    self.stale_hits += 1
+                    self._refresh_in_background(key, loader)
+                else:
+                    self.hits += 1
+                return value
+
+        self.misses += 1
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (time.monotonic(), False, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def dump(self) -> list[tuple[K, float, bool, V]]:
+        """
+        Export the entries still within the hard TTL, least recently used
+        first.
+
+        Returns:
+            list: Key, age in seconds, stale flag and value of every entry
+        """
+        now = time.monotonic()
+        return [
+            (key, now - stored_at, stale, value)
+            for key, (stored_at, stale, value) in self._entries.items()
+            if now - stored_at < self._hard_ttl
+        ]
+
+    def load(
+        self, entries: list[tuple[K, float, bool, V]], elapsed: float = 0.0
+    ) -> None:
+        """
+        Import entries exported by `dump`.
+
+        Args:
+            entries: Key, age in seconds, stale flag and value of every entry
+            elapsed: Seconds since the export, added to every entry's age
+        """
+        now = time.monotonic()
+        for key, age, stale, value in entries:
+            age += elapsed
+            if age >= self._hard_ttl:
+                continue
+            self._entries[key] = (now - age, stale, value)
+            self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def mark_stale(self, key: K) -> bool:
+        """
+        Flag an entry so the next read triggers a background reload.
+
+        Returns:
+            bool: Whether the key was cached
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        self._entries[key] = (entry[0], True, entry[2])
+        return True
+
+    def invalidate(self, key: K) -> bool:
+        """Remove a key, returning whether it was cached."""
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _refresh_in_background(
+        self, key: K, loader: Callable[[], Awaitable[V]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: K, loader: Callable[[], Awaitable[V]]) -> None:
+        try:
+            # Nobody waits for it: upstream calls queue behind interactive ones
+            # and are not bound by the deadline of the request that started it
+            with upstream_priority(Priority.BACKGROUND), deadline_scope(None):
+                value = await loader()
+        except self._refresh_errors as e:
+            # Keep serving the old entry until the hard TTL runs out
+            self._logger.warning(f"Background refresh of {key!r} failed: {str(e)}")
+            return
+        self.refreshes += 1
+        self.set(key, value)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class TTLCache[K: Hashable, V]:
+    """
+    Bounded in-process cache with per-entry expiry and LRU eviction.
+
+    `None` values are cached as negative entries: they expire after
+    `negative_ttl` instead of `ttl`, so lookups of unknown keys are also
+    absorbed without pinning them for long.
+
+    Usage:
+        cache = TTLCache(maxsize=1000, ttl=3600, negative_ttl=60)
+        cache.set("a", 1)
+        found, value = cache.lookup("a")
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float | None = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._negative_ttl = ttl if negative_ttl is None else negative_ttl
+        # key -> (expires_at, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float, V | None]] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: K) -> tuple[bool, V | None]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            tuple: Whether the key was cached and the cached value, which is
+            None for negative entries
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, key: K, value: V | None, ttl: float | None = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache, None for a negative entry
+            ttl: Override of the default time to live in seconds
+        """
+        if ttl is None:
+            ttl = self._ttl if value is not None else self._negative_ttl
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def dump(self) -> list[tuple[K, float, V | None]]:
+        """
+        Export the live entries, least recently used first.
+
+        Returns:
+            list: Key, seconds left to live and value of every entry
+        """
+        now = time.monotonic()
+        return [
+            (key, expires_at - now, value)
+            for key, (expires_at, value) in self._entries.items()
+            if expires_at > now
+        ]
+
+    def load(
+        self, entries: list[tuple[K, float, V | None]], elapsed: float = 0.0
+    ) -> None:
+        """
+        Import entries exported by `dump`.
+
+        Args:
+            entries: Key, seconds left to live and value of every entry
+            elapsed: Seconds since the export, taken off every entry's life
+        """
+        for key, ttl, value in entries:
+            if ttl > elapsed:
+                self.set(key, value, ttl - elapsed)
+
+    def invalidate(self, key: K) -> bool:
+        """Remove a key, returning whether it was cached."""
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }